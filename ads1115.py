@@ -0,0 +1,222 @@
+"""ADS1115 soil acquisition over smbus: oversampled reads with conversion-ready waits.
+
+`Sampler.read` converts the requested channels round-robin (single-shot
+mode) or one block per channel (continuous mode). It waits for each
+conversion through the ALERT/RDY pin when one is wired. Without the pin,
+single-shot mode polls the config register's OS bit and continuous mode
+sleeps one conversion period per sample. Each channel's samples are
+reduced to one value plus a noise estimate.
+"""
+
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+REG_CONVERSION = 0x00
+REG_CONFIG = 0x01
+REG_LO_THRESH = 0x02
+REG_HI_THRESH = 0x03
+
+DATA_RATES = {8: 0, 16: 1, 32: 2, 64: 3, 128: 4, 250: 5, 475: 6, 860: 7}
+REDUCERS = ("median", "trimmed_mean", "mean")
+MODES = ("single", "continuous")
+# trimmed_mean cuts this fraction from each end; below 0.5 so some samples remain
+TRIM_MAX = 0.49
+GAIN_4V096 = 0x1
+
+# median absolute deviation -> standard deviation for normally distributed noise
+MAD_TO_SIGMA = 1.4826
+
+
+def config_word(channel: int, data_rate: int, continuous: bool = False, ready_pin: bool = False) -> int:
+    if channel not in (0, 1, 2, 3):
+        raise ValueError("ADS1115 channel must be 0-3")
+    if data_rate not in DATA_RATES:
+        raise ValueError(f"ADS1115 data rate must be one of {sorted(DATA_RATES)}")
+    return (
+        (0x0 if continuous else 0x8000)  # start a single conversion
+        | ((0x4 + channel) << 12)  # AINx against GND
+        | (GAIN_4V096 << 9)
+        | (0x0000 if continuous else 0x0100)
+        | (DATA_RATES[data_rate] << 5)
+        # ALERT/RDY asserts after every conversion, or comparator disabled
+        | (0x0000 if ready_pin else 0x0003)
+    )
+
+
+def _write_register(bus: Any, addr: int, register: int, value: int) -> None:
+    bus.write_i2c_block_data(addr, register, [(value >> 8) & 0xFF, value & 0xFF])
+
+
+def _read_register(bus: Any, addr: int, register: int) -> int:
+    data = bus.read_i2c_block_data(addr, register, 2)
+    return (data[0] << 8) | data[1]
+
+
+def read_conversion(bus: Any, addr: int) -> int:
+    raw = _read_register(bus, addr, REG_CONVERSION)
+    if raw & 0x8000:
+        raw -= 1 << 16
+    return raw
+
+
+def enable_ready_pin(bus: Any, addr: int) -> None:
+    """Turn ALERT/RDY into a conversion-ready output (hi_thresh MSB set, lo_thresh MSB clear)."""
+    _write_register(bus, addr, REG_LO_THRESH, 0x0000)
+    _write_register(bus, addr, REG_HI_THRESH, 0x8000)
+
+
+def reduce(samples: Sequence[float], reducer: str = "median", trim: float = 0.2) -> Tuple[float, float]:
+    """(value, noise) for one channel's samples.
+
+    noise is a robust estimate of the standard error of `value`: the sample
+    spread (MAD scaled to a standard deviation) divided by sqrt(n).
+    """
+    if not samples:
+        raise ValueError("no samples")
+    ordered = sorted(samples)
+    count = len(ordered)
+    if reducer == "median":
+        value = statistics.median(ordered)
+    elif reducer == "trimmed_mean":
+        cut = min(int(count * trim), (count - 1) // 2)
+        kept = ordered[cut : count - cut]
+        value = sum(kept) / len(kept)
+    else:
+        value = sum(ordered) / count
+    center = statistics.median(ordered)
+    mad = statistics.median(abs(sample - center) for sample in ordered)
+    return float(value), MAD_TO_SIGMA * mad / count**0.5
+
+
+class Sampler:
+    """Oversampled soil reads from one ADS1115 on an smbus-style `bus`.
+
+    `wait_ready(timeout)` should block until the ALERT/RDY pin signals a
+    finished conversion and return False on timeout; without it the OS bit
+    is polled (single-shot) or one conversion period is waited (continuous).
+    """
+
+    def __init__(
+        self,
+        bus: Any,
+        addr: int,
+        data_rate: int = 860,
+        samples: int = 8,
+        reducer: str = "median",
+        trim: float = 0.2,
+        mode: str = "single",
+        wait_ready: Optional[Callable[[float], bool]] = None,
+    ) -> None:
+        if data_rate not in DATA_RATES:
+            raise ValueError(f"ADS1115 data rate must be one of {sorted(DATA_RATES)}")
+        if reducer not in REDUCERS:
+            raise ValueError(f"reducer must be one of {REDUCERS}")
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        self.bus = bus
+        self.addr = addr
+        self.data_rate = data_rate
+        self.samples = max(1, int(samples))
+        self.reducer = reducer
+        self.trim = trim
+        self.mode = mode
+        self.wait_ready = wait_ready
+        self.period = 1.0 / data_rate
+        self._ready_pin_enabled = False
+
+    def _ready(self) -> None:
+        if self.wait_ready is not None and not self._ready_pin_enabled:
+            enable_ready_pin(self.bus, self.addr)
+            self._ready_pin_enabled = True
+
+    def _wait_single(self) -> None:
+        timeout = 4 * self.period + 0.002
+        if self.wait_ready is not None:
+            if not self.wait_ready(timeout):
+                raise OSError("ADS1115 ALERT/RDY timeout")
+            return
+        deadline = time.monotonic() + timeout
+        # the conversion cannot finish sooner than one period
+        time.sleep(self.period * 0.9)
+        while not _read_register(self.bus, self.addr, REG_CONFIG) & 0x8000:
+            if time.monotonic() > deadline:
+                raise OSError("ADS1115 conversion timeout")
+            time.sleep(self.period * 0.1)
+
+    def _wait_continuous(self) -> None:
+        if self.wait_ready is not None:
+            if not self.wait_ready(4 * self.period + 0.002):
+                raise OSError("ADS1115 ALERT/RDY timeout")
+            return
+        time.sleep(self.period * 1.05)
+
+    def _convert_single(self, channel: int) -> int:
+        _write_register(self.bus, self.addr, REG_CONFIG, config_word(channel, self.data_rate, False, self.wait_ready is not None))
+        self._wait_single()
+        return read_conversion(self.bus, self.addr)
+
+    def _collect(self, channels: Sequence[int]) -> Dict[int, List[int]]:
+        collected: Dict[int, List[int]] = {channel: [] for channel in channels}
+        self._ready()
+        if self.mode == "single":
+            # round robin: every channel's samples are spread over the whole read
+            for _ in range(self.samples):
+                for channel in channels:
+                    collected[channel].append(self._convert_single(channel))
+            return collected
+        try:
+            for channel in channels:
+                _write_register(self.bus, self.addr, REG_CONFIG, config_word(channel, self.data_rate, True, self.wait_ready is not None))
+                # the conversion in flight when the mux switched mixes both inputs
+                self._wait_continuous()
+                for _ in range(self.samples):
+                    self._wait_continuous()
+                    collected[channel].append(read_conversion(self.bus, self.addr))
+        finally:
+            # back to power-down single-shot mode
+            _write_register(self.bus, self.addr, REG_CONFIG, config_word(channels[0], self.data_rate) & 0x7FFF)
+        return collected
+
+    def read(self, channels: Sequence[int] = (0, 1, 2, 3)) -> Dict[int, Tuple[float, float]]:
+        """{channel: (value, noise)} in raw ADC counts."""
+        collected = self._collect(channels)
+        return {channel: reduce(samples, self.reducer, self.trim) for channel, samples in collected.items()}
+
+
+def gpio_ready_waiter(pin: int, mode: str = "single") -> Optional[Callable[[float], bool]]:
+    """A `wait_ready` backed by RPi.GPIO on `pin`, or None when GPIO is unavailable.
+
+    The waiter is called after the conversion has started and may run after
+    it finished. In single-shot mode ALERT/RDY stays low once the conversion
+    is done, so the level is checked. In continuous mode the pin only pulses,
+    so edge detection is armed here, once, and the waiter consumes its flag.
+    """
+    try:
+        import RPi.GPIO as GPIO  # type: ignore
+
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        if mode == "continuous":
+            # a rebuilt sampler on the same pin would otherwise hit "conflicting edge detection"
+            GPIO.remove_event_detect(pin)
+            GPIO.add_event_detect(pin, GPIO.FALLING)
+    except Exception:
+        return None
+
+    if mode == "continuous":
+        def ready() -> bool:
+            return bool(GPIO.event_detected(pin))
+    else:
+        def ready() -> bool:
+            return GPIO.input(pin) == GPIO.LOW
+
+    def wait(timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while not ready():
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.0001)
+        return True
+
+    return wait
@@ -1,22 +1,44 @@
+import atexit
+import base64
 import csv
+import gzip
 import ipaddress
 import io
 import json
 import os
+import queue
 import random
 import re
+import signal
 import sqlite3
+import struct
 import subprocess
+import sys
 import threading
 import time
 import uuid
-from collections import deque
+import zlib
+from collections import OrderedDict, deque
+from itertools import chain, islice
 from datetime import date, datetime, timedelta, time as dt_time, timezone
+from functools import cached_property, wraps
 from pathlib import Path
-from typing import Any, Deque, Dict, List, Optional, Tuple
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from zoneinfo import ZoneInfo
 
 from flask import Flask, Response, jsonify, redirect, render_template, request, url_for
+from catalog_index import CatalogIndex, actuator_id as catalog_actuator_id
+from db import connections as db_connections, writer as db_writer
+import ads1115
+import bh1750
+import ds18b20
+import day_archive
+import i2c_bus
+import partitions
+import rolling_stats
+import sensor_config
+import sensor_rollup
+import sensor_schedule
 from reporting import (
     build_daily_report,
     build_weekly_report,
@@ -42,7 +64,27 @@ SENSOR_CSV_LOG_DIR = DATA_DIR / "sensor_logs"
 SENSOR_STALE_SECONDS = 15
 SENSOR_ALERT_COOLDOWN_SECONDS = 120
 SENSOR_LOG_INTERVAL_SECONDS = 10
-PUMP_DAILY_CACHE_SECONDS = 30
+# sensor_loop runs at least this often, even when no driver published
+SENSOR_READ_INTERVAL_SECONDS = 3.0
+# sensor_loop reacts to new readings, but at most this often
+SENSOR_LOOP_MIN_SECONDS = 1.0
+# pump dry check hysteresis is at least this many times the soil reading's noise estimate
+PUMP_DRY_NOISE_FACTOR = 3
+RUNTIME_LEDGER_WINDOW_SECONDS = 24 * 3600
+# LCD template token prefix -> (rolling stats metric, decimals)
+LCD_STATS_TOKENS = {
+    "temp": ("dht22.temperature", 1),
+    "hum": ("dht22.humidity", 0),
+    "ds_temp": ("ds18b20.temperature", 1),
+    "lux": ("bh1750.lux", 0),
+}
+# reading fields fed to the rolling window stats as "<sensor>.<field>"
+SENSOR_STATS_FIELDS = {
+    "dht22": ("temperature", "humidity"),
+    "ds18b20": ("temperature",),
+    "bh1750": ("lux",),
+    "soil": ("ch0", "ch1", "ch2", "ch3"),
+}
 DEFAULT_LIMITS = {
     "pump_max_seconds": 15,
     "pump_cooldown_seconds": 60,
@@ -121,6 +163,7 @@ DEFAULT_AUTOMATION = {
     "pump_soil_channel": "ch0",
     "pump_dry_threshold": 0,
     "pump_dry_when_above": False,
+    "pump_dry_hysteresis": 0,
     "pump_pulse_seconds": 5,
     "pump_max_daily_seconds": 60,
     "pump_window_start": "06:00",
@@ -185,23 +228,75 @@ NODE_COMMAND_RATE_LIMIT_SECONDS = _env_float("NODE_COMMAND_RATE_LIMIT_SECONDS",
 NODE_COMMAND_DEFAULT_TTL_SECONDS = _env_int("NODE_COMMAND_TTL_SECONDS", 30)
 NODE_COMMAND_MAX_QUEUE = _env_int("NODE_COMMAND_MAX_QUEUE", 50)
 NODE_STALE_SECONDS = _env_int("NODE_STALE_SECONDS", 15)
+RETENTION_BATCH_ROWS = _env_int("RETENTION_BATCH_ROWS", 2000)
+RETENTION_BATCH_PAUSE_MS = _env_int("RETENTION_BATCH_PAUSE_MS", 50)
+RETENTION_BACKUP_PAGES = _env_int("RETENTION_BACKUP_PAGES", 1024)
+RETENTION_VACUUM_PAGES = _env_int("RETENTION_VACUUM_PAGES", 1000)
+EXPORT_CHUNK_ROWS = _env_int("EXPORT_CHUNK_ROWS", 1000)
+STATUS_SNAPSHOT_MAX_AGE_MS = _env_int("STATUS_SNAPSHOT_MAX_AGE_MS", 1000)
+STATUS_DELTA_HISTORY = _env_int("STATUS_DELTA_HISTORY", 32)
+GZIP_MIN_BYTES = _env_int("GZIP_MIN_BYTES", 1024)
+GZIP_LEVEL = _env_int("GZIP_LEVEL", 5)
+STREAM_MAX_CLIENTS = _env_int("STREAM_MAX_CLIENTS", 8)
+STREAM_HEARTBEAT_SECONDS = _env_int("STREAM_HEARTBEAT_SECONDS", 15)
+# how often an idle stream looks for a new status snapshot version
+STREAM_STATUS_CHECK_SECONDS = 0.5
+# a stream sends at most one status patch per this many seconds; changes in between are coalesced
+STREAM_PATCH_MIN_SECONDS = _env_float("STREAM_PATCH_MIN_SECONDS", 1.0)
 TREND_MAX_POINTS_DEFAULT = 120
 TREND_MAX_POINTS_LIMIT = 2000
+TREND_BATCH_MAX_SERIES = _env_int("TREND_BATCH_MAX_SERIES", 64)
+# columnar/f32 history bodies are built in memory; 7 days of 10 s samples is ~60k rows
+HISTORY_ENCODED_MAX_ROWS = _env_int("HISTORY_ENCODED_MAX_ROWS", 100000)
+TREND_METRIC_COLUMNS = {
+    "temp_c": "dht_temp",
+    "rh_pct": "dht_hum",
+    "lux": "lux",
+    "soil_raw": "soil_ch0",
+}
 
 
 def _downsample_points(points: List[List[float]], max_points: int) -> List[List[float]]:
+    """Largest-triangle-three-buckets: keeps the first and last point and the visually significant ones."""
     if max_points <= 0 or len(points) <= max_points:
         return points
     if max_points == 1:
         return [points[-1]]
-    last_index = len(points) - 1
-    step = last_index / float(max_points - 1)
-    indices: List[int] = []
-    for i in range(max_points):
-        idx = int(round(i * step))
-        if not indices or idx != indices[-1]:
-            indices.append(idx)
-    return [points[i] for i in indices]
+    if max_points == 2:
+        return [points[0], points[-1]]
+    every = (len(points) - 2) / float(max_points - 2)
+    sampled = [points[0]]
+    anchor = 0
+    for i in range(max_points - 2):
+        # centroid of the next bucket
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, len(points))
+        next_bucket = points[next_start:next_end] or [points[-1]]
+        avg_x = sum(p[0] for p in next_bucket) / len(next_bucket)
+        avg_y = sum(p[1] for p in next_bucket) / len(next_bucket)
+        ax, ay = points[anchor][0], points[anchor][1]
+        best, best_area = -1, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((ax - avg_x) * (points[j][1] - ay) - (ax - points[j][0]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        anchor = best
+    sampled.append(points[-1])
+    return sampled
+
+
+def _merge_patch(old: Any, new: Any) -> Any:
+    """JSON merge patch (RFC 7396) that turns `old` into `new`; {} means unchanged."""
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return new
+    patch: Dict[str, Any] = {key: None for key in old if key not in new}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+        elif old[key] != value:
+            patch[key] = _merge_patch(old[key], value) if isinstance(value, dict) else value
+    return patch
 
 
 def _parse_hhmm(value: str) -> dt_time:
@@ -259,6 +354,50 @@ class GPIOBackend:
         return 1 if on else 0
 
 
+class RuntimeLedger:
+    """Rolling window of timed ON seconds per channel (same rows actuator_log counts for max_daily_s)."""
+
+    def __init__(self, window_s: float = RUNTIME_LEDGER_WINDOW_SECONDS) -> None:
+        self.window_s = window_s
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Deque[Tuple[float, float]]] = {}
+        self.totals: Dict[str, float] = {}
+
+    def _expire(self, name: str, now: float) -> None:
+        entries = self.entries.get(name)
+        if not entries:
+            return
+        cutoff = now - self.window_s
+        while entries and entries[0][0] < cutoff:
+            _ts, seconds = entries.popleft()
+            self.totals[name] -= seconds
+        if not entries:
+            self.totals[name] = 0.0
+
+    def charge(self, name: str, seconds: float, ts: Optional[float] = None) -> None:
+        if seconds <= 0:
+            return
+        with self.lock:
+            self.entries.setdefault(name, deque()).append((ts if ts is not None else time.time(), float(seconds)))
+            self.totals[name] = self.totals.get(name, 0.0) + float(seconds)
+
+    def used(self, name: str, now: Optional[float] = None) -> float:
+        with self.lock:
+            self._expire(name, now if now is not None else time.time())
+            return self.totals.get(name, 0.0)
+
+    def remaining(self, name: str, budget_s: float, now: Optional[float] = None) -> float:
+        return max(0.0, budget_s - self.used(name, now))
+
+    def reset(self, rows: List[Tuple[str, float, float]]) -> None:
+        with self.lock:
+            self.entries = {}
+            self.totals = {}
+            for name, ts, seconds in sorted(rows, key=lambda row: row[1]):
+                self.entries.setdefault(name, deque()).append((float(ts), float(seconds)))
+                self.totals[name] = self.totals.get(name, 0.0) + float(seconds)
+
+
 class ActuatorManager:
     def __init__(self, backend: GPIOBackend, channel_config: List[Dict[str, Any]]) -> None:
         self.backend = backend
@@ -266,8 +405,11 @@ class ActuatorManager:
         self.state: Dict[str, Dict[str, Any]] = {}
         self.timers: Dict[str, threading.Timer] = {}
         self.lock = threading.Lock()
+        self.ledger = RuntimeLedger()
         self.last_pump_stop_ts: float = 0
         self.last_stop_ts: Dict[str, float] = {}
+        # (name, on, reason, transitioned)
+        self.on_change: Optional[Callable[[str, bool, str, bool], None]] = None
         self.load_config(channel_config)
 
     def _is_pump(self, name: str) -> bool:
@@ -291,6 +433,8 @@ class ActuatorManager:
                 safe_default = bool(chan.get("safe_default", False))
                 self.backend.setup_channel(pin, active_low, False)
                 self.backend.set_state(pin, active_low, False)
+                if self.state.get(name, {}).get("state"):
+                    record_actuator_transition(name, False, "config_reload")
                 self.state[name] = {
                     "state": False,
                     "last_change_ts": None,
@@ -302,6 +446,7 @@ class ActuatorManager:
 
     def _apply(self, name: str, on: bool, reason: str, duration: Optional[int] = None) -> None:
         chan = self.channels[name]
+        was_on = bool(self.state.get(name, {}).get("state"))
         pin = int(chan["gpio_pin"])
         active_low = bool(chan.get("active_low", False))
         self.backend.set_state(pin, active_low, on)
@@ -314,7 +459,10 @@ class ActuatorManager:
         if name in self.timers:
             self.timers[name].cancel()
             self.timers.pop(name, None)
+        if on != was_on:
+            record_actuator_transition(name, on, reason)
         if on and duration:
+            self.ledger.charge(name, duration)
             timer = threading.Timer(duration, lambda: self._apply(name, False, "auto_off"))
             timer.daemon = True
             timer.start()
@@ -323,6 +471,8 @@ class ActuatorManager:
             self.last_stop_ts[name] = time.time()
             if self._is_pump(name):
                 self.last_pump_stop_ts = time.time()
+        if self.on_change:
+            self.on_change(name, on, reason, on != was_on)
 
     def set_state(self, name: str, on: bool, reason: str, duration: Optional[int] = None) -> None:
         with self.lock:
@@ -354,6 +504,7 @@ class ActuatorManager:
                     "voltage_v": self.channels[name].get("voltage_v"),
                     "notes": self.channels[name].get("notes", ""),
                     "enabled": bool(self.channels[name].get("enabled", True)),
+                    "runtime_24h_s": round(self.ledger.used(name), 1),
                 }
                 for name, info in self.state.items()
             }
@@ -362,134 +513,307 @@ class ActuatorManager:
         self.load_config(channel_config)
 
 
+class SensorDriver:
+    """Reads one sensor family on its own thread and hands every reading to `publish`."""
+
+    def __init__(
+        self, name: str, read: Callable[[], Dict[str, Any]], publish: Callable[[str, Dict[str, Any]], None], interval: float
+    ) -> None:
+        self.name = name
+        self.read = read
+        self.publish = publish
+        self.interval = interval
+        self.last_duration = 0.0
+        self.errors = 0
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"sensor-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def wake(self) -> None:
+        """Cut the current wait short, e.g. after the interval was lowered."""
+        self._wake.set()
+
+    def poll(self) -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            reading = self.read()
+        except Exception as exc:
+            self.errors += 1
+            reading = {"ts": time.time(), "status": "error", "error": str(exc)}
+        self.last_duration = time.monotonic() - started
+        self.publish(self.name, reading)
+        return reading
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.poll()
+            self._wake.wait(max(0.0, self.interval - (time.monotonic() - started)))
+            self._wake.clear()
+
+
 class SensorManager:
     def __init__(self, simulation: bool = False) -> None:
         self.simulation = simulation or SIMULATION_MODE
         self.lock = threading.Lock()
+        self.updated = threading.Condition(self.lock)
         self.last_readings: Dict[str, Any] = {}
         self.last_ts: float = 0
-        self.dht22_history: Deque[Tuple[float, float, float]] = deque()
-        self.dht22_sensor = None
-        self.ads_channels: List[Any] = []
-        self.config: Dict[str, Any] = {}
+        self.seq = 0
+        # replaced as a whole on reload; read paths take one reference per read
+        self.settings = sensor_config.compile_config(sensors_config)
+        self.stats = rolling_stats.RollingStats(self.settings.stats_windows)
+        # lower-cased name -> role of every actuator that is currently on
+        self.active_actuators: Dict[str, str] = {}
         # optional hardware libs
-        self._init_hardware()
+        self._set_hardware(self._init_hardware(self.settings))
+        self.drivers: Dict[str, SensorDriver] = {
+            name: SensorDriver(name, read, self._publish, self.plans[name].interval)
+            for name, read in (
+                ("dht22", self._read_dht22),
+                ("ds18b20", self._read_ds18b20),
+                ("bh1750", self._read_bh1750),
+                ("soil", self._read_soil),
+            )
+        }
+
+    @property
+    def plans(self) -> Dict[str, sensor_schedule.PollPlan]:
+        return self.settings.plans
 
     def reload_config(self, config: Dict[str, Any]) -> None:
+        merged = dict(sensors_config)
+        merged.update(config or {})
+        settings = sensor_config.compile_config(merged)
+        hardware = self._init_hardware(settings, self.settings)
+        self.stats.configure(settings.stats_windows)
         with self.lock:
-            self.config = dict(config)
-        self._init_hardware()
+            # the handles and the settings they were built from are swapped together
+            replaced = {attr: getattr(self, attr) for attr in hardware}
+            self.settings = settings
+            self._set_hardware(hardware)
+            for name, driver in self.drivers.items():
+                driver.interval = settings.plans[name].interval
+        self._release_hardware(replaced, hardware)
+        for driver in self.drivers.values():
+            driver.wake()
+
+    def _set_hardware(self, hardware: Dict[str, Any]) -> None:
+        for attr, handle in hardware.items():
+            setattr(self, attr, handle)
 
-    def _init_hardware(self) -> None:
-        self.dht = None
-        self.ads = None
-        self.ads_adafruit = None
-        self.bus = None
-        if self.simulation:
-            return
-        config = dict(sensors_config)
-        config.update(self.config or {})
-        try:
-            import Adafruit_DHT  # type: ignore
+    @staticmethod
+    def _release_hardware(old: Dict[str, Any], new: Dict[str, Any]) -> None:
+        """Close the handles a reload replaced (bus fd, DHT pin, busio I2C, probe pool)."""
+        for attr, handle in old.items():
+            if handle is None or handle is new.get(attr):
+                continue
+            for method in ("close", "exit", "deinit"):
+                release = getattr(handle, method, None)
+                if callable(release):
+                    try:
+                        release()
+                    except Exception:
+                        pass
+                    break
 
-            self.dht = Adafruit_DHT
-        except Exception:
-            self.dht = None
-        try:
-            import adafruit_dht  # type: ignore
-            import board  # type: ignore
+    HARDWARE_ATTRS = (
+        "dht", "dht22_sensor", "ads", "ads_i2c", "ads_adafruit", "ads_channels",
+        "bus", "soil_sampler", "lux_sensor", "ds18_probes",
+    )
 
-            gpio_pin = int(config.get("dht22_gpio", 17))
-            pin_name = f"D{gpio_pin}"
-            pin = getattr(board, pin_name, board.D17)
-            self.dht22_sensor = adafruit_dht.DHT22(pin, use_pulseio=False)
-        except Exception:
-            self.dht22_sensor = None
-        try:
-            from smbus2 import SMBus  # type: ignore
+    def _init_hardware(
+        self, settings: sensor_config.SensorConfig, previous: Optional[sensor_config.SensorConfig] = None
+    ) -> Dict[str, Any]:
+        """Sensor handles for `settings`, without touching the ones in use.
 
-            self.bus = SMBus(1)
-        except Exception:
-            self.bus = None
-        try:
-            import Adafruit_ADS1x15  # type: ignore
+        With `previous` (a reload), handles whose settings did not change are
+        reused: the I2C bus and the 1-Wire probe set do not depend on settings,
+        and BH1750/ADS1115 objects keep their probed address and RDY pin setup.
+        """
+        hardware: Dict[str, Any] = dict.fromkeys(self.HARDWARE_ATTRS)
+        hardware["ads_channels"] = []
+        if previous is not None:
+            hardware.update({attr: getattr(self, attr, None) for attr in self.HARDWARE_ATTRS})
 
-            self.ads = Adafruit_ADS1x15.ADS1115()
-        except Exception:
-            self.ads = None
-        try:
-            import board  # type: ignore
-            import busio  # type: ignore
-            from adafruit_ads1x15.ads1115 import ADS1115  # type: ignore
-            from adafruit_ads1x15.analog_in import AnalogIn  # type: ignore
+        def changed(*fields: str) -> bool:
+            return previous is None or any(getattr(previous, field) != getattr(settings, field) for field in fields)
 
-            addr_raw = config.get("ads1115_addr", "0x48")
+        if self.simulation:
+            return hardware
+        if hardware["ds18_probes"] is None:
+            hardware["ds18_probes"] = ds18b20.ProbeSet()
+        if hardware["dht"] is None:
             try:
-                ads_addr = int(str(addr_raw), 0)
+                import Adafruit_DHT  # type: ignore
+
+                hardware["dht"] = Adafruit_DHT
             except Exception:
-                ads_addr = 0x48
-            i2c = busio.I2C(board.SCL, board.SDA)
-            self.ads_adafruit = ADS1115(i2c, address=ads_addr)
-            self.ads_adafruit.gain = 1
-            self.ads_channels = [
-                AnalogIn(self.ads_adafruit, 0),
-                AnalogIn(self.ads_adafruit, 1),
-                AnalogIn(self.ads_adafruit, 2),
-                AnalogIn(self.ads_adafruit, 3),
-            ]
-        except Exception:
-            self.ads_adafruit = None
-            self.ads_channels = []
+                pass
+        if hardware["dht22_sensor"] is None or changed("dht22_gpio"):
+            try:
+                import adafruit_dht  # type: ignore
+                import board  # type: ignore
+
+                pin = getattr(board, f"D{settings.dht22_gpio}", board.D17)
+                hardware["dht22_sensor"] = adafruit_dht.DHT22(pin, use_pulseio=False)
+            except Exception:
+                hardware["dht22_sensor"] = None
+        bus = hardware["bus"]
+        if bus is None:
+            try:
+                from smbus2 import SMBus  # type: ignore
+
+                # BH1750 and ADS1115 drivers run on their own threads over this one handle
+                bus = hardware["bus"] = i2c_bus.SharedBus(SMBus(1))
+            except Exception:
+                bus = None
+        if bus:
+            if hardware["soil_sampler"] is None or changed(*sensor_config.ADS1115_FIELDS):
+                hardware["soil_sampler"] = self._soil_sampler(bus, settings)
+            if hardware["lux_sensor"] is None or changed(*sensor_config.BH1750_FIELDS):
+                hardware["lux_sensor"] = self._lux_sensor(bus, settings)
+        if hardware["ads"] is None:
+            try:
+                import Adafruit_ADS1x15  # type: ignore
+
+                hardware["ads"] = Adafruit_ADS1x15.ADS1115()
+            except Exception:
+                pass
+        if hardware["ads_adafruit"] is None or changed("ads1115_addr"):
+            try:
+                import board  # type: ignore
+                import busio  # type: ignore
+                from adafruit_ads1x15.ads1115 import ADS1115  # type: ignore
+                from adafruit_ads1x15.analog_in import AnalogIn  # type: ignore
+
+                i2c = busio.I2C(board.SCL, board.SDA)
+                ads_adafruit = ADS1115(i2c, address=settings.ads1115_addr)
+                ads_adafruit.gain = 1
+                hardware["ads_i2c"], hardware["ads_adafruit"] = i2c, ads_adafruit
+                hardware["ads_channels"] = [AnalogIn(ads_adafruit, channel) for channel in range(4)]
+            except Exception:
+                hardware["ads_i2c"] = hardware["ads_adafruit"] = None
+                hardware["ads_channels"] = []
+        return hardware
+
+    def start_drivers(self) -> None:
+        for driver in self.drivers.values():
+            driver.start()
+
+    def stop_drivers(self) -> None:
+        for driver in self.drivers.values():
+            driver.stop()
+
+    @staticmethod
+    def _soil_sampler(bus: Any, settings: sensor_config.SensorConfig) -> ads1115.Sampler:
+        rdy_gpio = settings.ads1115_rdy_gpio
+        return ads1115.Sampler(
+            bus,
+            settings.ads1115_addr,
+            data_rate=settings.ads1115_data_rate,
+            samples=settings.ads1115_samples,
+            reducer=settings.ads1115_reducer,
+            trim=settings.ads1115_trim,
+            mode=settings.ads1115_mode,
+            wait_ready=ads1115.gpio_ready_waiter(rdy_gpio, settings.ads1115_mode) if rdy_gpio is not None else None,
+        )
+
+    @staticmethod
+    def _lux_sensor(bus: Any, settings: sensor_config.SensorConfig) -> bh1750.BH1750:
+        return bh1750.BH1750(bus, settings.bh1750_addr, mtreg=settings.bh1750_mtreg, mode=settings.bh1750_mode)
 
     def read_all(self) -> Dict[str, Any]:
+        """Poll every driver once on the calling thread (simulation without background loops)."""
+        for driver in self.drivers.values():
+            driver.poll()
+        return self.latest()["readings"]
+
+    def _publish(self, name: str, reading: Dict[str, Any]) -> None:
         now = time.time()
-        data = {
-            "dht22": self._read_dht22(),
-            "ds18b20": self._read_ds18b20(),
-            "bh1750": self._read_bh1750(),
-            "soil": self._read_soil(),
-        }
+        if reading.get("status") in ("ok", "simulated"):
+            ts = _coerce_float(reading.get("ts")) or now
+            for field in SENSOR_STATS_FIELDS.get(name, ()):
+                self.stats.add(f"{name}.{field}", reading.get(field), ts)
         with self.lock:
-            self._update_dht22_history_locked(data.get("dht22", {}), now)
-            self.last_readings = data
+            plan = self.plans[name]
+            driver = self.drivers[name]
+            fast = sensor_schedule.is_fast(plan, self._active_keys_locked())
+            driver.interval = sensor_schedule.next_interval(
+                plan, driver.interval, self.last_readings.get(name), reading, fast
+            )
+            # copy on write: dicts handed out by latest() are never mutated
+            readings = dict(self.last_readings)
+            readings[name] = reading
+            self.last_readings = readings
             self.last_ts = now
-        return data
+            self.seq += 1
+            self.updated.notify_all()
 
-    def _update_dht22_history_locked(self, reading: Dict[str, Any], now: float) -> None:
-        status = reading.get("status")
-        if status not in ("ok", "simulated"):
-            return
-        try:
-            temp = float(reading.get("temperature"))
-            hum = float(reading.get("humidity"))
-        except (TypeError, ValueError):
-            return
-        ts = float(reading.get("ts") or now)
-        self.dht22_history.append((ts, temp, hum))
-        cutoff = now - 30 * 60
-        while self.dht22_history and self.dht22_history[0][0] < cutoff:
-            self.dht22_history.popleft()
+    def _active_keys_locked(self) -> List[str]:
+        keys = list(self.active_actuators)
+        keys.extend(role for role in self.active_actuators.values() if role)
+        return keys
 
-    def dht22_averages(self) -> Dict[str, Dict[str, Optional[float]]]:
+    def note_actuator(self, name: str, role: str, on: bool) -> None:
+        """Track actuator state for `fast_when` rules; wakes drivers that should speed up."""
+        key = name.strip().lower()
         with self.lock:
-            now = time.time()
-
-            def avg(window_seconds: int) -> Dict[str, Optional[float]]:
-                cutoff = now - window_seconds
-                temps: List[float] = []
-                hums: List[float] = []
-                for ts, temp, hum in self.dht22_history:
-                    if ts >= cutoff:
-                        temps.append(temp)
-                        hums.append(hum)
-                if not temps:
-                    return {"temperature": None, "humidity": None}
-                return {
-                    "temperature": round(sum(temps) / len(temps), 1),
-                    "humidity": round(sum(hums) / len(hums), 1),
-                }
+            if on:
+                self.active_actuators[key] = role.strip().lower()
+            else:
+                self.active_actuators.pop(key, None)
+            related = [
+                driver
+                for driver_name, driver in self.drivers.items()
+                if key in self.plans[driver_name].fast_when or role.strip().lower() in self.plans[driver_name].fast_when
+            ]
+            for driver in related:
+                if on:
+                    driver.interval = self.plans[driver.name].min_interval
+        for driver in related:
+            driver.wake()
+
+    def stale_after(self, name: str) -> float:
+        plan = self.plans.get(name)
+        if plan is None:
+            return float(SENSOR_STALE_SECONDS)
+        return sensor_schedule.stale_after(plan, SENSOR_STALE_SECONDS)
+
+    def schedule(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {"interval_s": round(driver.interval, 2), "last_read_ms": round(driver.last_duration * 1000, 1), "errors": driver.errors}
+            for name, driver in self.drivers.items()
+        }
+
+    def wait_for_update(self, seen: int, timeout: float) -> int:
+        """Block until a driver publishes after `seen` (or `timeout` passes); returns the new sequence number."""
+        with self.updated:
+            self.updated.wait_for(lambda: self.seq != seen, timeout)
+            return self.seq
 
-            return {"1m": avg(60), "5m": avg(300), "30m": avg(1800)}
+    def dht22_averages(self) -> Dict[str, Dict[str, Optional[float]]]:
+        now = time.time()
+        averages: Dict[str, Dict[str, Optional[float]]] = {}
+        for label in self.stats.labels:
+            temp = self.stats.window("dht22.temperature", label, now)
+            hum = self.stats.window("dht22.humidity", label, now)
+            averages[label] = {
+                "temperature": round(temp.mean, 1) if temp else None,
+                "humidity": round(hum.mean, 1) if hum else None,
+            }
+        return averages
 
     def _read_dht22(self) -> Dict[str, Any]:
         if self.simulation:
@@ -522,8 +846,7 @@ class SensorManager:
                 "ts": time.time(),
                 "status": "unavailable",
             }
-        gpio_pin = int(self.config.get("dht22_gpio", 17) if self.config else sensors_config.get("dht22_gpio", 17))
-        humidity, temperature = self.dht.read_retry(self.dht.DHT22, gpio_pin)
+        humidity, temperature = self.dht.read_retry(self.dht.DHT22, self.settings.dht22_gpio)
         return {
             "temperature": temperature,
             "humidity": humidity,
@@ -532,9 +855,8 @@ class SensorManager:
         }
 
     def _read_ds18b20(self) -> Dict[str, Any]:
-        config = dict(sensors_config)
-        config.update(self.config or {})
-        if not config.get("ds18b20_enabled", True):
+        settings = self.settings
+        if not settings.ds18b20_enabled:
             return {"temperature": None, "ts": time.time(), "status": "disabled"}
         if self.simulation:
             return {
@@ -542,20 +864,20 @@ class SensorManager:
                 "ts": time.time(),
                 "status": "simulated",
             }
-        base_path = Path("/sys/bus/w1/devices")
-        sensors = list(base_path.glob("28-*/w1_slave"))
-        if not sensors:
-            return {"temperature": None, "ts": time.time(), "status": "missing"}
-        try:
-            with sensors[0].open() as f:
-                lines = f.readlines()
-            if "YES" not in lines[0]:
-                return {"temperature": None, "ts": time.time(), "status": "crc_error"}
-            temp_str = lines[1].split("t=")[-1].strip()
-            temp_c = float(temp_str) / 1000.0
-            return {"temperature": temp_c, "ts": time.time(), "status": "ok"}
-        except Exception:
-            return {"temperature": None, "ts": time.time(), "status": "error"}
+        probes = self.ds18_probes.read() if self.ds18_probes else {}
+        if not probes:
+            return {"temperature": None, "ts": time.time(), "status": "missing", "probes": {}}
+        primary = settings.ds18b20_primary
+        if primary not in probes:
+            primary = next(iter(probes))
+        temp_c, status = probes[primary]
+        return {
+            "temperature": temp_c,
+            "ts": time.time(),
+            "status": status,
+            "probe": primary,
+            "probes": {probe: {"temperature": temp, "status": probe_status} for probe, (temp, probe_status) in probes.items()},
+        }
 
     def _read_bh1750(self) -> Dict[str, Any]:
         if self.simulation or not self.bus:
@@ -564,32 +886,14 @@ class SensorManager:
                 "ts": time.time(),
                 "status": "simulated" if self.simulation else "unavailable",
             }
-        config = dict(sensors_config)
-        config.update(self.config or {})
-        addr_env = str(config.get("bh1750_addr", "0x23"))
+        sensor = self.lux_sensor
+        if sensor is None:
+            return {"lux": None, "ts": time.time(), "status": "error"}
         try:
-            primary_addr = int(addr_env, 0)
+            lux, addr = sensor.read()
         except Exception:
-            primary_addr = 0x23
-        addr_candidates = [primary_addr]
-        if primary_addr == 0x23:
-            addr_candidates.append(0x5c)
-        elif primary_addr == 0x5c:
-            addr_candidates.append(0x23)
-
-        last_error = None
-        for addr in addr_candidates:
-            try:
-                # BH1750 needs a short measurement delay; use continuous high-res mode.
-                self.bus.write_byte(addr, 0x10)
-                time.sleep(0.18)
-                data = self.bus.read_i2c_block_data(addr, 0x10, 2)
-                raw = (data[1] + (256 * data[0])) / 1.2
-                return {"lux": round(raw, 1), "ts": time.time(), "status": "ok"}
-            except Exception as exc:
-                last_error = exc
-                continue
-        return {"lux": None, "ts": time.time(), "status": "error"}
+            return {"lux": None, "ts": time.time(), "status": "error"}
+        return {"lux": round(lux, 1), "ts": time.time(), "status": "ok", "addr": f"{addr:#04x}"}
 
     def _read_soil(self) -> Dict[str, Any]:
         if self.simulation:
@@ -601,35 +905,26 @@ class SensorManager:
                 "ts": time.time(),
                 "status": "simulated" if self.simulation else "unavailable",
             }
-        config = dict(sensors_config)
-        config.update(self.config or {})
-        addr_raw = config.get("ads1115_addr", "0x48")
-        try:
-            ads_addr = int(str(addr_raw), 0)
-        except Exception:
-            ads_addr = 0x48
-        if self.bus:
+        sampler = self.soil_sampler
+        if sampler:
             try:
-                ch0 = self._read_ads1115_raw(self.bus, ads_addr, 0)
-                ch1 = self._read_ads1115_raw(self.bus, ads_addr, 1)
-                ch2 = self._read_ads1115_raw(self.bus, ads_addr, 2)
-                ch3 = self._read_ads1115_raw(self.bus, ads_addr, 3)
-                return {
-                    "ch0": ch0,
-                    "ch1": ch1,
-                    "ch2": ch2,
-                    "ch3": ch3,
-                    "ts": time.time(),
-                    "status": "ok",
-                }
+                values = sampler.read((0, 1, 2, 3))
+                reading: Dict[str, Any] = {f"ch{channel}": round(value, 1) for channel, (value, _noise) in values.items()}
+                # standard error of each value, in raw counts; automation widens its hysteresis with it
+                reading["noise"] = {f"ch{channel}": round(noise, 1) for channel, (_value, noise) in values.items()}
+                reading["samples"] = sampler.samples
+                reading["ts"] = time.time()
+                reading["status"] = "ok"
+                return reading
             except Exception:
                 pass
-        if self.ads_adafruit and self.ads_channels:
+        channels = self.ads_channels
+        if self.ads_adafruit and channels:
             try:
-                ch0 = self.ads_channels[0].value
-                ch1 = self.ads_channels[1].value
-                ch2 = self.ads_channels[2].value
-                ch3 = self.ads_channels[3].value
+                ch0 = channels[0].value
+                ch1 = channels[1].value
+                ch2 = channels[2].value
+                ch3 = channels[3].value
                 return {
                     "ch0": ch0,
                     "ch1": ch1,
@@ -673,27 +968,6 @@ class SensorManager:
                 "status": "error",
             }
 
-    @staticmethod
-    def _read_ads1115_raw(bus: Any, addr: int, channel: int) -> Optional[int]:
-        if channel not in (0, 1, 2, 3):
-            raise ValueError("ADS1115 channel must be 0-3")
-        mux = 0x4 + channel
-        config = (
-            0x8000  # start single conversion
-            | (mux << 12)
-            | (0x1 << 9)  # gain = 1 (4.096V)
-            | 0x0100  # single-shot
-            | (0x4 << 5)  # 128 SPS
-            | 0x0003  # disable comparator
-        )
-        bus.write_i2c_block_data(addr, 0x01, [(config >> 8) & 0xFF, config & 0xFF])
-        time.sleep(0.008)
-        data = bus.read_i2c_block_data(addr, 0x00, 2)
-        raw = (data[0] << 8) | data[1]
-        if raw & 0x8000:
-            raw -= 1 << 16
-        return raw
-
     def latest(self) -> Dict[str, Any]:
         with self.lock:
             return {"readings": self.last_readings, "ts": self.last_ts}
@@ -877,7 +1151,8 @@ class LCDManager:
 
         pump_key = next((k for k in actuators if "PUMP" in k), None)
         heater_key = next((k for k in actuators if "HEATER" in k), None)
-        return {
+        context = self._stats_context(fmt_float)
+        context.update({
             "temp": fmt_float(dht.get("temperature"), 1, "--.-"),
             "hum": fmt_int(dht.get("humidity"), "--"),
             "lux": fmt_int(lux.get("lux"), "----"),
@@ -888,7 +1163,24 @@ class LCDManager:
             "time": datetime.now().strftime("%H:%M"),
             "pump": relay_label(pump_key) if pump_key else "",
             "heater": relay_label(heater_key) if heater_key else "",
-        }
+        })
+        return context
+
+    @staticmethod
+    def _stats_context(fmt_float: Callable[[Any, int, str], str]) -> Dict[str, str]:
+        """{<prefix>_avg|min|max|trend_<window>} tokens, e.g. {temp_avg_5m}; trend is per minute."""
+        stats = sensor_manager.stats
+        now = time.time()
+        context: Dict[str, str] = {}
+        for prefix, (metric, precision) in LCD_STATS_TOKENS.items():
+            for label in stats.labels:
+                window = stats.window(metric, label, now)
+                context[f"{prefix}_avg_{label}"] = fmt_float(window and window.mean, precision, "--")
+                context[f"{prefix}_min_{label}"] = fmt_float(window and window.min, precision, "--")
+                context[f"{prefix}_max_{label}"] = fmt_float(window and window.max, precision, "--")
+                slope = window.slope if window else None
+                context[f"{prefix}_trend_{label}"] = f"{slope:+.1f}" if slope is not None else "--"
+        return context
 
     def _apply_template(self, template: str, context: Dict[str, str]) -> str:
         def repl(match: Any) -> str:
@@ -947,9 +1239,9 @@ class AutomationEngine:
         self.pump_manual_override_until_ts: float = 0.0
         self.pump_manual_override_cancel_ts: float = 0.0
         self.pump_last_auto_ts: float = 0.0
-        self.pump_daily_seconds: float = 0.0
-        self.pump_daily_cache_ts: float = 0.0
         self.pump_block_until_ts: float = 0.0
+        self.pump_dry_active = False
+        self.pump_dry_band = 0.0
         self.pump_last_auto_off_ts: float = 0.0
         self.pump_last_auto_off_reason: str = ""
         self.auto_block_ts: Dict[str, float] = {}
@@ -971,9 +1263,9 @@ class AutomationEngine:
         self.heater_last_auto_off_reason = ""
         self.pump_manual_override_until_ts = 0.0
         self.pump_last_auto_ts = 0.0
-        self.pump_daily_seconds = 0.0
-        self.pump_daily_cache_ts = 0.0
         self.pump_block_until_ts = 0.0
+        self.pump_dry_active = False
+        self.pump_dry_band = 0.0
         self.pump_last_auto_off_ts = 0.0
         self.pump_last_auto_off_reason = ""
         self.auto_block_ts.clear()
@@ -1152,28 +1444,28 @@ class AutomationEngine:
             channel = "ch0"
         threshold = float(self.config.get("pump_dry_threshold", 0) or 0)
         if threshold <= 0:
+            self.pump_dry_active = False
             return False, None
         value = soil_entry.get(channel)
         try:
             value_f = float(value)
         except (TypeError, ValueError):
             return False, None
+        noise = soil_entry.get("noise")
+        noise_f = _coerce_float(noise.get(channel)) if isinstance(noise, dict) else None
+        band = max(float(self.config.get("pump_dry_hysteresis", 0) or 0), PUMP_DRY_NOISE_FACTOR * (noise_f or 0.0))
+        self.pump_dry_band = band
         dry_when_above = bool(self.config.get("pump_dry_when_above"))
-        is_dry = value_f >= threshold if dry_when_above else value_f <= threshold
+        # hysteresis: turning dry needs the value `band` past the threshold, staying dry only needs it not back across
+        margin = 0.0 if self.pump_dry_active else band
+        is_dry = value_f >= threshold + margin if dry_when_above else value_f <= threshold - margin
+        self.pump_dry_active = is_dry
         return is_dry, value_f
 
     def _pump_daily_used(self, pump_channel: Optional[str]) -> float:
         if not pump_channel:
-            self.pump_daily_seconds = 0.0
-            self.pump_daily_cache_ts = time.time()
             return 0.0
-        now_ts = time.time()
-        if now_ts - self.pump_daily_cache_ts < PUMP_DAILY_CACHE_SECONDS:
-            return self.pump_daily_seconds
-        used = _actuator_daily_seconds(pump_channel)
-        self.pump_daily_seconds = used
-        self.pump_daily_cache_ts = now_ts
-        return used
+        return self.actuator_manager.ledger.used(pump_channel)
 
     def _log_auto_block(self, channel: str, reason: str, error: Exception) -> None:
         now_ts = time.time()
@@ -1306,9 +1598,12 @@ class AutomationEngine:
                 "soil_channel": pump_soil_channel,
                 "dry_threshold": pump_threshold,
                 "dry_when_above": pump_dry_when_above,
+                "dry_band": round(self.pump_dry_band, 1),
+                "dry_active": self.pump_dry_active,
                 "pulse_seconds": pump_pulse_seconds,
                 "max_daily_seconds": pump_max_daily,
                 "daily_used_seconds": round(pump_daily_used, 1),
+                "daily_remaining_seconds": round(max(0.0, pump_max_daily - pump_daily_used), 1) if pump_max_daily > 0 else None,
                 "within_window": pump_within_window,
                 "block_until_ts": self.pump_block_until_ts or None,
                 "manual_override_until_ts": pump_manual_until or None,
@@ -1708,13 +2003,10 @@ class AutomationEngine:
                 return
             pulse_seconds = min(pulse_seconds, remaining)
         try:
-            applied_seconds = apply_actuator_command(pump_channel, True, pulse_seconds, "pump_auto_on")
+            apply_actuator_command(pump_channel, True, pulse_seconds, "pump_auto_on")
         except ActuationError as exc:
             self._log_auto_block(pump_channel, "pump_auto_on", exc)
             return
-        if applied_seconds:
-            self.pump_daily_seconds = daily_used + applied_seconds
-            self.pump_daily_cache_ts = time.time()
         self.pump_last_auto_ts = time.time()
 
 
@@ -1826,12 +2118,16 @@ class AlertManager:
         self.alerts: List[Dict[str, Any]] = []
         self.lock = threading.Lock()
         self.notifier = notifier
+        self.on_change: Optional[Callable[[Dict[str, Any]], None]] = None
 
     def add(self, severity: str, message: str) -> None:
         with self.lock:
             ts = datetime.now(timezone.utc).isoformat()
-            self.alerts.append({"severity": severity, "message": message, "ts": ts})
+            alert = {"severity": severity, "message": message, "ts": ts}
+            self.alerts.append(alert)
             self.alerts = self.alerts[-50:]
+        if self.on_change:
+            self.on_change(alert)
         log_event("alert", severity, message, None)
         if self.notifier:
             try:
@@ -1844,22 +2140,47 @@ class AlertManager:
             return list(self.alerts)
 
 
+def _retention_archive_dir(cfg: Dict[str, Any]) -> Path:
+    archive_dir_raw = str(cfg.get("archive_dir") or "data/archives")
+    archive_dir = (BASE_DIR / archive_dir_raw).resolve()
+    if not str(archive_dir).startswith(str(BASE_DIR.resolve())):
+        archive_dir = (DATA_DIR / "archives").resolve()
+    return archive_dir
+
+
 class RetentionManager:
     def __init__(self, config: Dict[str, Any]) -> None:
         self.lock = threading.Lock()
+        self.run_lock = threading.Lock()
         self.config: Dict[str, Any] = dict(DEFAULT_RETENTION)
         self.config.update(config or {})
         self.last_cleanup_ts: float = 0.0
+        self.last_summary: Optional[Dict[str, Any]] = None
+        self.progress: Optional[Dict[str, Any]] = None
+        # per instance: a second manager (tests, scripts) must not move the app's archive
+        self.archive = day_archive.DayArchive(_retention_archive_dir(self.config) / "sensor_log")
 
     def update_config(self, config: Dict[str, Any]) -> None:
         with self.lock:
             merged = dict(DEFAULT_RETENTION)
             merged.update(config or {})
             self.config = merged
+            self.archive.root = _retention_archive_dir(merged) / "sensor_log"
 
     def public_status(self) -> Dict[str, Any]:
         with self.lock:
-            return {"config": dict(self.config), "last_cleanup_ts": self.last_cleanup_ts or None}
+            return {
+                "config": dict(self.config),
+                "last_cleanup_ts": self.last_cleanup_ts or None,
+                "running": self.progress is not None,
+                "progress": dict(self.progress) if self.progress else None,
+                "last_summary": dict(self.last_summary) if self.last_summary else None,
+            }
+
+    def _set_progress(self, **fields: Any) -> None:
+        with self.lock:
+            if self.progress is not None:
+                self.progress.update(fields)
 
     def cleanup_if_due(self) -> None:
         with self.lock:
@@ -1878,7 +2199,113 @@ class RetentionManager:
             return
         self.cleanup_now()
 
+    def start_cleanup(self) -> bool:
+        """Run a cleanup on a background thread; False if one is already running."""
+        if not self.run_lock.acquire(blocking=False):
+            return False
+        try:
+            # the thread owns run_lock from here on and releases it when done
+            threading.Thread(target=self._run_cleanup, name="retention-cleanup", daemon=True).start()
+        except Exception:
+            self.run_lock.release()
+            raise
+        return True
+
+    def _backup(self, target: Path) -> None:
+        pause_s = max(0, RETENTION_BATCH_PAUSE_MS) / 1000.0
+
+        source = db_connections.connection(DB_PATH)
+
+        def progress(_status: int, remaining: int, total: int) -> None:
+            self._set_progress(backup_pages_remaining=remaining, backup_pages_total=total)
+            # rows written on the source connection update the copy in place, so readers
+            # flushing for read-your-writes are not left waiting for the whole backup
+            db_writer.commit_held(DB_PATH, source)
+
+        dest = sqlite3.connect(target)
+        try:
+            # The writer thread is held so the page-stepped copy is not restarted by another connection.
+            with db_writer.hold():
+                pages = RETENTION_BACKUP_PAGES if RETENTION_BACKUP_PAGES > 0 else -1
+                source.backup(dest, pages=pages, progress=progress, sleep=pause_s)
+        finally:
+            dest.close()
+
+    def _delete_in_batches(self, table: str, cutoff: float) -> int:
+        batch = max(1, RETENTION_BATCH_ROWS)
+        pause_s = max(0, RETENTION_BATCH_PAUSE_MS) / 1000.0
+        deleted = 0
+        while True:
+            # each batch is its own short transaction so loggers are never blocked for long
+            with db_connections.transaction(DB_PATH) as conn:
+                cur = conn.execute(
+                    f"DELETE FROM {table} WHERE id IN (SELECT id FROM {table} WHERE ts < ? ORDER BY ts LIMIT ?)",
+                    (cutoff, batch),
+                )
+                count = int(cur.rowcount or 0)
+            deleted += count
+            self._set_progress(table=table, deleted=deleted)
+            if count < batch:
+                return deleted
+            time.sleep(pause_s)
+
+    def _expire_partitions(self, spec: partitions.PartitionedTable, cutoff: float) -> int:
+        # whole months go with one DROP TABLE; only the boundary month is deleted row-wise
+        with db_connections.transaction(DB_PATH) as conn:
+            cur = conn.cursor()
+            whole, partial = partitions.split_expired(cur, spec, cutoff)
+            self._set_progress(table=spec.name, dropped_partitions=whole)
+            deleted = partitions.drop(cur, spec, whole)
+        for table in partial:
+            deleted += self._delete_in_batches(table, cutoff)
+        return deleted
+
+    def _incremental_vacuum(self) -> int:
+        conn = db_connections.connection(DB_PATH)
+        if RETENTION_VACUUM_PAGES <= 0 or conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            return 0
+        pause_s = max(0, RETENTION_BATCH_PAUSE_MS) / 1000.0
+        freed = 0
+        while True:
+            free_pages = int(conn.execute("PRAGMA freelist_count").fetchone()[0] or 0)
+            self._set_progress(freelist_pages=free_pages)
+            if free_pages <= 0:
+                return freed
+            conn.execute(f"PRAGMA incremental_vacuum({RETENTION_VACUUM_PAGES})").fetchall()
+            freed += min(free_pages, RETENTION_VACUUM_PAGES)
+            time.sleep(pause_s)
+
     def cleanup_now(self) -> None:
+        if not self.run_lock.acquire(blocking=False):
+            return
+        self._run_cleanup()
+
+    def _run_cleanup(self) -> None:
+        """Caller holds run_lock; released here."""
+        try:
+            with self.lock:
+                self.progress = {"phase": "starting", "started_ts": time.time()}
+            try:
+                summary = self._cleanup()
+            except Exception as exc:
+                with self.lock:
+                    phase = (self.progress or {}).get("phase")
+                    summary = {"error": str(exc), "phase": phase}
+                    # not retried before the next interval
+                    self.last_cleanup_ts = time.time()
+                    self.last_summary = summary
+                log_event("maintenance", "error", "Retention cleanup failed", summary)
+                return
+            with self.lock:
+                self.last_cleanup_ts = time.time()
+                self.last_summary = summary
+            log_event("maintenance", "info", "Retention cleanup completed", summary)
+        finally:
+            with self.lock:
+                self.progress = None
+            self.run_lock.release()
+
+    def _cleanup(self) -> Dict[str, Any]:
         with self.lock:
             cfg = dict(self.config)
         now = time.time()
@@ -1889,10 +2316,7 @@ class RetentionManager:
         actuator_days = int(cfg.get("actuator_log_days", 0) or 0)
 
         archive_enabled = bool(cfg.get("archive_enabled"))
-        archive_dir_raw = str(cfg.get("archive_dir") or "data/archives")
-        archive_dir = (BASE_DIR / archive_dir_raw).resolve()
-        if not str(archive_dir).startswith(str(BASE_DIR.resolve())):
-            archive_dir = (DATA_DIR / "archives").resolve()
+        archive_dir = _retention_archive_dir(cfg)
         if archive_enabled:
             try:
                 archive_dir.mkdir(parents=True, exist_ok=True)
@@ -1900,32 +2324,50 @@ class RetentionManager:
                 archive_enabled = False
 
         if archive_enabled:
+            self._set_progress(phase="archive")
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+            target = archive_dir / f"sera-{stamp}.db"
             try:
-                import shutil
-
-                stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
-                shutil.copy2(DB_PATH, archive_dir / f"sera-{stamp}.db")
-            except Exception:
-                pass
+                db_writer.flush()
+                self._backup(target)
+                summary["archive"] = target.name
+            except Exception as exc:
+                summary["archive_error"] = str(exc)
+                target.unlink(missing_ok=True)
 
         if sensor_days > 0 or event_days > 0 or actuator_days > 0:
-            conn = sqlite3.connect(DB_PATH)
-            cur = conn.cursor()
+            db_writer.flush()
+            self._set_progress(phase="delete")
             if sensor_days > 0:
                 cutoff = now - (sensor_days * 86400)
-                cur.execute("DELETE FROM sensor_log WHERE ts < ?", (cutoff,))
-                summary["sensor_log"] = int(cur.rowcount or 0)
+                if archive_enabled:
+                    self._set_progress(phase="day_archive")
+                    try:
+                        # read-only pass; rows are deleted below only if their days were written
+                        days = self.archive.export_before(
+                            db_connections.connection(DB_PATH).cursor(), cutoff
+                        )
+                        summary["day_archives"] = len(days)
+                    except Exception as exc:
+                        summary["day_archive_error"] = str(exc)
+                    self._set_progress(phase="delete")
+                if "day_archive_error" not in summary:
+                    summary["sensor_log"] = self._expire_partitions(SENSOR_LOG_PARTITIONS, cutoff)
+                    with db_connections.transaction(DB_PATH) as conn:
+                        sensor_rollup.trim(conn.cursor(), cutoff)
             if event_days > 0:
                 cutoff = now - (event_days * 86400)
-                cur.execute("DELETE FROM event_log WHERE ts < ?", (cutoff,))
-                summary["event_log"] = int(cur.rowcount or 0)
+                summary["event_log"] = self._delete_in_batches("event_log", cutoff)
             if actuator_days > 0:
-                cur.execute("DELETE FROM actuator_log WHERE ts < datetime('now', ?)", (f"-{actuator_days} days",))
-                summary["actuator_log"] = int(cur.rowcount or 0)
-            conn.commit()
-            conn.close()
+                cutoff = now - (actuator_days * 86400)
+                summary["actuator_log"] = self._delete_in_batches("actuator_log", cutoff)
+                with db_connections.transaction(DB_PATH) as conn:
+                    conn.execute("DELETE FROM actuator_interval WHERE end_ts < ?", (cutoff,))
+            self._set_progress(phase="vacuum", table=None)
+            summary["vacuum_pages"] = self._incremental_vacuum()
 
         if sensor_days > 0:
+            self._set_progress(phase="csv")
             cutoff_date = datetime.now(timezone.utc).date() - timedelta(days=sensor_days)
             for path in SENSOR_CSV_LOG_DIR.glob("sensor_log_*.csv"):
                 m = re.search(r"sensor_log_(\\d{4}-\\d{2}-\\d{2})\\.csv$", path.name)
@@ -1948,9 +2390,7 @@ class RetentionManager:
                 except Exception:
                     continue
 
-        with self.lock:
-            self.last_cleanup_ts = time.time()
-        log_event("maintenance", "info", "Retention cleanup completed", summary)
+        return summary
 
 
 class AppState:
@@ -2014,6 +2454,166 @@ class AppState:
         with self.lock:
             return dict(self.alerts_config)
 
+
+class StatusSnapshot:
+    """The /api/status payload, built once and shared by every poller.
+
+    `invalidate()` marks it stale (sensor tick, actuator change, alert, any
+    mutating request); otherwise it is reused for up to `max_age_s` because
+    ages and cooldowns drift with time. The version only moves when the
+    content changes, so it doubles as the ETag. The last `history` versions
+    are kept so `delta()` can answer `?since=` with a merge patch.
+    """
+
+    # change on every build without meaning anything new
+    VOLATILE_FIELDS = ("timestamp", "data_age_sec")
+
+    MAX_VARIANTS = 16
+
+    def __init__(self, builder: Callable[[], Dict[str, Any]], max_age_s: float, history: int = 32) -> None:
+        self.builder = builder
+        self.max_age_s = max(0.0, max_age_s)
+        self.history_size = max(0, history)
+        self._history: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._deltas: Dict[int, bytes] = {}
+        self._variants: "OrderedDict[Tuple[str, ...], StatusSnapshot]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.epoch = uuid.uuid4().hex[:8]
+        self.version = 0
+        self._dirty = True
+        self._built_at = 0.0
+        self._digest: Optional[int] = None
+        self._payload: Dict[str, Any] = {}
+        self._body = b""
+
+    def invalidate(self) -> None:
+        # lock-free: hooks may fire while a builder runs on this thread
+        self._dirty = True
+        for child in tuple(self._variants.values()):
+            child.invalidate()
+
+    def variant(self, key: Tuple[str, ...], builder: Callable[[], Dict[str, Any]]) -> "StatusSnapshot":
+        """Snapshot of a field subset, invalidated together with this one (LRU-bounded)."""
+        with self.lock:
+            child = self._variants.get(key)
+            if child is None:
+                child = StatusSnapshot(builder, self.max_age_s, self.history_size)
+                self._variants[key] = child
+                while len(self._variants) > self.MAX_VARIANTS:
+                    self._variants.popitem(last=False)
+            else:
+                self._variants.move_to_end(key)
+            return child
+
+    @property
+    def etag(self) -> str:
+        return f"{self.epoch}-{self.version}"
+
+    def _refresh(self) -> None:
+        if not self._dirty and time.monotonic() - self._built_at < self.max_age_s:
+            return
+        self._dirty = False
+        payload = self.builder()
+        stable = {key: value for key, value in payload.items() if key not in self.VOLATILE_FIELDS}
+        digest = hash(json.dumps(stable, sort_keys=True, default=str))
+        if digest != self._digest:
+            self._digest = digest
+            self.version += 1
+        payload["version"] = self.version
+        self._payload = payload
+        self._body = app.json.dumps(payload).encode("utf-8")
+        self._deltas = {}
+        if self.history_size:
+            self._history[self.version] = payload
+            self._history.move_to_end(self.version)
+            while len(self._history) > self.history_size:
+                self._history.popitem(last=False)
+        self._built_at = time.monotonic()
+
+    def payload(self) -> Dict[str, Any]:
+        """Shared dict; callers must not modify it."""
+        with self.lock:
+            self._refresh()
+            return self._payload
+
+    def response(self) -> Tuple[bytes, str]:
+        with self.lock:
+            self._refresh()
+            return self._body, self.etag
+
+    def _since_version(self, since: str) -> Optional[int]:
+        """`<version>` or an ETag-style `<epoch>-<version>`; None if it is not from this process."""
+        token = since.strip()
+        if token.startswith("W/"):
+            token = token[2:]
+        epoch, _, raw = token.strip('"').rpartition("-")
+        if epoch and epoch != self.epoch:
+            return None
+        try:
+            return int(raw)
+        except ValueError:
+            return None
+
+    def delta(self, since: str) -> Optional[Tuple[bytes, str]]:
+        """Merge patch from version `since` to now, or None when the full payload must be sent."""
+        with self.lock:
+            self._refresh()
+            version = self._since_version(since)
+            base = self._history.get(version) if version is not None else None
+            if base is None:
+                return None
+            body = self._deltas.get(version)
+            if body is None:
+                patch = _merge_patch(base, self._payload)
+                for key in self.VOLATILE_FIELDS:
+                    if key in self._payload:
+                        patch[key] = self._payload[key]
+                body = app.json.dumps({"version": self.version, "since": version, "patch": patch}).encode("utf-8")
+                self._deltas[version] = body
+            return body, self.etag
+
+
+class EventHub:
+    """Fans live events out to /api/stream clients, one bounded queue per client."""
+
+    def __init__(self, max_clients: int, queue_size: int = 256) -> None:
+        self.max_clients = max(0, max_clients)
+        self.queue_size = max(1, queue_size)
+        self.lock = threading.Lock()
+        self.subscribers: List["queue.Queue[Tuple[int, str, Dict[str, Any]]]"] = []
+        self.seq = 0
+        self.dropped = 0
+
+    def subscribe(self) -> Optional["queue.Queue[Tuple[int, str, Dict[str, Any]]]"]:
+        with self.lock:
+            if len(self.subscribers) >= self.max_clients:
+                return None
+            sub: "queue.Queue[Tuple[int, str, Dict[str, Any]]]" = queue.Queue(self.queue_size)
+            self.subscribers.append(sub)
+            return sub
+
+    def unsubscribe(self, sub: "queue.Queue[Tuple[int, str, Dict[str, Any]]]") -> None:
+        with self.lock:
+            if sub in self.subscribers:
+                self.subscribers.remove(sub)
+
+    def publish(self, event: str, data: Dict[str, Any]) -> None:
+        with self.lock:
+            if not self.subscribers:
+                return
+            self.seq += 1
+            for sub in self.subscribers:
+                try:
+                    sub.put_nowait((self.seq, event, data))
+                except queue.Full:
+                    # a stalled client misses events; its next status patch still catches it up
+                    self.dropped += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {"clients": len(self.subscribers), "max_clients": self.max_clients, "dropped": self.dropped}
+
+
 # Flask app factory
 app = Flask(__name__)
 backend = GPIOBackend()
@@ -2166,8 +2766,18 @@ def load_sensors_config() -> Dict[str, Any]:
     defaults = {
         "dht22_gpio": int(os.getenv("DHT22_GPIO", "17")),
         "bh1750_addr": os.getenv("BH1750_ADDR", "0x23"),
+        "bh1750_mtreg": 69,
+        "bh1750_mode": "high",
         "ads1115_addr": "0x48",
+        "ads1115_mode": "single",
+        "ads1115_data_rate": 860,
+        "ads1115_samples": 8,
+        "ads1115_reducer": "median",
+        "ads1115_trim": 0.2,
+        "ads1115_rdy_gpio": None,
         "ds18b20_enabled": True,
+        "ds18b20_primary": None,
+        "stats_windows": list(rolling_stats.DEFAULT_WINDOWS),
         "lcd_enabled": True,
         "lcd_addr": "0x3F",
         "lcd_port": 1,
@@ -2245,6 +2855,17 @@ def load_catalog_config() -> Optional[Dict[str, Any]]:
     return None
 
 
+def reload_catalog() -> CatalogIndex:
+    """Re-read catalog.json and swap in a freshly built index."""
+    global catalog_index
+    catalog_index = CatalogIndex(load_catalog_config())
+    return catalog_index
+
+
+def _catalog() -> CatalogIndex:
+    return catalog_index
+
+
 def _is_hhmm(value: Any) -> bool:
     if not isinstance(value, str):
         return False
@@ -2299,6 +2920,40 @@ def validate_channels_payload(channels: Any) -> List[str]:
     return errors
 
 
+def _validate_polling(polling: Any) -> List[str]:
+    if not isinstance(polling, dict):
+        return ["sensors.polling must be an object"]
+    errors: List[str] = []
+    for name, entry in polling.items():
+        where = f"sensors.polling.{name}"
+        if name not in sensor_schedule.DEFAULT_POLLING:
+            errors.append(f"{where} unknown sensor (allowed: {', '.join(sensor_schedule.DEFAULT_POLLING)})")
+            continue
+        if not isinstance(entry, dict):
+            errors.append(f"{where} must be an object")
+            continue
+        for key in ("interval", "min_interval", "max_interval", "change_threshold"):
+            value = entry.get(key)
+            if key == "change_threshold" and isinstance(value, dict):
+                fields = SENSOR_STATS_FIELDS[name]
+                for field, limit in value.items():
+                    if field not in fields:
+                        errors.append(f"{where}.{key}.{field} unknown field (allowed: {', '.join(fields)})")
+                    elif isinstance(limit, bool) or not isinstance(limit, (int, float)) or limit <= 0:
+                        errors.append(f"{where}.{key}.{field} must be a positive number")
+                continue
+            if key in entry and value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0):
+                errors.append(f"{where}.{key} must be a positive number")
+        fast_when = entry.get("fast_when")
+        if fast_when is not None and (not isinstance(fast_when, list) or not all(isinstance(item, str) for item in fast_when)):
+            errors.append(f"{where}.fast_when must be a list of actuator names or roles")
+    return errors
+
+
+def _is_w1_id(value: str) -> bool:
+    return bool(re.fullmatch(r"[0-9a-f]{2}-[0-9a-f]{12}", value))
+
+
 def validate_sensors_payload(sensors: Any) -> List[str]:
     errors: List[str] = []
     if not isinstance(sensors, dict):
@@ -2310,12 +2965,48 @@ def validate_sensors_payload(sensors: Any) -> List[str]:
         errors.append("sensors.dht22_gpio must be int")
     if "ds18b20_enabled" in sensors and not isinstance(sensors.get("ds18b20_enabled"), bool):
         errors.append("sensors.ds18b20_enabled must be bool")
+    primary = sensors.get("ds18b20_primary")
+    if primary is not None and (not isinstance(primary, str) or not _is_w1_id(primary)):
+        errors.append("sensors.ds18b20_primary must be a 1-Wire id like 28-0123456789ab or null")
     if "lcd_enabled" in sensors and not isinstance(sensors.get("lcd_enabled"), bool):
         errors.append("sensors.lcd_enabled must be bool")
     if "lcd_rows" in sensors and not isinstance(sensors.get("lcd_rows"), int):
         errors.append("sensors.lcd_rows must be int")
     if "lcd_lines" in sensors and not isinstance(sensors.get("lcd_lines"), list):
         errors.append("sensors.lcd_lines must be list")
+    if "polling" in sensors:
+        errors.extend(_validate_polling(sensors.get("polling")))
+    windows = sensors.get("stats_windows")
+    if "stats_windows" in sensors and (
+        not isinstance(windows, list)
+        or not windows
+        or any(isinstance(item, bool) or not isinstance(item, int) or item <= 0 for item in windows)
+    ):
+        errors.append("sensors.stats_windows must be a non-empty list of positive seconds")
+    if "ads1115_mode" in sensors and sensors.get("ads1115_mode") not in ads1115.MODES:
+        errors.append(f"sensors.ads1115_mode must be one of {'|'.join(ads1115.MODES)}")
+    if "ads1115_data_rate" in sensors and sensors.get("ads1115_data_rate") not in ads1115.DATA_RATES:
+        errors.append(f"sensors.ads1115_data_rate must be one of {', '.join(str(rate) for rate in ads1115.DATA_RATES)}")
+    samples = sensors.get("ads1115_samples")
+    if "ads1115_samples" in sensors and (isinstance(samples, bool) or not isinstance(samples, int) or not 1 <= samples <= 64):
+        errors.append("sensors.ads1115_samples must be int 1-64")
+    if "ads1115_reducer" in sensors and sensors.get("ads1115_reducer") not in ads1115.REDUCERS:
+        errors.append(f"sensors.ads1115_reducer must be one of {'|'.join(ads1115.REDUCERS)}")
+    trim = sensors.get("ads1115_trim")
+    if "ads1115_trim" in sensors and (
+        isinstance(trim, bool) or not isinstance(trim, (int, float)) or not 0 <= trim <= ads1115.TRIM_MAX
+    ):
+        errors.append(f"sensors.ads1115_trim must be a number 0-{ads1115.TRIM_MAX}")
+    mtreg = sensors.get("bh1750_mtreg")
+    if "bh1750_mtreg" in sensors and (
+        isinstance(mtreg, bool) or not isinstance(mtreg, int) or not bh1750.MTREG_MIN <= mtreg <= bh1750.MTREG_MAX
+    ):
+        errors.append(f"sensors.bh1750_mtreg must be int {bh1750.MTREG_MIN}-{bh1750.MTREG_MAX}")
+    if "bh1750_mode" in sensors and sensors.get("bh1750_mode") not in bh1750.MODES:
+        errors.append(f"sensors.bh1750_mode must be one of {'|'.join(bh1750.MODES)}")
+    rdy_gpio = sensors.get("ads1115_rdy_gpio")
+    if rdy_gpio is not None and (isinstance(rdy_gpio, bool) or not isinstance(rdy_gpio, int)):
+        errors.append("sensors.ads1115_rdy_gpio must be int or null")
     if isinstance(sensors.get("lcd_rows"), int) and isinstance(sensors.get("lcd_lines"), list):
         rows = int(sensors.get("lcd_rows") or 0)
         lines = sensors.get("lcd_lines") or []
@@ -2377,6 +3068,9 @@ def validate_automation_payload(cfg: Any) -> List[str]:
     for key in ("window_start", "window_end", "reset_time", "fan_night_start", "fan_night_end", "heater_night_start", "heater_night_end", "pump_window_start", "pump_window_end"):
         if key in cfg and not _is_hhmm(cfg.get(key)):
             errors.append(f"automation.{key} must be HH:MM")
+    hysteresis = cfg.get("pump_dry_hysteresis")
+    if "pump_dry_hysteresis" in cfg and (isinstance(hysteresis, bool) or not isinstance(hysteresis, (int, float)) or hysteresis < 0):
+        errors.append("automation.pump_dry_hysteresis must be a number >= 0")
     return errors
 
 
@@ -2500,7 +3194,8 @@ sensors_config = load_sensors_config()
 notifications_config = load_notifications_config()
 retention_config = load_retention_config()
 panel_config = load_panel_config()
-catalog_config = load_catalog_config()
+catalog_index = reload_catalog()
+stream_hub = EventHub(STREAM_MAX_CLIENTS)
 actuator_manager = ActuatorManager(backend, channel_config)
 sensor_manager = SensorManager()
 sensor_manager.reload_config(sensors_config)
@@ -2510,6 +3205,26 @@ alerts = AlertManager(notifications)
 app_state = AppState(actuator_manager, sensor_manager, automation_engine, alerts)
 lcd_manager = LCDManager(sensors_config)
 retention_manager = RetentionManager(retention_config)
+status_snapshot = StatusSnapshot(
+    lambda: api_status_payload(), STATUS_SNAPSHOT_MAX_AGE_MS / 1000.0, STATUS_DELTA_HISTORY
+)
+
+
+def _on_actuator_change(name: str, on: bool, reason: str, transitioned: bool) -> None:
+    status_snapshot.invalidate()
+    if transitioned:
+        role = (actuator_manager.channels.get(name) or {}).get("role") or (_find_catalog_actuator(name) or {}).get("role")
+        sensor_manager.note_actuator(name, str(role or ""), on)
+        stream_hub.publish("actuator", {"name": name, "state": "on" if on else "off", "reason": reason, "ts": time.time()})
+
+
+def _on_alert(alert: Dict[str, Any]) -> None:
+    status_snapshot.invalidate()
+    stream_hub.publish("alert", alert)
+
+
+actuator_manager.on_change = _on_actuator_change
+alerts.on_change = _on_alert
 app_state.update_limits(panel_config.get("limits") or {})
 app_state.update_alerts(panel_config.get("alerts") or {})
 automation_engine.config.update(panel_config.get("automation") or {})
@@ -2525,6 +3240,31 @@ NODE_SENSOR_STATE: Dict[str, Dict[str, Any]] = {}
 
 # Database
 
+ACTUATOR_LOG_INSERT_SQL = "INSERT INTO actuator_log (ts, name, state, reason, seconds) VALUES (?, ?, ?, ?, ?)"
+ACTUATOR_INTERVAL_OPEN_SQL = "INSERT INTO actuator_interval (name, start_ts, reason) VALUES (?, ?, ?)"
+ACTUATOR_INTERVAL_CLOSE_SQL = "UPDATE actuator_interval SET end_ts = ? WHERE name = ? AND end_ts IS NULL"
+EVENT_LOG_INSERT_SQL = "INSERT INTO event_log (ts, category, level, message, meta) VALUES (?, ?, ?, ?, ?)"
+SENSOR_LOG_INSERT_SQL = (
+    "INSERT INTO sensor_log (ts, dht_temp, dht_hum, ds18_temp, lux, soil_ch0, soil_ch1, soil_ch2, soil_ch3) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+TELEMETRY_LOG_INSERT_SQL = (
+    "INSERT INTO telemetry_log (ts, node_id, zone, metric, value, unit, source, quality) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+# sensor_log and telemetry_sample are views over monthly partition tables (see partitions.py)
+SENSOR_LOG_PARTITIONS = partitions.PartitionedTable(
+    name="sensor_log",
+    column_defs=(("ts", "REAL NOT NULL"),) + tuple((col, "REAL") for col in sensor_rollup.ROLLUP_COLUMNS),
+    triggers=(sensor_rollup.trigger_sql,),
+)
+TELEMETRY_SAMPLE_PARTITIONS = partitions.PartitionedTable(
+    name="telemetry_sample",
+    column_defs=(("ts", "REAL NOT NULL"), ("series_id", "INTEGER NOT NULL"), ("value", "REAL")),
+    indexes=("series_id, ts", "ts"),
+)
+
+
 def _ensure_column(cur: sqlite3.Cursor, table: str, column: str, col_type: str) -> None:
     cur.execute(f"PRAGMA table_info({table})")
     existing = {row[1] for row in cur.fetchall()}
@@ -2532,83 +3272,293 @@ def _ensure_column(cur: sqlite3.Cursor, table: str, column: str, col_type: str)
         cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
 
 
-def init_db() -> None:
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
+# Series key columns; NULL is stored as '' so the UNIQUE constraint can intern it.
+TELEMETRY_SERIES_COLUMNS = ("node_id", "zone", "metric", "unit", "source", "quality")
+
+
+def _ensure_telemetry_schema(cur: sqlite3.Cursor) -> None:
+    """telemetry_log is a view over telemetry_sample rows keyed by an interned telemetry_series id."""
     cur.execute(
         """
-        CREATE TABLE IF NOT EXISTS actuator_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT,
-            state TEXT,
-            reason TEXT,
-            ts DATETIME DEFAULT CURRENT_TIMESTAMP,
-            seconds INTEGER
+        CREATE TABLE IF NOT EXISTS telemetry_series (
+            id INTEGER PRIMARY KEY,
+            node_id TEXT NOT NULL DEFAULT '',
+            zone TEXT NOT NULL DEFAULT '',
+            metric TEXT NOT NULL,
+            unit TEXT NOT NULL DEFAULT '',
+            source TEXT NOT NULL DEFAULT '',
+            quality TEXT NOT NULL DEFAULT '',
+            UNIQUE (zone, metric, node_id, unit, source, quality)
         )
         """
     )
     cur.execute(
         """
-        CREATE TABLE IF NOT EXISTS sensor_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+        CREATE TABLE IF NOT EXISTS telemetry_sample (
+            id INTEGER PRIMARY KEY,
             ts REAL NOT NULL,
-            dht_temp REAL,
-            dht_hum REAL,
-            ds18_temp REAL,
-            lux REAL,
-            soil_ch0 REAL,
-            soil_ch1 REAL,
-            soil_ch2 REAL,
-            soil_ch3 REAL
+            series_id INTEGER NOT NULL,
+            value REAL
         )
         """
     )
+
+    cur.execute("SELECT type FROM sqlite_master WHERE name = 'telemetry_log'")
+    row = cur.fetchone()
+    if row and row[0] == "table":
+        # one-time migration from the old wide TEXT table
+        cols = ", ".join(TELEMETRY_SERIES_COLUMNS)
+        keyed = ", ".join(f"IFNULL({col}, '')" for col in TELEMETRY_SERIES_COLUMNS)
+        match = " AND ".join(f"s.{col} = IFNULL(t.{col}, '')" for col in TELEMETRY_SERIES_COLUMNS)
+        cur.execute(f"INSERT OR IGNORE INTO telemetry_series ({cols}) SELECT DISTINCT {keyed} FROM telemetry_log")
+        cur.execute(
+            f"""
+            INSERT INTO telemetry_sample (id, ts, series_id, value)
+            SELECT t.id, t.ts, s.id, t.value
+            FROM telemetry_log t JOIN telemetry_series s ON {match}
+            """
+        )
+        cur.execute("DROP TABLE telemetry_log")
     cur.execute(
         """
-        CREATE TABLE IF NOT EXISTS telemetry_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ts REAL NOT NULL,
-            node_id TEXT,
-            zone TEXT,
-            metric TEXT NOT NULL,
-            value REAL,
-            unit TEXT,
-            source TEXT,
-            quality TEXT
-        )
+        CREATE VIEW IF NOT EXISTS telemetry_log AS
+        SELECT
+            t.id AS id,
+            t.ts AS ts,
+            NULLIF(s.node_id, '') AS node_id,
+            NULLIF(s.zone, '') AS zone,
+            s.metric AS metric,
+            t.value AS value,
+            NULLIF(s.unit, '') AS unit,
+            NULLIF(s.source, '') AS source,
+            NULLIF(s.quality, '') AS quality
+        FROM telemetry_sample t JOIN telemetry_series s ON s.id = t.series_id
         """
     )
+    new_keyed = ", ".join(f"IFNULL(NEW.{col}, '')" for col in TELEMETRY_SERIES_COLUMNS)
+    new_match = " AND ".join(f"{col} = IFNULL(NEW.{col}, '')" for col in TELEMETRY_SERIES_COLUMNS)
     cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS event_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ts REAL NOT NULL,
-            category TEXT,
-            level TEXT,
-            message TEXT,
-            meta TEXT
-        )
+        f"""
+        CREATE TRIGGER IF NOT EXISTS telemetry_log_insert INSTEAD OF INSERT ON telemetry_log BEGIN
+            INSERT OR IGNORE INTO telemetry_series ({", ".join(TELEMETRY_SERIES_COLUMNS)}) VALUES ({new_keyed});
+            INSERT INTO telemetry_sample (ts, series_id, value)
+            VALUES (NEW.ts, (SELECT id FROM telemetry_series WHERE {new_match}), NEW.value);
+        END
         """
     )
-    _ensure_column(cur, "sensor_log", "soil_ch2", "REAL")
-    _ensure_column(cur, "sensor_log", "soil_ch3", "REAL")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_sensor_log_ts ON sensor_log (ts)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_telemetry_log_ts ON telemetry_log (ts)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_telemetry_log_zone_metric_ts ON telemetry_log (zone, metric, ts)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_event_log_ts ON event_log (ts)")
-    conn.commit()
-    conn.close()
 
 
-def log_actuation(name: str, on: bool, reason: str, seconds: Optional[int]) -> None:
-    conn = sqlite3.connect(DB_PATH)
+def _ensure_actuator_log_epoch(cur: sqlite3.Cursor) -> None:
+    """Rebuild a legacy actuator_log (text CURRENT_TIMESTAMP ts) with REAL epoch seconds."""
+    cur.execute("PRAGMA table_info(actuator_log)")
+    ts_type = next((str(row[2]).upper() for row in cur.fetchall() if row[1] == "ts"), "REAL")
+    if ts_type == "REAL":
+        return
+    cur.execute("ALTER TABLE actuator_log RENAME TO actuator_log_legacy")
+    cur.execute(
+        """
+        CREATE TABLE actuator_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            state TEXT,
+            reason TEXT,
+            ts REAL NOT NULL,
+            seconds INTEGER
+        )
+        """
+    )
+    cur.execute(
+        """
+        INSERT INTO actuator_log (id, name, state, reason, ts, seconds)
+        SELECT
+            id,
+            name,
+            state,
+            reason,
+            CASE WHEN typeof(ts) = 'text' THEN (julianday(ts) - 2440587.5) * 86400.0 ELSE ts END,
+            seconds
+        FROM actuator_log_legacy
+        WHERE ts IS NOT NULL
+        """
+    )
+    cur.execute("DROP TABLE actuator_log_legacy")
+
+
+def _ensure_actuator_interval_schema(cur: sqlite3.Cursor) -> None:
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'actuator_interval'")
+    exists = cur.fetchone() is not None
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS actuator_interval (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            start_ts REAL NOT NULL,
+            end_ts REAL,
+            reason TEXT
+        )
+        """
+    )
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_actuator_interval_start ON actuator_interval (start_ts)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_actuator_interval_end ON actuator_interval (end_ts)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_actuator_interval_open ON actuator_interval (name) WHERE end_ts IS NULL")
+    if not exists:
+        _backfill_actuator_intervals(cur)
+
+
+def _backfill_actuator_intervals(cur: sqlite3.Cursor) -> None:
+    # actuator_log only has explicit ON/OFF rows; timed ONs ended via auto_off, so they close at ts + seconds.
+    cur.execute("SELECT name, state, reason, ts, seconds FROM actuator_log ORDER BY ts ASC, id ASC")
+    open_intervals: Dict[str, List[Any]] = {}
+    closed: List[Tuple[str, float, Optional[float], Optional[str]]] = []
+
+    def close(name: str, end_ts: float) -> None:
+        start_ts, planned_end, reason = open_intervals.pop(name)
+        end = end_ts if planned_end is None else min(planned_end, end_ts)
+        closed.append((name, start_ts, max(start_ts, end), reason))
+
+    for name, state, reason, ts, seconds in cur.fetchall():
+        if not name or ts is None:
+            continue
+        ts = float(ts)
+        for open_name in list(open_intervals):
+            planned_end = open_intervals[open_name][1]
+            if planned_end is not None and planned_end <= ts:
+                close(open_name, planned_end)
+        if state == "on":
+            if name in open_intervals:
+                close(name, ts)
+            open_intervals[name] = [ts, ts + float(seconds) if seconds else None, reason]
+        elif name == "ALL":
+            for open_name in list(open_intervals):
+                close(open_name, ts)
+        elif name in open_intervals:
+            close(name, ts)
+    for name, (start_ts, planned_end, reason) in open_intervals.items():
+        closed.append((name, start_ts, planned_end, reason))
+    cur.executemany(
+        "INSERT INTO actuator_interval (name, start_ts, end_ts, reason) VALUES (?, ?, ?, ?)",
+        closed,
+    )
+
+
+def _ensure_partitions(cur: sqlite3.Cursor) -> None:
+    for spec in (SENSOR_LOG_PARTITIONS, TELEMETRY_SAMPLE_PARTITIONS):
+        partitions.ensure(cur, spec)
+
+
+def _close_dangling_actuator_intervals(cur: sqlite3.Cursor) -> None:
+    """Intervals left open by a restart end at the last sensor_log heartbeat (channels start OFF)."""
+    on_now = [name for name, info in actuator_manager.state.items() if info.get("state")]
+    placeholders = ", ".join("?" for _ in on_now)
+    skip = f"AND name NOT IN ({placeholders})" if on_now else ""
+    cur.execute(
+        f"""
+        UPDATE actuator_interval
+        SET end_ts = MAX(start_ts, COALESCE((SELECT ts FROM sensor_log ORDER BY ts DESC LIMIT 1), start_ts))
+        WHERE end_ts IS NULL {skip}
+        """,
+        on_now,
+    )
+
+
+def record_actuator_transition(name: str, on: bool, reason: str) -> None:
+    ts = time.time()
+    # a repeated ON closes the previous interval first, so at most one stays open per channel
+    db_writer.submit(DB_PATH, ACTUATOR_INTERVAL_CLOSE_SQL, (ts, name))
+    if on:
+        db_writer.submit(DB_PATH, ACTUATOR_INTERVAL_OPEN_SQL, (name, ts, reason))
+
+
+def _actuator_on_seconds(cur: sqlite3.Cursor, from_ts: float, to_ts: float) -> Dict[str, float]:
+    """Per-channel ON seconds overlapping [from_ts, to_ts] (open intervals count up to to_ts)."""
+    cur.execute(
+        """
+        SELECT name, SUM(MIN(COALESCE(end_ts, ?), ?) - MAX(start_ts, ?))
+        FROM actuator_interval
+        WHERE start_ts < ? AND (end_ts IS NULL OR end_ts > ?)
+        GROUP BY name
+        """,
+        (to_ts, to_ts, from_ts, to_ts, from_ts),
+    )
+    return {name: max(0.0, float(total or 0)) for name, total in cur.fetchall() if name}
+
+
+def _rebuild_runtime_ledger(cur: sqlite3.Cursor) -> None:
+    cur.execute(
+        """
+        SELECT name, ts, seconds
+        FROM actuator_log
+        WHERE state = 'on'
+          AND seconds IS NOT NULL
+          AND ts >= ?
+        """,
+        (time.time() - RUNTIME_LEDGER_WINDOW_SECONDS,),
+    )
+    actuator_manager.ledger.reset([(row[0], row[1], row[2]) for row in cur.fetchall() if row[0] and row[1]])
+
+
+def init_db() -> None:
+    conn = db_connections.connection(DB_PATH)
     cur = conn.cursor()
     cur.execute(
-        "INSERT INTO actuator_log (name, state, reason, seconds) VALUES (?, ?, ?, ?)",
-        (name, "on" if on else "off", reason, seconds),
+        """
+        CREATE TABLE IF NOT EXISTS actuator_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            state TEXT,
+            reason TEXT,
+            ts REAL NOT NULL,
+            seconds INTEGER
+        )
+        """
+    )
+    _ensure_actuator_log_epoch(cur)
+    _ensure_actuator_interval_schema(cur)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sensor_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts REAL NOT NULL,
+            dht_temp REAL,
+            dht_hum REAL,
+            ds18_temp REAL,
+            lux REAL,
+            soil_ch0 REAL,
+            soil_ch1 REAL,
+            soil_ch2 REAL,
+            soil_ch3 REAL
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS event_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts REAL NOT NULL,
+            category TEXT,
+            level TEXT,
+            message TEXT,
+            meta TEXT
+        )
+        """
     )
+    _ensure_column(cur, "sensor_log", "soil_ch2", "REAL")
+    _ensure_column(cur, "sensor_log", "soil_ch3", "REAL")
+    _ensure_telemetry_schema(cur)
+    _ensure_partitions(cur)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_event_log_ts ON event_log (ts)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_actuator_log_ts ON actuator_log (ts)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_actuator_log_name_ts ON actuator_log (name, ts)")
+    sensor_rollup.ensure_schema(cur)
+    conn.commit()
+    db_writer.flush()
+    _close_dangling_actuator_intervals(cur)
     conn.commit()
-    conn.close()
+    _rebuild_runtime_ledger(cur)
+
+
+def log_actuation(name: str, on: bool, reason: str, seconds: Optional[int]) -> None:
+    db_writer.submit(DB_PATH, ACTUATOR_LOG_INSERT_SQL, (time.time(), name, "on" if on else "off", reason, seconds))
     level = "info"
     lowered = (reason or "").lower()
     if any(token in lowered for token in ("error", "emergency", "stale", "safe", "estop", "cutoff")):
@@ -2623,19 +3573,23 @@ def log_actuation(name: str, on: bool, reason: str, seconds: Optional[int]) -> N
 
 def log_event(category: str, level: str, message: str, meta: Optional[Dict[str, Any]] = None) -> None:
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
+        ts = time.time()
         payload = json.dumps(meta) if meta else None
-        cur.execute(
-            "INSERT INTO event_log (ts, category, level, message, meta) VALUES (?, ?, ?, ?, ?)",
-            (time.time(), category, level, message, payload),
-        )
-        conn.commit()
-        conn.close()
+        db_writer.submit(DB_PATH, EVENT_LOG_INSERT_SQL, (ts, category, level, message, payload))
+        stream_hub.publish("event", {"ts": ts, "category": category, "level": level, "message": message, "meta": meta})
     except Exception:
         pass
 
 
+def _report_sensor_config_problems() -> None:
+    """Alert on sensors.json values the sensor settings fell back to defaults for."""
+    problems = sensor_manager.settings.problems
+    if not problems:
+        return
+    alerts.add("warning", f"sensors.json values ignored: {'; '.join(problems)}")
+    log_event("system", "warning", "Sensor config values ignored", {"problems": list(problems)})
+
+
 def _node_token_from_request() -> Optional[str]:
     token = request.headers.get("X-Node-Token") or request.headers.get("Authorization") or ""
     token = token.strip()
@@ -2825,6 +3779,9 @@ def _record_node_sensor_snapshot(node_id: str, zone: Optional[str], ts: float, s
             snapshot["last_ts"] = ts
             metrics = snapshot.setdefault("metrics", {})
             metrics[metric_key] = {"value": value, "quality": quality, "ts": ts}
+        if _quality_to_status(quality) == "ok":
+            # node clocks can run ahead; a future ts would make the window reject every later sample
+            sensor_manager.stats.add(f"{source_id}.{metric_key}", value, min(ts, time.time()))
 
 
 def _lookup_node_sensor_metrics(sensor_id: str) -> Optional[Dict[str, Any]]:
@@ -2929,25 +3886,9 @@ def _clear_all_node_command_queues(reason: str) -> None:
 
 
 def _queue_remote_emergency_stop() -> Dict[str, Dict[str, Any]]:
-    if not isinstance(catalog_config, dict):
-        return {}
-    catalog_actuators = catalog_config.get("actuators")
-    if not isinstance(catalog_actuators, list):
-        return {}
     queued: Dict[str, Dict[str, Any]] = {}
     cleared_nodes: set[str] = set()
-    for entry in catalog_actuators:
-        if not isinstance(entry, dict):
-            continue
-        backend = str(entry.get("backend") or "").lower()
-        if backend != "esp32":
-            continue
-        node_id = str(entry.get("node_id") or "").strip()
-        if not node_id:
-            continue
-        actuator_id = str(entry.get("id") or entry.get("legacy_name") or entry.get("name") or "").strip()
-        if not actuator_id:
-            continue
+    for node_id, actuator_id, entry in _catalog().remote_actuators:
         if node_id not in cleared_nodes:
             _clear_node_command_queue(node_id, "emergency_stop")
             cleared_nodes.add(node_id)
@@ -3003,17 +3944,8 @@ def _log_telemetry_rows(node_id: str, zone: Optional[str], ts: float, sensors: L
     if not rows:
         return 0, errors
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-        cur.executemany(
-            """
-            INSERT INTO telemetry_log (ts, node_id, zone, metric, value, unit, source, quality)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            rows,
-        )
-        conn.commit()
-        conn.close()
+        with db_connections.transaction(DB_PATH) as conn:
+            conn.executemany(TELEMETRY_LOG_INSERT_SQL, rows)
     except Exception as exc:
         errors.append({"code": "db_error", "detail": str(exc)})
         return 0, errors
@@ -3061,23 +3993,7 @@ def log_sensor_readings(readings: Dict[str, Any]) -> bool:
         _coerce_float(soil.get("ch3")),
     )
 
-    db_ok = False
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO sensor_log (
-                ts, dht_temp, dht_hum, ds18_temp, lux, soil_ch0, soil_ch1, soil_ch2, soil_ch3
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            row,
-        )
-        conn.commit()
-        conn.close()
-        db_ok = True
-    except Exception:
-        db_ok = False
+    db_ok = db_writer.submit(DB_PATH, SENSOR_LOG_INSERT_SQL, row)
 
     csv_ok = _append_sensor_csv(row)
     return db_ok or csv_ok
@@ -3112,6 +4028,7 @@ def _append_sensor_csv(
 
 
 init_db()
+_report_sensor_config_problems()
 
 
 # Helpers
@@ -3172,10 +4089,11 @@ def _sensor_health_snapshot() -> Dict[str, Any]:
         "bh1750": "BH1750",
         "soil": "ADS1115",
     }
+    schedule = sensor_manager.schedule()
     health: Dict[str, Any] = {}
     for key, label in sensor_map.items():
         entry = readings.get(key) or {}
-        status = entry.get("status") or "unknown"
+        status = _reading_status(entry, sensor_manager.stale_after(key)) or "unknown"
         last_seen_ts = _coerce_float(entry.get("ts"))
         last_ok_ts = _sensor_last_ok_ts.get(key)
         if status in ("ok", "simulated"):
@@ -3196,54 +4114,46 @@ def _sensor_health_snapshot() -> Dict[str, Any]:
             "first_seen_ts": first_seen_ts,
             "offline_seconds": offline_seconds,
             "offline_limit_seconds": offline_limit_seconds,
+            "poll_interval_s": (schedule.get(key) or {}).get("interval_s"),
+            "last_read_ms": (schedule.get(key) or {}).get("last_read_ms"),
         }
 
-    if isinstance(catalog_config, dict):
-        catalog_sensors = catalog_config.get("sensors")
-        if isinstance(catalog_sensors, list):
-            for sensor in catalog_sensors:
-                if not isinstance(sensor, dict):
-                    continue
-                sensor_id = str(sensor.get("id") or "").strip()
-                if not sensor_id or sensor_id in health:
-                    continue
-                backend = str(sensor.get("backend") or "").lower()
-                is_remote = backend == "esp32" or bool(sensor.get("node_id"))
-                if not is_remote:
-                    continue
-                snapshot = _lookup_node_sensor_metrics(sensor_id)
-                metrics = snapshot.get("metrics") if snapshot else None
-                metrics_map = metrics if isinstance(metrics, dict) else {}
-                last_seen_ts = _coerce_float(snapshot.get("last_ts")) if snapshot else None
-                status = "missing"
-                if metrics_map:
-                    status = _merge_metric_status(list(metrics_map.values()))
-                if last_seen_ts and NODE_STALE_SECONDS > 0 and now - last_seen_ts > NODE_STALE_SECONDS:
-                    status = "missing"
-                last_ok_ts = _sensor_last_ok_ts.get(sensor_id)
-                if status in ("ok", "simulated"):
-                    last_ok_ts = last_seen_ts or last_ok_ts or now
-                    _sensor_last_ok_ts[sensor_id] = last_ok_ts
-                first_seen_ts = _sensor_first_seen_ts.get(sensor_id) or last_seen_ts or now
-                _sensor_first_seen_ts.setdefault(sensor_id, first_seen_ts)
-                offline_seconds = None
-                if status in ("ok", "simulated"):
-                    offline_seconds = 0.0
-                else:
-                    reference = last_ok_ts or first_seen_ts
-                    if reference:
-                        offline_seconds = max(0.0, now - reference)
-                health[sensor_id] = {
-                    "label": str(sensor.get("label") or sensor_id),
-                    "status": status,
-                    "last_seen_ts": last_seen_ts,
-                    "last_ok_ts": last_ok_ts,
-                    "first_seen_ts": first_seen_ts,
-                    "offline_seconds": offline_seconds,
-                    "offline_limit_seconds": offline_limit_seconds,
-                    "zone": sensor.get("zone"),
-                    "node_id": sensor.get("node_id"),
-                }
+    for sensor_id, sensor in _catalog().remote_sensors:
+        if sensor_id in health:
+            continue
+        snapshot = _lookup_node_sensor_metrics(sensor_id)
+        metrics = snapshot.get("metrics") if snapshot else None
+        metrics_map = metrics if isinstance(metrics, dict) else {}
+        last_seen_ts = _coerce_float(snapshot.get("last_ts")) if snapshot else None
+        status = "missing"
+        if metrics_map:
+            status = _merge_metric_status(list(metrics_map.values()))
+        if last_seen_ts and NODE_STALE_SECONDS > 0 and now - last_seen_ts > NODE_STALE_SECONDS:
+            status = "missing"
+        last_ok_ts = _sensor_last_ok_ts.get(sensor_id)
+        if status in ("ok", "simulated"):
+            last_ok_ts = last_seen_ts or last_ok_ts or now
+            _sensor_last_ok_ts[sensor_id] = last_ok_ts
+        first_seen_ts = _sensor_first_seen_ts.get(sensor_id) or last_seen_ts or now
+        _sensor_first_seen_ts.setdefault(sensor_id, first_seen_ts)
+        offline_seconds = None
+        if status in ("ok", "simulated"):
+            offline_seconds = 0.0
+        else:
+            reference = last_ok_ts or first_seen_ts
+            if reference:
+                offline_seconds = max(0.0, now - reference)
+        health[sensor_id] = {
+            "label": str(sensor.get("label") or sensor_id),
+            "status": status,
+            "last_seen_ts": last_seen_ts,
+            "last_ok_ts": last_ok_ts,
+            "first_seen_ts": first_seen_ts,
+            "offline_seconds": offline_seconds,
+            "offline_limit_seconds": offline_limit_seconds,
+            "zone": sensor.get("zone"),
+            "node_id": sensor.get("node_id"),
+        }
     return health
 
 
@@ -3280,26 +4190,15 @@ def _energy_summary() -> Dict[str, Any]:
         }
 
     windows = {
-        "window_24h": "-24 hours",
-        "window_7d": "-7 days",
+        "window_24h": 24,
+        "window_7d": 7 * 24,
     }
     base_power_w = _coerce_float(os.getenv("PI_BASE_POWER_W", "5.0")) or 0.0
-    summary: Dict[str, Any] = {"unit": "Wh", "only_timed": True, "base_power_w": base_power_w}
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    for key, window in windows.items():
-        window_hours = 24 if key == "window_24h" else 7 * 24
-        cur.execute(
-            """
-            SELECT name, SUM(seconds) FROM actuator_log
-            WHERE state = 'on'
-              AND seconds IS NOT NULL
-              AND ts >= datetime('now', ?)
-            GROUP BY name
-            """,
-            (window,),
-        )
-        rows = cur.fetchall()
+    summary: Dict[str, Any] = {"unit": "Wh", "only_timed": False, "base_power_w": base_power_w}
+    cur = db_connections.connection(DB_PATH).cursor()
+    now = time.time()
+    for key, window_hours in windows.items():
+        rows = _actuator_on_seconds(cur, now - window_hours * 3600, now).items()
         total_wh = 0.0
         channels: Dict[str, Any] = {}
         if base_power_w > 0:
@@ -3321,6 +4220,7 @@ def _energy_summary() -> Dict[str, Any]:
             energy_wh = power_w * quantity * (seconds_val / 3600.0)
             channels[name] = {
                 "seconds": round(seconds_val, 1),
+                "duty_pct": round(100.0 * seconds_val / (window_hours * 3600), 2),
                 "power_w": power_w,
                 "quantity": quantity,
                 "voltage_v": entry.get("voltage_v"),
@@ -3332,7 +4232,6 @@ def _energy_summary() -> Dict[str, Any]:
             "channels": channels,
             **cost_try(total_wh),
         }
-    conn.close()
     return summary
 
 
@@ -3349,6 +4248,17 @@ def _parse_ts_param(value: Optional[str]) -> Optional[float]:
         return None
 
 
+def _reading_status(reading: Any, max_age: float = SENSOR_STALE_SECONDS) -> Optional[str]:
+    """Status of one driver's reading; a good reading its driver has not refreshed in time counts as stale."""
+    if not isinstance(reading, dict):
+        return None
+    status = reading.get("status")
+    ts = reading.get("ts")
+    if status in ("ok", "simulated") and isinstance(ts, (int, float)) and time.time() - ts > max_age:
+        return "stale"
+    return status
+
+
 def _sensor_status_error(status: Optional[str]) -> bool:
     return bool(status) and status not in ("ok", "simulated")
 
@@ -3379,6 +4289,21 @@ def _legacy_catalog_snapshot() -> Tuple[List[Dict[str, Any]], List[Dict[str, Any
                 "purpose": "temp",
             }
         )
+        ds_reading = sensor_manager.latest()["readings"].get("ds18b20") or {}
+        # the first entry above follows the primary probe; every other probe gets its own sensor
+        for w1_id in ds_reading.get("probes") or {}:
+            if w1_id == ds_reading.get("probe"):
+                continue
+            sensors.append(
+                {
+                    "id": f"{zone_id}-ds18b20-{w1_id}",
+                    "label": f"{zone_id.upper()} DS18B20 {w1_id}",
+                    "zone": zone_id,
+                    "kind": "ds18b20",
+                    "purpose": "temp",
+                    "w1_id": w1_id,
+                }
+            )
     bh_addr = sensors_config.get("bh1750_addr")
     if bh_addr:
         sensors.append(
@@ -3528,8 +4453,14 @@ def _apply_sensor_status(sensor: Dict[str, Any], readings: Dict[str, Any]) -> No
         }
     elif kind == "ds18b20":
         entry = readings.get("ds18b20") or {}
-        status = entry.get("status")
-        last_value = {"temperature": entry.get("temperature"), "ts": entry.get("ts")}
+        w1_id = str(sensor.get("w1_id") or "")
+        if w1_id:
+            probe = (entry.get("probes") or {}).get(w1_id) or {}
+            status = probe.get("status") or ("missing" if entry else None)
+            last_value = {"temperature": probe.get("temperature"), "ts": entry.get("ts")}
+        else:
+            status = entry.get("status")
+            last_value = {"temperature": entry.get("temperature"), "ts": entry.get("ts")}
     elif kind == "bh1750":
         entry = readings.get("bh1750") or {}
         status = entry.get("status")
@@ -3619,12 +4550,13 @@ def _zone_first_snapshot(readings: Dict[str, Any], actuator_state: Dict[str, Any
     sensors: List[Dict[str, Any]]
     actuators: List[Dict[str, Any]]
     version = 0
-    if isinstance(catalog_config, dict):
+    catalog = _catalog()
+    if catalog.loaded:
         source = "catalog"
-        version = int(catalog_config.get("version") or 0)
-        zones = [dict(z) for z in catalog_config.get("zones", []) if isinstance(z, dict)]
-        sensors = [dict(s) for s in catalog_config.get("sensors", []) if isinstance(s, dict)]
-        actuators = [dict(a) for a in catalog_config.get("actuators", []) if isinstance(a, dict)]
+        version = catalog.version
+        zones = [dict(z) for z in catalog.zones]
+        sensors = [dict(s) for s in catalog.sensors]
+        actuators = [dict(a) for a in catalog.actuators]
     else:
         zones, sensors, actuators = _legacy_catalog_snapshot()
 
@@ -3666,31 +4598,6 @@ def _safe_int(value: Any, default: int = 0) -> int:
         return default
 
 
-def _actuator_daily_seconds(name: str) -> float:
-    cutoff = datetime.now(timezone.utc) - timedelta(days=1)
-    cutoff_str = cutoff.strftime("%Y-%m-%d %H:%M:%S")
-    conn = sqlite3.connect(DB_PATH)
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT SUM(seconds)
-            FROM actuator_log
-            WHERE name = ?
-              AND state = 'on'
-              AND seconds IS NOT NULL
-              AND ts >= ?
-            """,
-            (name, cutoff_str),
-        )
-        row = cur.fetchone()
-        return float(row[0] or 0)
-    except Exception:
-        return 0.0
-    finally:
-        conn.close()
-
-
 def _is_actuator_role(name: str, role: str, chan: Dict[str, Any], meta: Optional[Dict[str, Any]]) -> bool:
     target = role.lower()
     if str(chan.get("role") or "").lower() == target:
@@ -3705,35 +4612,17 @@ def _is_actuator_role(name: str, role: str, chan: Dict[str, Any], meta: Optional
 
 
 def _find_catalog_actuator(name: str) -> Optional[Dict[str, Any]]:
-    if not isinstance(catalog_config, dict):
-        return None
-    candidates = catalog_config.get("actuators")
-    if not isinstance(candidates, list):
+    catalog = _catalog()
+    if not catalog.loaded:
         return None
-    target = name.upper()
-    target_pin = None
-    chan = actuator_manager.channels.get(target)
-    if chan:
-        target_pin = chan.get("gpio_pin")
-    for entry in candidates:
-        if not isinstance(entry, dict):
-            continue
-        for key in ("id", "legacy_name", "name"):
-            value = entry.get(key)
-            if isinstance(value, str) and value.strip().upper() == target:
-                return entry
-        if target_pin is not None and entry.get("gpio_pin") == target_pin:
-            return entry
-    return None
+    chan = actuator_manager.channels.get(name.upper())
+    return catalog.find_actuator(name, chan.get("gpio_pin") if chan else None)
 
 
 def _resolve_catalog_channel_name(entry: Dict[str, Any]) -> Optional[str]:
-    for key in ("legacy_name", "name", "id"):
-        value = entry.get(key)
-        if isinstance(value, str) and value.strip():
-            candidate = value.strip().upper()
-            if candidate in actuator_manager.channels:
-                return candidate
+    for candidate in _catalog().channel_names(entry):
+        if candidate in actuator_manager.channels:
+            return candidate
     gpio_pin = entry.get("gpio_pin")
     if gpio_pin is None:
         return None
@@ -3750,36 +4639,18 @@ def _fan_dependency_satisfied(entry: Dict[str, Any]) -> bool:
     if role.startswith("fan"):
         return True
     zone_id = entry.get("zone")
-    if not zone_id or not isinstance(catalog_config, dict):
+    if not zone_id:
         return False
-    catalog_actuators = catalog_config.get("actuators")
-    if not isinstance(catalog_actuators, list):
-        return False
-    fan_roles = {"fan", "fan_canopy", "fan_box", "fan_exhaust"}
-    fan_candidates = [
-        act
-        for act in catalog_actuators
-        if isinstance(act, dict)
-        and act.get("zone") == zone_id
-        and str(act.get("role") or "").lower() in fan_roles
-    ]
+    fan_candidates = _catalog().fans_in(zone_id)
     if not fan_candidates:
         return False
     state_snapshot = actuator_manager.get_state()
     for fan_entry in fan_candidates:
         channel_name = _resolve_catalog_channel_name(fan_entry)
-        if not channel_name:
-            channel_name = None
-        if state_snapshot.get(channel_name, {}).get("state"):
+        if channel_name and state_snapshot.get(channel_name, {}).get("state"):
             return True
-        actuator_id = None
-        if isinstance(fan_entry.get("id"), str) and fan_entry.get("id"):
-            actuator_id = fan_entry.get("id")
-        elif isinstance(fan_entry.get("legacy_name"), str) and fan_entry.get("legacy_name"):
-            actuator_id = fan_entry.get("legacy_name")
-        elif isinstance(fan_entry.get("name"), str) and fan_entry.get("name"):
-            actuator_id = fan_entry.get("name")
-        if actuator_id and _node_actuator_state_on(actuator_id):
+        fan_id = catalog_actuator_id(fan_entry)
+        if fan_id and _node_actuator_state_on(fan_id):
             return True
     return False
 
@@ -3832,10 +4703,10 @@ def _check_sensor_health() -> None:
     latest = sensor_manager.latest()
     readings = latest.get("readings", {})
 
-    dht_status = (readings.get("dht22") or {}).get("status")
-    soil_status = (readings.get("soil") or {}).get("status")
-    ds_status = (readings.get("ds18b20") or {}).get("status")
-    lux_status = (readings.get("bh1750") or {}).get("status")
+    dht_status = _reading_status(readings.get("dht22"), sensor_manager.stale_after("dht22"))
+    soil_status = _reading_status(readings.get("soil"), sensor_manager.stale_after("soil"))
+    ds_status = _reading_status(readings.get("ds18b20"), sensor_manager.stale_after("ds18b20"))
+    lux_status = _reading_status(readings.get("bh1750"), sensor_manager.stale_after("bh1750"))
 
     dht_error = _sensor_status_error(dht_status)
     soil_error = _sensor_status_error(soil_status)
@@ -3960,22 +4831,25 @@ def _check_sensor_health() -> None:
 
 
 def _check_stale_and_fail_safe() -> None:
-    latest = sensor_manager.latest()
-    ts = latest.get("ts", 0)
-    if not ts:
+    # per sensor: a fresh reading from another driver must not hide a stalled one
+    readings = sensor_manager.latest().get("readings", {})
+    heater_sensor = str(automation_engine.config.get("heater_sensor", "dht22") or "dht22").lower()
+    depends = {"pump": "soil", "heater": "ds18b20" if heater_sensor == "ds18b20" else "dht22"}
+    stale = {
+        role: key
+        for role, key in depends.items()
+        if _reading_status(readings.get(key), sensor_manager.stale_after(key)) == "stale"
+    }
+    if not stale:
         return
-    if time.time() - ts > SENSOR_STALE_SECONDS:
-        risky = []
-        for name, info in actuator_manager.channels.items():
-            role = str(info.get("role") or "").lower()
-            if role in ("pump", "heater"):
-                risky.append(name)
-                continue
-            if "PUMP" in name or "HEATER" in name:
-                risky.append(name)
-        for name in risky:
-            actuator_manager.set_state(name, False, "stale_sensors")
-        alerts.add("warning", "Sensor data stale; risky actuators turned off")
+    risky = []
+    for name, info in actuator_manager.channels.items():
+        role = str(info.get("role") or "").lower()
+        if role in stale or any(tag.upper() in name for tag in stale):
+            risky.append(name)
+    for name in risky:
+        actuator_manager.set_state(name, False, "stale_sensors")
+    alerts.add("warning", f"Sensor data stale ({', '.join(sorted(set(stale.values())))}); risky actuators turned off")
 
 
 def apply_actuator_command(name: str, desired_state: bool, seconds: Optional[int], reason: str) -> Optional[int]:
@@ -4059,9 +4933,7 @@ def apply_actuator_command(name: str, desired_state: bool, seconds: Optional[int
         else:
             seconds_param = min(seconds_param, max_on_s)
     if desired_state and max_daily_s > 0:
-        used_seconds = _actuator_daily_seconds(name)
-        remaining = max_daily_s - used_seconds
-        remaining_seconds = int(remaining)
+        remaining_seconds = int(actuator_manager.ledger.remaining(name, max_daily_s))
         if remaining_seconds <= 0:
             raise ActuationError("Daily limit reached")
         if seconds_param is None or seconds_param > remaining_seconds:
@@ -4089,16 +4961,21 @@ def _maybe_log_sensor_readings(readings: Dict[str, Any]) -> None:
 
 
 def sensor_loop() -> None:
+    # drivers read on their own threads; this loop reacts to what they publish
+    sensor_manager.start_drivers()
+    seen = 0
     while True:
+        seen = sensor_manager.wait_for_update(seen, SENSOR_READ_INTERVAL_SECONDS)
         try:
-            readings = sensor_manager.read_all()
+            readings = sensor_manager.latest()["readings"]
             _check_sensor_health()
             _check_stale_and_fail_safe()
             _maybe_log_sensor_readings(readings)
-            lcd_manager.render_auto(api_status_payload(readings))
+            status_snapshot.invalidate()
+            lcd_manager.render_auto(status_view(_status_fields("lcd")).payload())
         except Exception as exc:
             alerts.add("error", f"Sensor loop error: {exc}")
-        time.sleep(3)
+        time.sleep(SENSOR_LOOP_MIN_SECONDS)
 
 
 def automation_loop() -> None:
@@ -4113,12 +4990,17 @@ def automation_loop() -> None:
 def retention_loop() -> None:
     while True:
         try:
+            with db_connections.transaction(DB_PATH) as conn:
+                _ensure_partitions(conn.cursor())
             retention_manager.cleanup_if_due()
         except Exception as exc:
             log_event("maintenance", "warning", f"Retention cleanup error: {exc}", None)
         time.sleep(60)
 
 
+# Queued log rows are committed on interpreter exit (SIGTERM is mapped to exit in __main__).
+atexit.register(db_writer.stop)
+
 if not DISABLE_BACKGROUND_LOOPS:
     threading.Thread(target=sensor_loop, daemon=True).start()
     threading.Thread(target=automation_loop, daemon=True).start()
@@ -4215,7 +5097,7 @@ def reports_daily_page() -> Any:
     target_date = _parse_report_date(date_raw, tz)
     if target_date is None:
         target_date = _default_report_date(cfg)
-    report = build_daily_report(target_date, profile, cfg)
+    report = build_daily_report(target_date, profile, cfg, retention_manager.archive)
     base_template = "base_v1.html" if USE_NEW_UI else "base.html"
     return render_template(
         "reports_daily.html",
@@ -4236,7 +5118,7 @@ def reports_weekly_page() -> Any:
     end_date = _parse_report_date(end_raw, tz)
     if end_date is None:
         end_date = _default_report_date(cfg)
-    report = build_weekly_report(end_date, profile, cfg)
+    report = build_weekly_report(end_date, profile, cfg, retention_manager.archive)
     base_template = "base_v1.html" if USE_NEW_UI else "base.html"
     return render_template(
         "reports_weekly.html",
@@ -4248,27 +5130,57 @@ def reports_weekly_page() -> Any:
     )
 
 
-def api_status_payload(readings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    if readings is None and DISABLE_BACKGROUND_LOOPS and sensor_manager.simulation:
-        try:
-            readings = sensor_manager.read_all()
-        except Exception:
-            readings = None
-    latest = sensor_manager.latest()
-    if readings is None:
-        readings = dict(latest.get("readings", {}))
-    dht_averages = sensor_manager.dht22_averages()
-    if isinstance(readings.get("dht22"), dict):
-        dht_reading = dict(readings["dht22"])
-        dht_reading["averages"] = dht_averages
-        readings["dht22"] = dht_reading
-    else:
-        readings["dht22"] = {"averages": dht_averages}
-    sensor_ts = latest.get("ts") or None
-    data_age_sec = None
-    if sensor_ts:
-        data_age_sec = max(0.0, time.time() - float(sensor_ts))
-    data_stale = data_age_sec is not None and data_age_sec > SENSOR_STALE_SECONDS
+class _StatusInputs:
+    """Inputs shared by several /api/status sections, computed on first use."""
+
+    def __init__(self, readings: Optional[Dict[str, Any]]) -> None:
+        self._readings = readings
+
+    @cached_property
+    def latest(self) -> Dict[str, Any]:
+        return sensor_manager.latest()
+
+    @cached_property
+    def readings(self) -> Dict[str, Any]:
+        readings = self._readings
+        if readings is None and DISABLE_BACKGROUND_LOOPS and sensor_manager.simulation:
+            try:
+                readings = sensor_manager.read_all()
+            except Exception:
+                readings = None
+        if readings is None:
+            readings = dict(self.latest.get("readings", {}))
+        dht_averages = sensor_manager.dht22_averages()
+        if isinstance(readings.get("dht22"), dict):
+            dht_reading = dict(readings["dht22"])
+            dht_reading["averages"] = dht_averages
+            readings["dht22"] = dht_reading
+        else:
+            readings["dht22"] = {"averages": dht_averages}
+        return readings
+
+    @cached_property
+    def sensor_ts(self) -> Optional[float]:
+        # reading first: in simulation it refreshes `latest`
+        _ = self.readings
+        return self.latest.get("ts") or None
+
+    @cached_property
+    def data_age_sec(self) -> Optional[float]:
+        if not self.sensor_ts:
+            return None
+        return max(0.0, time.time() - float(self.sensor_ts))
+
+    @cached_property
+    def actuator_state(self) -> Dict[str, Any]:
+        return actuator_manager.get_state()
+
+    @cached_property
+    def zone_snapshot(self) -> Dict[str, Any]:
+        return _zone_first_snapshot(self.readings, self.actuator_state)
+
+
+def _status_cooldowns(_: _StatusInputs) -> Dict[str, float]:
     cooldowns: Dict[str, float] = {}
     pump_cooldown = int(app_state.limits.get("pump_cooldown_seconds", 60))
     now_ts = time.time()
@@ -4283,42 +5195,176 @@ def api_status_payload(readings: Optional[Dict[str, Any]] = None) -> Dict[str, A
             if last_stop:
                 remaining = max(0.0, pump_cooldown - (now_ts - last_stop))
             cooldowns[name] = round(remaining, 1)
-    actuator_state = actuator_manager.get_state()
-    zone_snapshot = _zone_first_snapshot(readings, actuator_state)
-    return {
-        "timestamp": _timestamp(),
-        "sensor_ts": sensor_ts,
-        "data_age_sec": data_age_sec,
-        "data_stale": data_stale,
-        "stale_threshold_sec": SENSOR_STALE_SECONDS,
-        "sensor_readings": readings,
-        "actuator_state": actuator_state,
-        "cooldowns": cooldowns,
-        "sensor_faults": app_state.get_sensor_faults(),
-        "sensor_health": _sensor_health_snapshot(),
-        "energy": _energy_summary(),
-        "automation_state": automation_engine.status(),
-        "alerts": alerts.get(),
-        "alerts_config": app_state.get_alerts_config(),
-        "safe_mode": app_state.safe_mode,
-        "limits": app_state.limits,
-        "automation": automation_engine.config,
-        "lcd": lcd_manager.status(),
-        "notifications": notifications.public_status(),
-        "retention": retention_manager.public_status(),
-        "zones": zone_snapshot["zones"],
-        "sensors": zone_snapshot["sensors"],
-        "actuators": zone_snapshot["actuators"],
-        "nodes": zone_snapshot["nodes"],
-        "catalog": {"source": zone_snapshot["source"], "version": zone_snapshot["version"]},
-        "compat": {"deprecated_fields": ["sensor_readings", "actuator_state", "automation_state"]},
-    }
+    return cooldowns
+
+
+# section name -> builder; insertion order is the payload key order
+STATUS_SECTIONS: Dict[str, Callable[[_StatusInputs], Any]] = {
+    "timestamp": lambda ctx: _timestamp(),
+    "sensor_ts": lambda ctx: ctx.sensor_ts,
+    "data_age_sec": lambda ctx: ctx.data_age_sec,
+    "data_stale": lambda ctx: ctx.data_age_sec is not None and ctx.data_age_sec > SENSOR_STALE_SECONDS,
+    "stale_threshold_sec": lambda ctx: SENSOR_STALE_SECONDS,
+    "sensor_readings": lambda ctx: ctx.readings,
+    "actuator_state": lambda ctx: ctx.actuator_state,
+    "cooldowns": _status_cooldowns,
+    "sensor_faults": lambda ctx: app_state.get_sensor_faults(),
+    "sensor_health": lambda ctx: _sensor_health_snapshot(),
+    "sensor_stats": lambda ctx: sensor_manager.stats.snapshot(time.time()),
+    "sensor_config": lambda ctx: {"problems": list(sensor_manager.settings.problems)},
+    "energy": lambda ctx: _energy_summary(),
+    "automation_state": lambda ctx: automation_engine.status(),
+    "alerts": lambda ctx: alerts.get(),
+    "alerts_config": lambda ctx: app_state.get_alerts_config(),
+    "safe_mode": lambda ctx: app_state.safe_mode,
+    "limits": lambda ctx: app_state.limits,
+    "automation": lambda ctx: automation_engine.config,
+    "lcd": lambda ctx: lcd_manager.status(),
+    "notifications": lambda ctx: notifications.public_status(),
+    "retention": lambda ctx: retention_manager.public_status(),
+    "storage": lambda ctx: {"writer": db_writer.stats()},
+    "zones": lambda ctx: ctx.zone_snapshot["zones"],
+    "sensors": lambda ctx: ctx.zone_snapshot["sensors"],
+    "actuators": lambda ctx: ctx.zone_snapshot["actuators"],
+    "nodes": lambda ctx: ctx.zone_snapshot["nodes"],
+    "catalog": lambda ctx: {"source": ctx.zone_snapshot["source"], "version": ctx.zone_snapshot["version"]},
+    "compat": lambda ctx: {"deprecated_fields": ["sensor_readings", "actuator_state", "automation_state"]},
+}
+
+# always sent; the page header (safe mode badge, data age) renders from these
+STATUS_BASE_FIELDS = ("timestamp", "sensor_ts", "data_age_sec", "data_stale", "stale_threshold_sec", "safe_mode")
+
+STATUS_PRESETS: Dict[str, Tuple[str, ...]] = {
+    # automation: the LCD preview renders {soil_pct} from automation.soil_calibration
+    "lcd": ("sensor_readings", "actuator_state", "lcd", "automation"),
+    "control": (
+        "actuator_state", "actuators", "cooldowns", "sensor_faults", "automation_state",
+        "limits", "alerts", "zones", "sensors", "nodes",
+    ),
+    "zones": ("zones", "sensors", "actuators", "nodes", "catalog"),
+    "dashboard": (
+        "sensor_readings", "actuator_state", "actuators", "alerts", "automation", "automation_state",
+        "energy", "sensor_faults", "sensor_health", "limits", "zones", "sensors", "nodes",
+    ),
+}
+
+
+def _status_fields(raw: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse `fields=` (section names and/or preset names); None means every section."""
+    if not raw:
+        return None
+    wanted = set(STATUS_BASE_FIELDS)
+    for item in raw.split(","):
+        name = item.strip().lower()
+        if not name:
+            continue
+        if name in STATUS_PRESETS:
+            wanted.update(STATUS_PRESETS[name])
+        elif name in STATUS_SECTIONS:
+            wanted.add(name)
+        else:
+            raise ValueError(f"unknown status field: {name}")
+    if len(wanted) == len(STATUS_SECTIONS):
+        return None
+    return tuple(name for name in STATUS_SECTIONS if name in wanted)
+
+
+def api_status_payload(
+    readings: Optional[Dict[str, Any]] = None, fields: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    ctx = _StatusInputs(readings)
+    names = STATUS_SECTIONS.keys() if fields is None else fields
+    return {name: STATUS_SECTIONS[name](ctx) for name in names}
+
+
+def status_view(fields: Optional[Tuple[str, ...]]) -> StatusSnapshot:
+    if fields is None:
+        return status_snapshot
+    return status_snapshot.variant(fields, lambda: api_status_payload(fields=fields))
 
 
 @app.route("/api/status")
 def api_status() -> Any:
-    response = api_status_payload()
-    return jsonify(response)
+    try:
+        snapshot = status_view(_status_fields(request.args.get("fields")))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    since = request.args.get("since")
+    delta = snapshot.delta(since) if since else None
+    body, etag = delta or snapshot.response()
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
+def _sse(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {app.json.dumps(data)}\n\n"
+
+
+def _stream_patch(sent: Dict[str, Any], current: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Merge patch from `sent` to `current`, or None when only the volatile fields moved."""
+    if current.get("version") == sent.get("version"):
+        return None
+    patch = _merge_patch(sent, current)
+    if all(key == "version" or key in StatusSnapshot.VOLATILE_FIELDS for key in patch):
+        return None
+    return patch
+
+
+@app.route("/api/stream")
+def api_stream() -> Any:
+    try:
+        snapshot = status_view(_status_fields(request.args.get("fields")))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    sub = stream_hub.subscribe()
+    if sub is None:
+        return jsonify({"error": "too many stream clients"}), 503
+
+    def generate() -> Iterator[str]:
+        try:
+            sent = snapshot.payload()
+            yield _sse("status", {"version": sent["version"], "full": True, "data": sent})
+            last_write = last_patch = time.monotonic()
+            while True:
+                try:
+                    seq, event, data = sub.get(timeout=STREAM_STATUS_CHECK_SECONDS)
+                    yield _sse(event, data, seq)
+                    last_write = time.monotonic()
+                    if event == "actuator":
+                        # a relay switch also moves cooldowns and zone cards: do not hold that patch back
+                        last_patch = 0.0
+                except queue.Empty:
+                    pass
+                patch = None
+                if time.monotonic() - last_patch >= STREAM_PATCH_MIN_SECONDS:
+                    current = snapshot.payload()
+                    patch = _stream_patch(sent, current)
+                if patch is not None:
+                    # volatile fields ride along with a real change, as in ?since= deltas
+                    yield _sse("status", {"version": current["version"], "patch": patch})
+                    sent = current
+                    last_write = last_patch = time.monotonic()
+                elif time.monotonic() - last_write >= STREAM_HEARTBEAT_SECONDS:
+                    yield ": ping\n\n"
+                    last_write = time.monotonic()
+        finally:
+            stream_hub.unsubscribe(sub)
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.after_request
+def _invalidate_status_after_write(response: Response) -> Response:
+    if request.method not in ("GET", "HEAD", "OPTIONS"):
+        status_snapshot.invalidate()
+    return response
 
 
 @app.route("/api/nodes")
@@ -4347,11 +5393,9 @@ def api_retention_cleanup() -> Any:
     admin_error = require_admin()
     if admin_error:
         return admin_error
-    try:
-        retention_manager.cleanup_now()
-    except Exception as exc:
-        return jsonify({"error": str(exc)}), 500
-    return jsonify({"ok": True})
+    if not retention_manager.start_cleanup():
+        return jsonify({"error": "cleanup already running", "progress": retention_manager.public_status()["progress"]}), 409
+    return jsonify({"ok": True, "started": True}), 202
 
 
 @app.route("/api/telemetry", methods=["POST"])
@@ -4512,12 +5556,16 @@ def api_sensor_log() -> Any:
     if to_raw and to_ts is None:
         return jsonify({"error": "invalid to timestamp"}), 400
 
-    limit_raw = request.args.get("limit", "200")
-    try:
-        limit = int(limit_raw)
-    except ValueError:
-        return jsonify({"error": "limit must be integer"}), 400
-    limit = max(1, min(limit, 2000))
+    export_format = _export_format()
+    limit_raw = request.args.get("limit")
+    limit: Optional[int] = None
+    if limit_raw is not None or not export_format:
+        try:
+            limit = int(limit_raw or 200)
+        except ValueError:
+            return jsonify({"error": "limit must be integer"}), 400
+        # exports stream from the cursor, so only the JSON view is capped
+        limit = max(1, limit if export_format else min(limit, 2000))
 
     order = (request.args.get("order") or "desc").strip().lower()
     if order not in ("asc", "desc"):
@@ -4542,32 +5590,13 @@ def api_sensor_log() -> Any:
     if from_ts > to_ts:
         return jsonify({"error": "from must be <= to"}), 400
 
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
+    db_writer.flush()
+    cur = db_connections.connection(DB_PATH).cursor()
     interval_sec = interval_minutes * 60 if interval_minutes else None
-    if interval_sec:
-        cur.execute(
-            f"""
-            SELECT
-                CAST(ts / ? AS INTEGER) * ? AS bucket,
-                AVG(dht_temp),
-                AVG(dht_hum),
-                AVG(ds18_temp),
-                AVG(lux),
-                AVG(soil_ch0),
-                AVG(soil_ch1),
-                AVG(soil_ch2),
-                AVG(soil_ch3)
-            FROM sensor_log
-            WHERE ts >= ? AND ts <= ?
-            GROUP BY bucket
-            ORDER BY bucket {order.upper()}
-            LIMIT ?
-            """,
-            (interval_sec, interval_sec, from_ts, to_ts, limit),
-        )
-        rows = cur.fetchall()
-    else:
+    rows: Iterable[Sequence[Any]]
+    if not interval_sec:
+        # raw rows: archived days and the live table are both read lazily in ts order
+        archived = retention_manager.archive.iter_through(cur, from_ts, to_ts, reverse=order == "desc")
         cur.execute(
             f"""
             SELECT ts, dht_temp, dht_hum, ds18_temp, lux, soil_ch0, soil_ch1, soil_ch2, soil_ch3
@@ -4576,53 +5605,64 @@ def api_sensor_log() -> Any:
             ORDER BY ts {order.upper()}
             LIMIT ?
             """,
-            (from_ts, to_ts, limit),
-        )
-        rows = cur.fetchall()
-    conn.close()
-
-    if request.args.get("format") == "csv":
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow([
-            "ts",
-            "dht_temp",
-            "dht_hum",
-            "ds18_temp",
-            "lux",
-            "soil_ch0",
-            "soil_ch1",
-            "soil_ch2",
-            "soil_ch3",
-        ])
-        writer.writerows(rows)
-        filename = "sensor_log.csv"
-        return Response(
-            output.getvalue(),
-            mimetype="text/csv",
-            headers={"Content-Disposition": f"attachment; filename={filename}"},
+            (from_ts, to_ts, -1 if limit is None else limit),
         )
+        live = _iter_rows(cur)
+        rows = chain(archived, live) if order == "asc" else chain(live, archived)
+        if limit is not None:
+            rows = islice(rows, limit)
+    else:
+        rollup_res = sensor_rollup.pick_divisor(interval_sec)
+        if rollup_res:
+            rows = sensor_rollup.bucket_averages(
+                cur,
+                sensor_rollup.ROLLUP_COLUMNS,
+                from_ts,
+                to_ts,
+                rollup_res,
+                group_seconds=interval_sec,
+                order=order,
+                limit=limit,
+            )
+        else:
+            cur.execute(
+                f"""
+                SELECT
+                    CAST(ts / ? AS INTEGER) * ? AS bucket,
+                    AVG(dht_temp),
+                    AVG(dht_hum),
+                    AVG(ds18_temp),
+                    AVG(lux),
+                    AVG(soil_ch0),
+                    AVG(soil_ch1),
+                    AVG(soil_ch2),
+                    AVG(soil_ch3)
+                FROM sensor_log
+                WHERE ts >= ? AND ts <= ?
+                GROUP BY bucket
+                ORDER BY bucket {order.upper()}
+                LIMIT ?
+                """,
+                (interval_sec, interval_sec, from_ts, to_ts, -1 if limit is None else limit),
+            )
+            rows = cur.fetchall()
+        archived = retention_manager.archive.read_through(cur, from_ts, to_ts)
+        if archived:
+            live_buckets = {row[0] for row in rows}
+            archived = [
+                row for row in day_archive.bucket_averages(archived, interval_sec) if row[0] not in live_buckets
+            ]
+            rows = sorted(list(rows) + archived, key=lambda row: row[0], reverse=order == "desc")[:limit]
 
-    payload = [
-        {
-            "ts": row[0],
-            "dht_temp": row[1],
-            "dht_hum": row[2],
-            "ds18_temp": row[3],
-            "lux": row[4],
-            "soil_ch0": row[5],
-            "soil_ch1": row[6],
-            "soil_ch2": row[7],
-            "soil_ch3": row[8],
-        }
-        for row in rows
-    ]
+    columns = ("ts",) + sensor_rollup.ROLLUP_COLUMNS
+    if export_format:
+        return _export_response("sensor_log", columns, rows, export_format)
     return jsonify({
         "from_ts": from_ts,
         "to_ts": to_ts,
         "order": order,
         "interval_sec": interval_sec,
-        "rows": payload,
+        "rows": [dict(zip(columns, row)) for row in rows],
     })
 
 
@@ -4639,20 +5679,91 @@ def api_sensor_log_clear() -> Any:
     if before_raw and before_ts is None:
         return jsonify({"error": "invalid before timestamp"}), 400
 
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    if before_ts is None:
-        cur.execute("DELETE FROM sensor_log")
-    else:
-        cur.execute("DELETE FROM sensor_log WHERE ts < ?", (before_ts,))
-    deleted = cur.rowcount
-    conn.commit()
-    conn.close()
+    db_writer.flush()
+    with db_connections.transaction(DB_PATH) as conn:
+        cur = conn.cursor()
+        deleted = partitions.delete_before(cur, SENSOR_LOG_PARTITIONS, before_ts)
+        sensor_rollup.forget_before(cur, before_ts)
     log_event("sensor_log", "warning", "Sensor log cleared", {"before": before_ts, "deleted": deleted})
     return jsonify({"ok": True, "deleted": deleted})
 
 
+POINT_ENCODINGS = ("json", "columnar", "f32")
+
+
+def _points_encoding() -> Optional[str]:
+    """`encoding=` of a points endpoint; None if it is not one of POINT_ENCODINGS."""
+    encoding = (request.args.get("encoding") or "json").strip().lower()
+    return encoding if encoding in POINT_ENCODINGS else None
+
+
+def _encode_points(meta: Dict[str, Any], rows: Iterable[Sequence[Any]], encoding: str) -> Dict[str, Any]:
+    """Column-wise (ts, value) points.
+
+    columnar: `ts` holds millisecond deltas from `ts0` (first delta is 0), `v` the values.
+    f32: base64 little-endian arrays, float64 epoch seconds in `ts` and
+    float32 values in `v` (NaN for null).
+    """
+    ts: List[float] = []
+    values: List[Optional[float]] = []
+    for row in rows:
+        ts.append(float(row[0]))
+        values.append(None if row[1] is None else float(row[1]))
+    body: Dict[str, Any] = {**meta, "encoding": encoding, "count": len(ts)}
+    if encoding == "columnar":
+        ts_ms = [int(round(value * 1000)) for value in ts]
+        body["ts0"] = ts_ms[0] / 1000.0 if ts_ms else None
+        body["ts"] = [b - a for a, b in zip(ts_ms[:1] + ts_ms, ts_ms)]
+        body["v"] = values
+    else:
+        packed_v = struct.pack(f"<{len(values)}f", *(float("nan") if v is None else v for v in values))
+        body["ts"] = base64.b64encode(struct.pack(f"<{len(ts)}d", *ts)).decode("ascii")
+        body["v"] = base64.b64encode(packed_v).decode("ascii")
+    return body
+
+
+def _accepts_gzip() -> bool:
+    return request.accept_encodings["gzip"] > 0
+
+
+def _gzip_stream(response: Response) -> Iterator[bytes]:
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    try:
+        for chunk in response.iter_encoded():
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        response.close()
+
+
+def _gzip_negotiated(view: Callable[..., Any]) -> Callable[..., Any]:
+    """gzip the view's body (streamed ones chunk by chunk) when the client accepts it."""
+
+    @wraps(view)
+    def wrapper(*args: Any, **kwargs: Any) -> Response:
+        response = app.make_response(view(*args, **kwargs))
+        response.vary.add("Accept-Encoding")
+        if response.status_code != 200 or "Content-Encoding" in response.headers or not _accepts_gzip():
+            return response
+        if response.is_streamed:
+            compressed = Response(_gzip_stream(response), status=response.status, headers=response.headers)
+            compressed.headers["Content-Encoding"] = "gzip"
+            compressed.headers.pop("Content-Length", None)
+            return compressed
+        data = response.get_data()
+        if len(data) < GZIP_MIN_BYTES:
+            return response
+        response.set_data(gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0))
+        response.headers["Content-Encoding"] = "gzip"
+        return response
+
+    return wrapper
+
+
 @app.route("/api/history")
+@_gzip_negotiated
 def api_history() -> Any:
     metric = (request.args.get("metric") or "").strip().lower()
     metric_map = {
@@ -4685,40 +5796,46 @@ def api_history() -> Any:
         from_ts = to_ts - 24 * 3600
     if from_ts > to_ts:
         return jsonify({"error": "from must be <= to"}), 400
+    encoding = _points_encoding()
+    if encoding is None:
+        return jsonify({"error": "invalid encoding", "allowed": list(POINT_ENCODINGS)}), 400
 
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
+    db_writer.flush()
+    cur = db_connections.connection(DB_PATH).cursor()
     column = metric_map[metric]
+    idx = day_archive.SENSOR_COLUMNS.index(column) + 1
+    archived = ((row[0], row[idx]) for row in retention_manager.archive.iter_through(cur, from_ts, to_ts))
     cur.execute(
         f"SELECT ts, {column} FROM sensor_log WHERE ts >= ? AND ts <= ? ORDER BY ts ASC",
         (from_ts, to_ts),
     )
-    rows = cur.fetchall()
-    conn.close()
-
-    if request.args.get("format") == "csv":
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["ts", metric])
-        writer.writerows(rows)
-        filename = f"history_{metric}.csv"
-        return Response(
-            output.getvalue(),
-            mimetype="text/csv",
-            headers={"Content-Disposition": f"attachment; filename={filename}"},
-        )
-
-    points = [[row[0], row[1]] for row in rows]
-    return jsonify({"metric": metric, "from_ts": from_ts, "to_ts": to_ts, "points": points})
+    rows = chain(archived, _iter_rows(cur))
+
+    export_format = _export_format()
+    if export_format:
+        return _export_response(f"history_{metric}", ("ts", metric), rows, export_format)
+    meta = {"metric": metric, "from_ts": from_ts, "to_ts": to_ts}
+    if encoding != "json":
+        points = list(islice(rows, HISTORY_ENCODED_MAX_ROWS + 1))
+        if len(points) > HISTORY_ENCODED_MAX_ROWS:
+            return jsonify({
+                "error": "too many rows for encoding",
+                "max_rows": HISTORY_ENCODED_MAX_ROWS,
+                "hint": "narrow from/to, or use encoding=json or format=csv (both streamed)",
+            }), 400
+        return jsonify(_encode_points(meta, points, encoding))
+    # no row limit here either, so the JSON body is streamed as well
+    return _json_points_response(meta, rows)
 
 
 @app.route("/api/trends")
+@_gzip_negotiated
 def api_trends() -> Any:
     metric = (request.args.get("metric") or "").strip().lower()
     zone = (request.args.get("zone") or "").strip()
     hours_raw = request.args.get("hours", "6")
     max_points_raw = request.args.get("max_points")
-    format_raw = (request.args.get("format") or "").strip().lower()
+    export_format = _export_format()
     summary_raw = (request.args.get("summary") or "").strip().lower()
     summary_mode = summary_raw in ("1", "true", "yes")
     try:
@@ -4726,10 +5843,13 @@ def api_trends() -> Any:
     except ValueError:
         return jsonify({"error": "hours must be integer"}), 400
     hours = max(1, min(hours, 168))
+    encoding = _points_encoding()
+    if encoding is None:
+        return jsonify({"error": "invalid encoding", "allowed": list(POINT_ENCODINGS)}), 400
     if summary_mode:
         max_points = 0
     elif max_points_raw is None or max_points_raw == "":
-        max_points = 0 if format_raw == "csv" else TREND_MAX_POINTS_DEFAULT
+        max_points = 0 if export_format else TREND_MAX_POINTS_DEFAULT
     else:
         try:
             max_points = int(max_points_raw)
@@ -4737,12 +5857,7 @@ def api_trends() -> Any:
             return jsonify({"error": "max_points must be integer"}), 400
         max_points = max(1, min(max_points, TREND_MAX_POINTS_LIMIT))
 
-    metric_map = {
-        "temp_c": "dht_temp",
-        "rh_pct": "dht_hum",
-        "lux": "lux",
-        "soil_raw": "soil_ch0",
-    }
+    metric_map = TREND_METRIC_COLUMNS
     if not metric:
         return jsonify({"error": "metric is required", "allowed": sorted(metric_map)}), 400
     if metric not in metric_map:
@@ -4763,14 +5878,14 @@ def api_trends() -> Any:
             "last_ts": None,
             "source": None,
         }
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
+        db_writer.flush()
+        cur = db_connections.connection(DB_PATH).cursor()
         if zone:
             cur.execute(
                 """
                 SELECT MIN(value), MAX(value), COUNT(value)
-                FROM telemetry_log
-                WHERE zone = ? AND metric = ? AND ts >= ? AND ts <= ? AND value IS NOT NULL
+                FROM telemetry_sample
+                WHERE series_id IN (SELECT id FROM telemetry_series WHERE zone = ? AND metric = ?) AND ts >= ? AND ts <= ? AND value IS NOT NULL
                 """,
                 (zone, metric, from_ts, to_ts),
             )
@@ -4780,8 +5895,8 @@ def api_trends() -> Any:
                 cur.execute(
                     """
                     SELECT ts, value
-                    FROM telemetry_log
-                    WHERE zone = ? AND metric = ? AND ts >= ? AND ts <= ? AND value IS NOT NULL
+                    FROM telemetry_sample
+                    WHERE series_id IN (SELECT id FROM telemetry_series WHERE zone = ? AND metric = ?) AND ts >= ? AND ts <= ? AND value IS NOT NULL
                     ORDER BY ts DESC LIMIT 1
                     """,
                     (zone, metric, from_ts, to_ts),
@@ -4796,16 +5911,7 @@ def api_trends() -> Any:
                 summary["source"] = "telemetry"
         if summary["count"] == 0 and (not zone or zone.lower() == "sera"):
             column = metric_map[metric]
-            cur.execute(
-                f"""
-                SELECT MIN({column}), MAX({column}), COUNT({column})
-                FROM sensor_log
-                WHERE ts >= ? AND ts <= ? AND {column} IS NOT NULL
-                """,
-                (from_ts, to_ts),
-            )
-            min_val, max_val, count_val = cur.fetchone() or (None, None, 0)
-            count_val = int(count_val or 0)
+            min_val, max_val, count_val = sensor_rollup.summarize(cur, column, from_ts, to_ts)
             if count_val > 0:
                 cur.execute(
                     f"""
@@ -4824,52 +5930,300 @@ def api_trends() -> Any:
                 summary["max"] = max_val
                 summary["count"] = count_val
                 summary["source"] = "sensor_log"
-        conn.close()
         return jsonify(summary)
-    points: List[List[float]] = []
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
+    db_writer.flush()
+    cur = db_connections.connection(DB_PATH).cursor()
+    rows: Optional[Iterable[Sequence[Any]]] = None
+    # candidates: first/last/min/max of max_points/2 buckets, then LTTB down to max_points
+    buckets = max(1, max_points // 2)
+    bucket_width = (to_ts - from_ts) / buckets
     if zone:
-        cur.execute(
-            """
-            SELECT ts, value
-            FROM telemetry_log
-            WHERE zone = ? AND metric = ? AND ts >= ? AND ts <= ?
-            ORDER BY ts ASC
-            """,
-            (zone, metric, from_ts, to_ts),
-        )
-        rows = cur.fetchall()
-        points = [[row[0], row[1]] for row in rows if row[1] is not None]
-    if not points and (not zone or zone.lower() == "sera"):
+        source = """
+            SELECT NULL AS k, ts, value, value AS lo, value AS hi
+            FROM telemetry_sample
+            WHERE series_id IN (SELECT id FROM telemetry_series WHERE zone = ? AND metric = ?) AND ts >= ? AND ts <= ? AND value IS NOT NULL
+        """
+        params = (zone, metric, from_ts, to_ts)
+        if max_points:
+            points = _bucket_extremes(cur, source, params, from_ts, bucket_width)
+            rows = [row[1:] for row in points] or None
+        else:
+            cur.execute(source + " ORDER BY ts ASC", params)
+            first = cur.fetchone()
+            if first is not None:
+                rows = (row[1:] for row in chain([first], _iter_rows(cur)))
+    if rows is None and (not zone or zone.lower() == "sera"):
         column = metric_map[metric]
+        rollup_res = sensor_rollup.pick_resolution(bucket_width) if max_points else None
+        if rollup_res:
+            source = f"""
+                SELECT NULL AS k, bucket AS ts, {column}_sum / {column}_n AS value, {column}_min AS lo, {column}_max AS hi
+                FROM sensor_rollup
+                WHERE res = ? AND bucket > ? AND bucket <= ? AND {column}_n > 0
+            """
+            points = _bucket_extremes(cur, source, (rollup_res, from_ts - rollup_res, to_ts), from_ts, bucket_width)
+            rows = [row[1:] for row in points]
+        else:
+            source = f"""
+                SELECT NULL AS k, ts, {column} AS value, {column} AS lo, {column} AS hi
+                FROM sensor_log
+                WHERE ts >= ? AND ts <= ? AND {column} IS NOT NULL
+            """
+            if max_points:
+                points = _bucket_extremes(cur, source, (from_ts, to_ts), from_ts, bucket_width)
+                rows = [row[1:] for row in points]
+            else:
+                cur.execute(source + " ORDER BY ts ASC", (from_ts, to_ts))
+                rows = (row[1:] for row in _iter_rows(cur))
+    if rows is None:
+        rows = []
+    if max_points:
+        rows = _downsample_points([[row[0], row[1]] for row in rows], max_points)
+    if export_format:
+        return _export_response(f"trends_{zone or 'sera'}_{metric}", ("ts", metric), rows, export_format)
+    meta = {"zone": zone or None, "metric": metric, "from_ts": from_ts, "to_ts": to_ts}
+    if encoding != "json":
+        return jsonify(_encode_points(meta, rows, encoding))
+    return jsonify({**meta, "points": [[row[0], row[1]] for row in rows]})
+
+
+def _bucket_extremes(
+    cur: sqlite3.Cursor, source_sql: str, params: Sequence[Any], from_ts: float, bucket_width: float
+) -> List[Tuple[Any, float, float]]:
+    """First, last, lowest and highest point of every bucket of every series, computed in SQLite.
+
+    `source_sql` yields (k, ts, value, lo, hi) where k names the series; raw
+    rows use value for lo/hi, rollup rows their bucket min/max. Returns
+    (k, ts, value) ordered by k, ts. Relies on SQLite filling bare columns
+    from the row that a lone MIN()/MAX() picked.
+    """
+    width = max(bucket_width, 1e-6)
+    cur.execute(
+        f"""
+        WITH src AS ({source_sql}),
+        g AS (SELECT k, CAST((ts - ?) / ? AS INTEGER) AS b, ts, value, lo, hi FROM src)
+        SELECT k, ts, value FROM (SELECT k, b, MIN(ts) AS ts, value FROM g GROUP BY k, b)
+        UNION
+        SELECT k, ts, value FROM (SELECT k, b, MAX(ts) AS ts, value FROM g GROUP BY k, b)
+        UNION
+        SELECT k, ts, lo FROM (SELECT k, b, ts, MIN(lo) AS lo FROM g GROUP BY k, b)
+        UNION
+        SELECT k, ts, hi FROM (SELECT k, b, ts, MAX(hi) AS hi FROM g GROUP BY k, b)
+        ORDER BY 1, 2
+        """,
+        (*params, from_ts, width),
+    )
+    return cur.fetchall()
+
+
+def _trend_batch_pairs() -> List[Tuple[str, str]]:
+    """(zone, metric) pairs from `series=zone:metric` args, repeated and/or comma separated."""
+    pairs: List[Tuple[str, str]] = []
+    for raw in request.args.getlist("series"):
+        for item in raw.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            zone, _, metric = item.rpartition(":")
+            pairs.append((zone.strip(), metric.strip().lower()))
+    return pairs
+
+
+def _telemetry_series_ids(cur: sqlite3.Cursor, pairs: Sequence[Tuple[str, str]]) -> Dict[int, Tuple[str, str]]:
+    zoned = [pair for pair in pairs if pair[0]]
+    if not zoned:
+        return {}
+    values = ", ".join("(?, ?)" for _ in zoned)
+    cur.execute(
+        f"SELECT id, zone, metric FROM telemetry_series WHERE (zone, metric) IN (VALUES {values})",
+        [value for pair in zoned for value in pair],
+    )
+    return {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+
+
+def _sera_fallback(pairs: Sequence[Tuple[str, str]], done: Any) -> List[Tuple[str, str]]:
+    return [pair for pair in pairs if pair not in done and (not pair[0] or pair[0].lower() == "sera")]
+
+
+def _trend_batch_points(
+    cur: sqlite3.Cursor, pairs: Sequence[Tuple[str, str]], from_ts: float, to_ts: float, max_points: int
+) -> Dict[Tuple[str, str], List[Sequence[Any]]]:
+    """Points of every pair: one grouped telemetry scan, then one sensor_log scan for sera pairs without telemetry."""
+    found: Dict[Tuple[str, str], List[Sequence[Any]]] = {}
+    buckets = max(1, max_points // 2)
+    bucket_width = (to_ts - from_ts) / buckets
+    series_ids = _telemetry_series_ids(cur, pairs)
+    if series_ids:
+        placeholders = ", ".join("?" for _ in series_ids)
+        source = f"""
+            SELECT series_id AS k, ts, value, value AS lo, value AS hi
+            FROM telemetry_sample
+            WHERE series_id IN ({placeholders}) AND ts >= ? AND ts <= ? AND value IS NOT NULL
+        """
+        params = (*series_ids, from_ts, to_ts)
+        for row in _bucket_extremes(cur, source, params, from_ts, bucket_width):
+            found.setdefault(series_ids[row[0]], []).append((row[1], row[2]))
+        # a pair may own several series ids; their candidates arrive one series after another
+        for points in found.values():
+            points.sort(key=lambda point: point[0])
+
+    fallback = _sera_fallback(pairs, found)
+    columns = list(dict.fromkeys(TREND_METRIC_COLUMNS[metric] for _, metric in fallback))
+    if columns:
+        by_column: Dict[str, List[Sequence[Any]]] = {column: [] for column in columns}
+        rollup_res = sensor_rollup.pick_resolution(bucket_width)
+        # plain CTE: the MATERIALIZED hint needs SQLite 3.35+ (Bullseye ships 3.34); 3.35+
+        # materialises r anyway since every column branch reads it, older releases may inline it
+        if rollup_res:
+            select = ", ".join(
+                f"{column}_sum / {column}_n AS {column}, {column}_min AS {column}_lo, {column}_max AS {column}_hi"
+                for column in columns
+            )
+            source = f"WITH r AS (SELECT bucket AS ts, {select} FROM sensor_rollup WHERE res = ? AND bucket > ? AND bucket <= ?) "
+            source += " UNION ALL ".join(
+                f"SELECT '{column}' AS k, ts, {column} AS value, {column}_lo AS lo, {column}_hi AS hi FROM r WHERE {column} IS NOT NULL"
+                for column in columns
+            )
+            params = (rollup_res, from_ts - rollup_res, to_ts)
+        else:
+            source = f"WITH r AS (SELECT ts, {', '.join(columns)} FROM sensor_log WHERE ts >= ? AND ts <= ?) "
+            source += " UNION ALL ".join(
+                f"SELECT '{column}' AS k, ts, {column} AS value, {column} AS lo, {column} AS hi FROM r WHERE {column} IS NOT NULL"
+                for column in columns
+            )
+            params = (from_ts, to_ts)
+        rows = _bucket_extremes(cur, source, params, from_ts, bucket_width)
+        for row in rows:
+            by_column[row[0]].append((row[1], row[2]))
+        for pair in fallback:
+            found[pair] = by_column[TREND_METRIC_COLUMNS[pair[1]]]
+    return found
+
+
+def _trend_batch_summaries(
+    cur: sqlite3.Cursor, pairs: Sequence[Tuple[str, str]], from_ts: float, to_ts: float
+) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """Summary of every pair: two grouped telemetry queries, then shared rollup reads for sera pairs."""
+    found: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    series_ids = _telemetry_series_ids(cur, pairs)
+    if series_ids:
+        placeholders = ", ".join("?" for _ in series_ids)
+        where = f"series_id IN ({placeholders}) AND ts >= ? AND ts <= ? AND value IS NOT NULL"
+        params = (*series_ids, from_ts, to_ts)
+        cur.execute(f"SELECT series_id, MIN(value), MAX(value), COUNT(value) FROM telemetry_sample WHERE {where} GROUP BY series_id", params)
+        for series_id, min_val, max_val, count_val in cur.fetchall():
+            if not count_val:
+                continue
+            item = found.setdefault(
+                series_ids[series_id],
+                {"count": 0, "min": min_val, "max": max_val, "last": None, "last_ts": None, "source": "telemetry"},
+            )
+            item["count"] += int(count_val)
+            item["min"] = min(item["min"], min_val)
+            item["max"] = max(item["max"], max_val)
+        if found:
+            # bare value comes from the row holding MAX(ts)
+            cur.execute(f"SELECT series_id, MAX(ts), value FROM telemetry_sample WHERE {where} GROUP BY series_id", params)
+            for series_id, last_ts, last in cur.fetchall():
+                item = found.get(series_ids[series_id])
+                if item is not None and (item["last_ts"] is None or last_ts > item["last_ts"]):
+                    item["last_ts"] = last_ts
+                    item["last"] = last
+
+    fallback = _sera_fallback(pairs, found)
+    columns = list(dict.fromkeys(TREND_METRIC_COLUMNS[metric] for _, metric in fallback))
+    if columns:
+        stats = sensor_rollup.summarize_many(cur, columns, from_ts, to_ts)
+        last: Dict[str, Tuple[Any, Any]] = {}
         cur.execute(
-            f"SELECT ts, {column} FROM sensor_log WHERE ts >= ? AND ts <= ? ORDER BY ts ASC",
+            f"SELECT ts, {', '.join(columns)} FROM sensor_log WHERE ts >= ? AND ts <= ? ORDER BY ts DESC LIMIT 1",
             (from_ts, to_ts),
         )
-        rows = cur.fetchall()
-        points = [[row[0], row[1]] for row in rows if row[1] is not None]
-    conn.close()
-    points = _downsample_points(points, max_points)
-    if format_raw == "csv":
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["ts", metric])
-        writer.writerows(points)
-        zone_part = zone or "sera"
-        filename = f"trends_{zone_part}_{metric}.csv"
-        return Response(
-            output.getvalue(),
-            mimetype="text/csv",
-            headers={"Content-Disposition": f"attachment; filename={filename}"},
-        )
-    return jsonify({
-        "zone": zone or None,
-        "metric": metric,
-        "from_ts": from_ts,
-        "to_ts": to_ts,
-        "points": points,
-    })
+        row = cur.fetchone()
+        for pos, column in enumerate(columns, start=1):
+            if row is not None and row[pos] is not None:
+                last[column] = (row[0], row[pos])
+            elif stats[column][2] > 0:
+                cur.execute(
+                    f"SELECT ts, {column} FROM sensor_log WHERE ts >= ? AND ts <= ? AND {column} IS NOT NULL ORDER BY ts DESC LIMIT 1",
+                    (from_ts, to_ts),
+                )
+                last_row = cur.fetchone()
+                if last_row:
+                    last[column] = (last_row[0], last_row[1])
+        for pair in fallback:
+            column = TREND_METRIC_COLUMNS[pair[1]]
+            min_val, max_val, count_val = stats[column]
+            if count_val > 0:
+                last_ts, last_val = last.get(column, (None, None))
+                found[pair] = {
+                    "count": count_val,
+                    "min": min_val,
+                    "max": max_val,
+                    "last": last_val,
+                    "last_ts": last_ts,
+                    "source": "sensor_log",
+                }
+    return found
+
+
+@app.route("/api/trends/batch")
+@_gzip_negotiated
+def api_trends_batch() -> Any:
+    pairs = _trend_batch_pairs()
+    if not pairs:
+        return jsonify({"error": "series is required", "allowed": sorted(TREND_METRIC_COLUMNS)}), 400
+    if len(pairs) > TREND_BATCH_MAX_SERIES:
+        return jsonify({"error": "too many series", "limit": TREND_BATCH_MAX_SERIES}), 400
+    if any(metric not in TREND_METRIC_COLUMNS for _, metric in pairs):
+        return jsonify({"error": "invalid metric", "allowed": sorted(TREND_METRIC_COLUMNS)}), 400
+    summary_mode = (request.args.get("summary") or "").strip().lower() in ("1", "true", "yes")
+    try:
+        hours = int(request.args.get("hours", "6"))
+    except ValueError:
+        return jsonify({"error": "hours must be integer"}), 400
+    hours = max(1, min(hours, 168))
+    max_points_raw = request.args.get("max_points")
+    if summary_mode:
+        max_points = 0
+    elif max_points_raw is None or max_points_raw == "":
+        max_points = TREND_MAX_POINTS_DEFAULT
+    else:
+        try:
+            max_points = int(max_points_raw)
+        except ValueError:
+            return jsonify({"error": "max_points must be integer"}), 400
+        max_points = max(1, min(max_points, TREND_MAX_POINTS_LIMIT))
+    encoding = _points_encoding()
+    if encoding is None:
+        return jsonify({"error": "invalid encoding", "allowed": list(POINT_ENCODINGS)}), 400
+
+    to_ts = time.time()
+    from_ts = to_ts - hours * 3600
+    unique = list(dict.fromkeys(pairs))
+    db_writer.flush()
+    cur = db_connections.connection(DB_PATH).cursor()
+    series: List[Dict[str, Any]] = []
+    if summary_mode:
+        summaries = _trend_batch_summaries(cur, unique, from_ts, to_ts)
+        empty = {"count": 0, "min": None, "max": None, "last": None, "last_ts": None, "source": None}
+        for zone, metric in pairs:
+            meta = {"zone": zone or None, "metric": metric, "from_ts": from_ts, "to_ts": to_ts}
+            series.append({**meta, **summaries.get((zone, metric), empty)})
+    else:
+        found = _trend_batch_points(cur, unique, from_ts, to_ts, max_points)
+        downsampled: Dict[Tuple[str, str], List[List[Any]]] = {}
+        for pair in unique:
+            points = [[row[0], row[1]] for row in found.get(pair, [])]
+            downsampled[pair] = _downsample_points(points, max_points)
+        for zone, metric in pairs:
+            meta = {"zone": zone or None, "metric": metric, "from_ts": from_ts, "to_ts": to_ts}
+            points = downsampled[(zone, metric)]
+            if encoding != "json":
+                series.append(_encode_points(meta, points, encoding))
+            else:
+                series.append({**meta, "points": points})
+    return jsonify({"from_ts": from_ts, "to_ts": to_ts, "series": series})
 
 
 @app.route("/api/events")
@@ -4900,11 +6254,10 @@ def api_events() -> Any:
     query += " ORDER BY ts DESC LIMIT ?"
     params.append(limit)
 
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
+    db_writer.flush()
+    cur = db_connections.connection(DB_PATH).cursor()
     cur.execute(query, params)
     rows = cur.fetchall()
-    conn.close()
 
     events = []
     for ts, cat, level, message, meta in rows:
@@ -4924,19 +6277,73 @@ def api_events() -> Any:
     return jsonify({"events": events})
 
 
-def _csv_response(filename: str, headers_row: List[str], rows: List[List[Any]]) -> Response:
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(headers_row)
-    for row in rows:
-        writer.writerow(row)
+def _export_format() -> Optional[str]:
+    fmt = (request.args.get("format") or "").strip().lower()
+    return fmt if fmt in ("csv", "ndjson") else None
+
+
+def _iter_rows(cur: sqlite3.Cursor) -> Iterator[Tuple[Any, ...]]:
+    """Rows of an executed cursor, EXPORT_CHUNK_ROWS at a time."""
+    try:
+        while True:
+            chunk = cur.fetchmany(max(1, EXPORT_CHUNK_ROWS))
+            if not chunk:
+                return
+            yield from chunk
+    finally:
+        cur.close()
+
+
+def _export_response(basename: str, header: Sequence[str], rows: Iterable[Sequence[Any]], fmt: str = "csv") -> Response:
+    """Stream rows as CSV or NDJSON; the body is written chunk by chunk, never held whole."""
+
+    def generate() -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == "csv":
+            writer.writerow(header)
+        pending = 0
+        for row in rows:
+            if fmt == "csv":
+                writer.writerow(row)
+            else:
+                buffer.write(json.dumps(dict(zip(header, row))))
+                buffer.write("\n")
+            pending += 1
+            if pending >= EXPORT_CHUNK_ROWS:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
     return Response(
-        output.getvalue(),
-        mimetype="text/csv",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
+        generate(),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={basename}.{fmt}"},
     )
 
 
+def _json_points_response(meta: Dict[str, Any], rows: Iterable[Sequence[Any]]) -> Response:
+    """`{**meta, "points": [[ts, value], ...]}` streamed without building the list."""
+
+    def generate() -> Iterator[str]:
+        yield json.dumps(meta)[:-1] + ', "points": ['
+        sep = ""
+        chunk: List[str] = []
+        for row in rows:
+            chunk.append(f"{sep}{json.dumps([row[0], row[1]])}")
+            sep = ","
+            if len(chunk) >= EXPORT_CHUNK_ROWS:
+                yield "".join(chunk)
+                chunk = []
+        yield "".join(chunk) + "]}"
+
+    return Response(generate(), mimetype="application/json")
+
+
 @app.route("/api/reports/daily")
 def api_reports_daily() -> Any:
     cfg = load_reporting_config()
@@ -4948,7 +6355,7 @@ def api_reports_daily() -> Any:
         return jsonify({"error": "date must be YYYY-MM-DD"}), 400
     if target_date is None:
         target_date = _default_report_date(cfg)
-    report = build_daily_report(target_date, profile, cfg)
+    report = build_daily_report(target_date, profile, cfg, retention_manager.archive)
     return jsonify(report)
 
 
@@ -4963,7 +6370,7 @@ def api_reports_daily_csv() -> Any:
         return jsonify({"error": "date must be YYYY-MM-DD"}), 400
     if target_date is None:
         target_date = _default_report_date(cfg)
-    report = build_daily_report(target_date, profile, cfg)
+    report = build_daily_report(target_date, profile, cfg, retention_manager.archive)
     headers_row = [
         "time",
         "lux",
@@ -4996,7 +6403,7 @@ def api_reports_daily_csv() -> Any:
             entry.get("cloud_cover"),
             entry.get("temp_delta"),
         ])
-    return _csv_response(f"daily_report_{target_date.isoformat()}.csv", headers_row, rows)
+    return _export_response(f"daily_report_{target_date.isoformat()}", headers_row, rows)
 
 
 @app.route("/api/reports/weekly")
@@ -5010,7 +6417,7 @@ def api_reports_weekly() -> Any:
         return jsonify({"error": "end must be YYYY-MM-DD"}), 400
     if end_date is None:
         end_date = _default_report_date(cfg)
-    report = build_weekly_report(end_date, profile, cfg)
+    report = build_weekly_report(end_date, profile, cfg, retention_manager.archive)
     return jsonify(report)
 
 
@@ -5025,7 +6432,7 @@ def api_reports_weekly_csv() -> Any:
         return jsonify({"error": "end must be YYYY-MM-DD"}), 400
     if end_date is None:
         end_date = _default_report_date(cfg)
-    report = build_weekly_report(end_date, profile, cfg)
+    report = build_weekly_report(end_date, profile, cfg, retention_manager.archive)
     headers_row = [
         "date",
         "light_dose_lux_hours",
@@ -5054,7 +6461,7 @@ def api_reports_weekly_csv() -> Any:
             day.get("plants", {}).get("gdd"),
             day.get("coverage", {}).get("note"),
         ])
-    return _csv_response(f"weekly_report_{report.get('start_date')}_{report.get('end_date')}.csv", headers_row, rows)
+    return _export_response(f"weekly_report_{report.get('start_date')}_{report.get('end_date')}", headers_row, rows)
 
 
 @app.route("/api/reports/explainers")
@@ -5192,6 +6599,10 @@ def api_config() -> Any:
     safe_mode = payload.get("safe_mode")
     notifications_payload = payload.get("notifications")
     retention_payload = payload.get("retention")
+    if payload.get("reload_catalog"):
+        # catalog.json is written by scripts/migrate_catalog.py, not by the panel
+        reload_catalog()
+        status_snapshot.invalidate()
     if channels:
         errors = validate_channels_payload(channels)
         if errors:
@@ -5229,6 +6640,7 @@ def api_config() -> Any:
         sensors_config.update(sensors_payload)
         _write_json_atomic(SENSORS_CONFIG_PATH, sensors_config)
         sensor_manager.reload_config(sensors_config)
+        _report_sensor_config_problems()
         lcd_manager.update_config(sensors_config)
     if notifications_payload:
         errors = validate_notifications_payload(notifications_payload)
@@ -5340,6 +6752,7 @@ def api_lcd() -> Any:
         with SENSORS_CONFIG_PATH.open("w") as f:
             json.dump(sensors_config, f, indent=2)
         sensor_manager.reload_config(sensors_config)
+        _report_sensor_config_problems()
         lcd_manager.update_config(sensors_config)
     mode = str(sensors_config.get("lcd_mode", "auto"))
     if isinstance(lines, list):
@@ -5407,4 +6820,5 @@ def create_app() -> Flask:
 
 
 if __name__ == "__main__":
+    signal.signal(signal.SIGTERM, lambda _signum, _frame: sys.exit(0))
     app.run(host="0.0.0.0", port=5000, debug=SIMULATION_MODE)
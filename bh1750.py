@@ -0,0 +1,129 @@
+"""BH1750 light sensor in continuous measurement mode.
+
+The sensor is configured once (power on, MTreg, continuous mode), after
+which each read is a single 2-byte I2C read. The address that answered is
+remembered. After a failure the sensor is probed again, primary address
+first, but only once an exponential backoff has passed.
+"""
+
+import time
+from typing import Any, Callable, Optional, Tuple
+
+POWER_ON = 0x01
+CONTINUOUS_HIGH_RES = 0x10
+CONTINUOUS_HIGH_RES2 = 0x11
+MODES = {"high": CONTINUOUS_HIGH_RES, "high2": CONTINUOUS_HIGH_RES2}
+ADDRESSES = (0x23, 0x5C)
+MTREG_DEFAULT = 69
+MTREG_MIN = 31
+MTREG_MAX = 254
+# worst-case high-resolution measurement time at the default MTreg
+MEASUREMENT_SECONDS = 0.18
+
+
+def _alternate(addr: int) -> Optional[int]:
+    if addr in ADDRESSES:
+        return ADDRESSES[1 - ADDRESSES.index(addr)]
+    return None
+
+
+class BH1750:
+    def __init__(
+        self,
+        bus: Any,
+        addr: int = ADDRESSES[0],
+        mtreg: int = MTREG_DEFAULT,
+        mode: str = "high",
+        backoff_seconds: float = 5.0,
+        backoff_max_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if not MTREG_MIN <= mtreg <= MTREG_MAX:
+            raise ValueError(f"BH1750 MTreg must be {MTREG_MIN}-{MTREG_MAX}")
+        if mode not in MODES:
+            raise ValueError(f"BH1750 mode must be one of {tuple(MODES)}")
+        self.bus = bus
+        self.primary_addr = addr
+        self.mtreg = mtreg
+        self.mode = mode
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.clock = clock
+        self.sleep = sleep
+        # address that answered the last probe; None until found or after a failure
+        self.addr: Optional[int] = None
+        self.failures = 0
+        self.retry_at = 0.0
+        self.ready_at = 0.0
+
+    @property
+    def measurement_seconds(self) -> float:
+        return MEASUREMENT_SECONDS * self.mtreg / MTREG_DEFAULT
+
+    def _configure(self, addr: int) -> None:
+        self.bus.write_byte(addr, POWER_ON)
+        # MTreg is written in two parts: high 3 bits, then low 5 bits
+        self.bus.write_byte(addr, 0x40 | (self.mtreg >> 5))
+        self.bus.write_byte(addr, 0x60 | (self.mtreg & 0x1F))
+        self.bus.write_byte(addr, MODES[self.mode])
+        self.ready_at = self.clock() + self.measurement_seconds
+
+    def _probe(self) -> int:
+        last_error: Optional[Exception] = None
+        alternate = _alternate(self.primary_addr)
+        for addr in (self.primary_addr, alternate):
+            if addr is None:
+                continue
+            try:
+                self._configure(addr)
+                return addr
+            except Exception as exc:
+                last_error = exc
+        raise OSError(f"BH1750 not found: {last_error}")
+
+    def _read_raw(self, addr: int) -> int:
+        try:
+            from smbus2 import i2c_msg  # type: ignore
+        except ImportError:
+            i2c_msg = None
+        if i2c_msg is not None and hasattr(self.bus, "i2c_rdwr"):
+            # plain read: re-sending the mode command would restart the measurement
+            msg = i2c_msg.read(addr, 2)
+            self.bus.i2c_rdwr(msg)
+            data = list(msg)
+        else:
+            data = self.bus.read_i2c_block_data(addr, MODES[self.mode], 2)
+        return (data[0] << 8) | data[1]
+
+    def _fail(self) -> None:
+        self.addr = None
+        self.failures += 1
+        delay = min(self.backoff_max_seconds, self.backoff_seconds * 2 ** (self.failures - 1))
+        self.retry_at = self.clock() + delay
+
+    def read(self) -> Tuple[float, int]:
+        """(lux, address); raises OSError while the sensor is missing or backing off."""
+        if self.addr is None:
+            if self.clock() < self.retry_at:
+                raise OSError("BH1750 probe backing off")
+            try:
+                self.addr = self._probe()
+            except OSError:
+                self._fail()
+                raise
+        wait = self.ready_at - self.clock()
+        if wait > 0:
+            # only right after (re)configuring: the first measurement is not done yet
+            self.sleep(wait)
+        try:
+            raw = self._read_raw(self.addr)
+        except Exception as exc:
+            addr = self.addr
+            self._fail()
+            raise OSError(f"BH1750 read failed at {addr:#x}: {exc}") from exc
+        self.failures = 0
+        lux = raw / 1.2 * MTREG_DEFAULT / self.mtreg
+        if self.mode == "high2":
+            lux /= 2
+        return lux, self.addr
@@ -0,0 +1,117 @@
+"""Lookup tables over config/catalog.json.
+
+A `CatalogIndex` is built once per loaded catalog and never changed
+afterwards; a reload builds a new one and rebinds the global, so readers
+always see one consistent catalog.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+FAN_ROLES = frozenset({"fan", "fan_canopy", "fan_box", "fan_exhaust"})
+
+Entry = Dict[str, Any]
+
+
+def _entries(value: Any) -> Tuple[Entry, ...]:
+    if not isinstance(value, list):
+        return ()
+    return tuple(item for item in value if isinstance(item, dict))
+
+
+def _upper_names(entry: Entry, keys: Sequence[str]) -> Tuple[str, ...]:
+    names: List[str] = []
+    for key in keys:
+        value = entry.get(key)
+        if isinstance(value, str) and value.strip():
+            names.append(value.strip().upper())
+    return tuple(names)
+
+
+def actuator_id(entry: Entry) -> Optional[str]:
+    """The id a node knows the actuator by: id, else legacy_name, else name."""
+    for key in ("id", "legacy_name", "name"):
+        value = entry.get(key)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return None
+
+
+def _is_remote(entry: Entry) -> bool:
+    return str(entry.get("backend") or "").lower() == "esp32"
+
+
+class CatalogIndex:
+    """Immutable view of one catalog; `config` is None when no catalog file is loaded."""
+
+    def __init__(self, config: Optional[Dict[str, Any]]) -> None:
+        self.config = config if isinstance(config, dict) else None
+        cfg = self.config or {}
+        self.version = int(cfg.get("version") or 0)
+        self.zones = _entries(cfg.get("zones"))
+        self.sensors = _entries(cfg.get("sensors"))
+        self.actuators = _entries(cfg.get("actuators"))
+
+        by_name: Dict[str, int] = {}
+        by_pin: Dict[Any, int] = {}
+        fans_by_zone: Dict[Any, List[Entry]] = {}
+        remote_actuators: List[Tuple[str, str, Entry]] = []
+        channel_names: Dict[int, Tuple[str, ...]] = {}
+        for pos, entry in enumerate(self.actuators):
+            # first entry wins, like the linear scans this replaces
+            for name in _upper_names(entry, ("id", "legacy_name", "name")):
+                by_name.setdefault(name, pos)
+            pin = entry.get("gpio_pin")
+            if pin is not None:
+                by_pin.setdefault(pin, pos)
+            zone = entry.get("zone")
+            role = str(entry.get("role") or "").lower()
+            if zone and role in FAN_ROLES:
+                fans_by_zone.setdefault(zone, []).append(entry)
+            channel_names[id(entry)] = _upper_names(entry, ("legacy_name", "name", "id"))
+            node_id = str(entry.get("node_id") or "").strip()
+            remote_id = actuator_id(entry)
+            if _is_remote(entry) and node_id and remote_id:
+                remote_actuators.append((node_id, remote_id, entry))
+
+        sensors_by_id: Dict[str, Entry] = {}
+        remote_sensors: List[Tuple[str, Entry]] = []
+        for entry in self.sensors:
+            sensor_id = str(entry.get("id") or "").strip()
+            if not sensor_id:
+                continue
+            sensors_by_id.setdefault(sensor_id, entry)
+            if _is_remote(entry) or entry.get("node_id"):
+                remote_sensors.append((sensor_id, entry))
+
+        self._by_name = by_name
+        self._by_pin = by_pin
+        self._fans_by_zone = {key: tuple(items) for key, items in fans_by_zone.items()}
+        self._channel_names = channel_names
+        self._sensors_by_id = sensors_by_id
+        self.remote_actuators: Tuple[Tuple[str, str, Entry], ...] = tuple(remote_actuators)
+        self.remote_sensors: Tuple[Tuple[str, Entry], ...] = tuple(remote_sensors)
+
+    @property
+    def loaded(self) -> bool:
+        return self.config is not None
+
+    def find_actuator(self, name: str, gpio_pin: Any = None) -> Optional[Entry]:
+        """Entry whose id/legacy_name/name matches `name` (case-insensitive) or whose gpio_pin matches."""
+        hits = [self._by_name.get(name.upper())]
+        if gpio_pin is not None:
+            hits.append(self._by_pin.get(gpio_pin))
+        found = [pos for pos in hits if pos is not None]
+        return self.actuators[min(found)] if found else None
+
+    def fans_in(self, zone: Any) -> Tuple[Entry, ...]:
+        return self._fans_by_zone.get(zone, ())
+
+    def channel_names(self, entry: Entry) -> Tuple[str, ...]:
+        """Upper-cased legacy_name, name, id: the names a local relay channel may use."""
+        names = self._channel_names.get(id(entry))
+        if names is None:
+            names = _upper_names(entry, ("legacy_name", "name", "id"))
+        return names
+
+    def sensor(self, sensor_id: str) -> Optional[Entry]:
+        return self._sensors_by_id.get(sensor_id)
@@ -0,0 +1,209 @@
+"""Per-day compressed columnar archives for expired sensor_log rows.
+
+File layout (zlib-compressed after a 5 byte magic):
+  u32 header length, JSON header {"columns", "count", "ts0_ms"},
+  int32 timestamp deltas in ms (first is 0), then one float32 array per
+  column (NaN for NULL). All arrays little-endian.
+"""
+
+import json
+import math
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+MAGIC = b"SCOL1"
+SENSOR_COLUMNS = ("dht_temp", "dht_hum", "ds18_temp", "lux", "soil_ch0", "soil_ch1", "soil_ch2", "soil_ch3")
+
+Row = Tuple[Any, ...]
+
+
+def _to_le(arr: array) -> bytes:
+    if sys.byteorder == "big":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_le(typecode: str, data: bytes) -> array:
+    arr = array(typecode)
+    arr.frombytes(data)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def encode_day(rows: Sequence[Row], columns: Sequence[str] = SENSOR_COLUMNS) -> bytes:
+    """rows: (ts, col...) sorted by ts."""
+    ts_ms = [int(round(float(row[0]) * 1000)) for row in rows]
+    ts0 = ts_ms[0] if ts_ms else 0
+    deltas = array("i", [0] + [b - a for a, b in zip(ts_ms, ts_ms[1:])] if ts_ms else [])
+    header = json.dumps({"columns": list(columns), "count": len(rows), "ts0_ms": ts0}).encode()
+    parts = [struct.pack("<I", len(header)), header, _to_le(deltas)]
+    for idx in range(len(columns)):
+        values = array("f", (math.nan if row[idx + 1] is None else float(row[idx + 1]) for row in rows))
+        parts.append(_to_le(values))
+    return MAGIC + zlib.compress(b"".join(parts), 6)
+
+
+def decode_day(blob: bytes) -> Tuple[List[str], List[Row]]:
+    if not blob.startswith(MAGIC):
+        raise ValueError("not a sensor day archive")
+    body = zlib.decompress(blob[len(MAGIC):])
+    (header_len,) = struct.unpack_from("<I", body, 0)
+    offset = 4 + header_len
+    header = json.loads(body[4:offset])
+    columns = list(header["columns"])
+    count = int(header["count"])
+    deltas = _from_le("i", body[offset:offset + 4 * count])
+    offset += 4 * count
+    column_values = []
+    for _ in columns:
+        column_values.append(_from_le("f", body[offset:offset + 4 * count]))
+        offset += 4 * count
+    rows: List[Row] = []
+    ts_ms = int(header["ts0_ms"])
+    for i in range(count):
+        ts_ms += deltas[i]
+        # %.7g restores the short decimal a float32 was written from (21.37, not 21.3700008)
+        values = [None if math.isnan(col[i]) else float("%.7g" % col[i]) for col in column_values]
+        rows.append((ts_ms / 1000.0, *values))
+    return columns, rows
+
+
+def _day_start(ts: float) -> datetime:
+    dt = datetime.fromtimestamp(ts, timezone.utc)
+    return datetime(dt.year, dt.month, dt.day, tzinfo=timezone.utc)
+
+
+class DayArchive:
+    """Reads and writes `<root>/sensor_log_YYYY-MM-DD.colz` (UTC days)."""
+
+    def __init__(self, root: Path, columns: Sequence[str] = SENSOR_COLUMNS, cache_days: int = 8) -> None:
+        self.root = Path(root)
+        self.columns = tuple(columns)
+        self.cache_days = cache_days
+        self._cache: "OrderedDict[Tuple[str, float], List[Row]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path_for(self, day: datetime) -> Path:
+        return self.root / f"sensor_log_{day.strftime('%Y-%m-%d')}.colz"
+
+    def _load(self, path: Path) -> List[Row]:
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return []
+        key = (str(path), mtime)
+        with self._lock:
+            rows = self._cache.get(key)
+            if rows is not None:
+                self._cache.move_to_end(key)
+                return rows
+        columns, rows = decode_day(path.read_bytes())
+        if tuple(columns) != self.columns:
+            index = {name: i for i, name in enumerate(columns)}
+            rows = [
+                (row[0], *(row[index[c] + 1] if c in index else None for c in self.columns))
+                for row in rows
+            ]
+        with self._lock:
+            self._cache[key] = rows
+            while len(self._cache) > self.cache_days:
+                self._cache.popitem(last=False)
+        return rows
+
+    def export_before(self, cur: sqlite3.Cursor, cutoff: float) -> Dict[str, int]:
+        """Write sensor_log rows older than `cutoff` into day files (merging with existing ones)."""
+        # ORDER BY ts LIMIT 1 stays an index probe when sensor_log is a partitioned view; MIN() would scan
+        cur.execute("SELECT ts FROM sensor_log WHERE ts < ? ORDER BY ts LIMIT 1", (cutoff,))
+        first = (cur.fetchone() or (None,))[0]
+        written: Dict[str, int] = {}
+        if first is None:
+            return written
+        self.root.mkdir(parents=True, exist_ok=True)
+        cols = ", ".join(self.columns)
+        day = _day_start(float(first))
+        while day.timestamp() < cutoff:
+            start = day.timestamp()
+            end = min((day + timedelta(days=1)).timestamp(), cutoff)
+            cur.execute(
+                f"SELECT ts, {cols} FROM sensor_log WHERE ts >= ? AND ts < ? ORDER BY ts ASC",
+                (start, end),
+            )
+            rows = cur.fetchall()
+            if rows:
+                path = self.path_for(day)
+                if path.exists():
+                    merged = {round(row[0], 3): row for row in self._load(path)}
+                    merged.update({round(float(row[0]), 3): row for row in rows})
+                    rows = [merged[key] for key in sorted(merged)]
+                tmp = path.with_suffix(".tmp")
+                tmp.write_bytes(encode_day(rows, self.columns))
+                os.replace(tmp, path)
+                written[path.name] = len(rows)
+            day += timedelta(days=1)
+        return written
+
+    def iter_range(
+        self, from_ts: float, to_ts: float, before_ts: Optional[float] = None, reverse: bool = False
+    ) -> Iterator[Row]:
+        """Archived rows with from_ts <= ts <= to_ts (and ts < before_ts), one day file in memory at a time."""
+        if not self.root.exists() or from_ts > to_ts:
+            return
+        days = []
+        day = _day_start(from_ts)
+        while day.timestamp() <= to_ts:
+            days.append(day)
+            day += timedelta(days=1)
+        for day in reversed(days) if reverse else days:
+            path = self.path_for(day)
+            if not path.exists():
+                continue
+            rows = self._load(path)
+            for row in reversed(rows) if reverse else rows:
+                ts = row[0]
+                if ts < from_ts or ts > to_ts or (before_ts is not None and ts >= before_ts):
+                    continue
+                yield row
+
+    def read_range(self, from_ts: float, to_ts: float, before_ts: Optional[float] = None) -> List[Row]:
+        return list(self.iter_range(from_ts, to_ts, before_ts))
+
+    def iter_through(self, cur: sqlite3.Cursor, from_ts: float, to_ts: float, reverse: bool = False) -> Iterator[Row]:
+        """Archived part of [from_ts, to_ts]; only rows older than the live table so nothing is counted twice."""
+        cur.execute("SELECT ts FROM sensor_log ORDER BY ts LIMIT 1")
+        live_min = (cur.fetchone() or (None,))[0]
+        if live_min is not None and from_ts >= live_min:
+            return iter(())
+        return self.iter_range(from_ts, to_ts, live_min, reverse)
+
+    def read_through(self, cur: sqlite3.Cursor, from_ts: float, to_ts: float) -> List[Row]:
+        return list(self.iter_through(cur, from_ts, to_ts))
+
+
+def bucket_averages(rows: Sequence[Row], bucket_seconds: int) -> List[Row]:
+    """(bucket_start, avg(col)...) over archived rows, matching the SQL GROUP BY CAST(ts / n) output."""
+    buckets: "OrderedDict[int, List[List[float]]]" = OrderedDict()
+    for row in rows:
+        key = int(row[0] // bucket_seconds) * bucket_seconds
+        acc = buckets.get(key)
+        if acc is None:
+            acc = [[0.0, 0] for _ in row[1:]]
+            buckets[key] = acc
+        for idx, value in enumerate(row[1:]):
+            if value is not None:
+                acc[idx][0] += value
+                acc[idx][1] += 1
+    return [
+        (key, *((total / count) if count else None for total, count in acc))
+        for key, acc in buckets.items()
+    ]
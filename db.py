@@ -0,0 +1,404 @@
+"""Shared SQLite access for app.py and reporting.py (WAL, long-lived per-thread connections)."""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+DB_SYNCHRONOUS = (os.getenv("DB_SYNCHRONOUS") or "NORMAL").strip().upper()
+DB_BUSY_TIMEOUT_MS = _env_int("DB_BUSY_TIMEOUT_MS", 5000)
+DB_CACHED_STATEMENTS = _env_int("DB_CACHED_STATEMENTS", 256)
+DB_CACHE_SIZE_KIB = _env_int("DB_CACHE_SIZE_KIB", 4096)
+DB_MAX_IDLE_CONNECTIONS = _env_int("DB_MAX_IDLE_CONNECTIONS", 8)
+DB_WRITE_MODE = (os.getenv("DB_WRITE_MODE") or "batched").strip().lower()
+DB_WRITE_QUEUE_MAX = _env_int("DB_WRITE_QUEUE_MAX", 5000)
+DB_WRITE_BATCH_ROWS = _env_int("DB_WRITE_BATCH_ROWS", 200)
+DB_WRITE_FLUSH_MS = _env_int("DB_WRITE_FLUSH_MS", 500)
+
+_SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+PathLike = Union[str, Path]
+
+
+class _ThreadConnections:
+    """Connections owned by one thread; handed back to the pool when it exits."""
+
+    def __init__(self, manager: "ConnectionManager") -> None:
+        self.manager = manager
+        self.conns: Dict[str, sqlite3.Connection] = {}
+
+    def __del__(self) -> None:
+        try:
+            self.manager._release(self.conns)
+        except Exception:
+            pass
+
+
+class ConnectionManager:
+    """Per-thread, per-path SQLite connections with an idle pool.
+
+    A thread keeps its connection while it lives; when it exits the
+    connection is parked and reused by the next thread. The statement cache
+    keeps hot INSERT/SELECT statements prepared across calls.
+    """
+
+    def __init__(
+        self,
+        synchronous: str = "NORMAL",
+        busy_timeout_ms: int = 5000,
+        cached_statements: int = 256,
+        cache_size_kib: int = 4096,
+        max_idle: int = 8,
+    ) -> None:
+        if synchronous not in _SYNCHRONOUS_LEVELS:
+            synchronous = "NORMAL"
+        self.synchronous = synchronous
+        self.busy_timeout_ms = max(0, int(busy_timeout_ms))
+        self.cached_statements = max(0, int(cached_statements))
+        self.cache_size_kib = max(0, int(cache_size_kib))
+        self.max_idle = max(0, int(max_idle))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._idle: Dict[str, List[sqlite3.Connection]] = {}
+
+    def connection(self, path: PathLike) -> sqlite3.Connection:
+        owned: Optional[_ThreadConnections] = getattr(self._local, "owned", None)
+        if owned is None:
+            owned = _ThreadConnections(self)
+            self._local.owned = owned
+        key = str(path)
+        conn = owned.conns.get(key)
+        if conn is None:
+            conn = self._acquire(key)
+            owned.conns[key] = conn
+        return conn
+
+    def _acquire(self, path: str) -> sqlite3.Connection:
+        with self._lock:
+            idle = self._idle.get(path)
+            if idle:
+                return idle.pop()
+        return self._connect(path)
+
+    def _release(self, conns: Dict[str, sqlite3.Connection]) -> None:
+        for path, conn in list(conns.items()):
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except Exception:
+                continue
+            with self._lock:
+                idle = self._idle.setdefault(path, [])
+                if len(idle) < self.max_idle:
+                    idle.append(conn)
+                    continue
+            try:
+                conn.close()
+            except Exception:
+                pass
+        conns.clear()
+
+    def _connect(self, path: str) -> sqlite3.Connection:
+        # check_same_thread is off only so idle connections can move to the
+        # next thread; a connection is never shared by two live threads.
+        conn = sqlite3.connect(
+            path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+        )
+        # only takes effect on a brand-new file; lets retention hand freed pages back to the filesystem
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        if self.cache_size_kib:
+            conn.execute(f"PRAGMA cache_size=-{self.cache_size_kib}")
+        return conn
+
+    @contextmanager
+    def transaction(self, path: PathLike) -> Iterator[sqlite3.Connection]:
+        conn = self.connection(path)
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def execute(self, path: PathLike, sql: str, params: Any = ()) -> sqlite3.Cursor:
+        return self.connection(path).execute(sql, params)
+
+    def close_thread(self) -> None:
+        owned: Optional[_ThreadConnections] = getattr(self._local, "owned", None)
+        if owned is None:
+            return
+        for conn in owned.conns.values():
+            try:
+                conn.close()
+            except Exception:
+                pass
+        owned.conns.clear()
+
+    def close_idle(self) -> None:
+        with self._lock:
+            idle = self._idle
+            self._idle = {}
+        for conns in idle.values():
+            for conn in conns:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+
+class WriteBehindQueue:
+    """Bounded background writer that group-commits queued INSERTs.
+
+    `submit` only appends to an in-memory queue; a single writer thread
+    commits everything queued every `flush_ms` milliseconds (or as soon as
+    `batch_rows` rows are waiting) in one transaction. In "sync" mode rows are
+    committed on the caller's thread instead, like a plain INSERT.
+
+    `hold()` pauses the writer thread; the holder commits the queued rows
+    itself between steps with `commit_held`, so `flush()` and the queue bound
+    keep working during a long hold.
+    """
+
+    MODES = ("batched", "sync")
+
+    def __init__(
+        self,
+        manager: ConnectionManager,
+        mode: str = "batched",
+        max_queue: int = 5000,
+        batch_rows: int = 200,
+        flush_ms: int = 500,
+    ) -> None:
+        self.manager = manager
+        self.mode = mode if mode in self.MODES else "batched"
+        self.max_queue = max(1, int(max_queue))
+        self.batch_rows = max(1, int(batch_rows))
+        self.flush_s = max(1, int(flush_ms)) / 1000.0
+        self._queue: Deque[Tuple[str, str, Sequence[Any]]] = deque()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._flush_requested = False
+        self._held = 0
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.max_depth = 0
+        self.last_commit_ts: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def submit(self, path: PathLike, sql: str, params: Sequence[Any]) -> bool:
+        if self.mode == "sync":
+            return self._write_now(str(path), sql, params)
+        with self._cond:
+            if self._stopping or len(self._queue) >= self.max_queue:
+                self.dropped += 1
+                self.last_error = "write queue full; row dropped"
+                return False
+            self._queue.append((str(path), sql, params))
+            self.enqueued += 1
+            depth = len(self._queue)
+            if depth > self.max_depth:
+                self.max_depth = depth
+            if depth == 1 or depth >= self.batch_rows:
+                self._cond.notify_all()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+        return True
+
+    def _write_now(self, path: str, sql: str, params: Sequence[Any]) -> bool:
+        return self._write_row(self.manager.connection(path), sql, params)
+
+    def _write_row(self, conn: sqlite3.Connection, sql: str, params: Sequence[Any]) -> bool:
+        try:
+            with conn:
+                conn.execute(sql, params)
+        except Exception as exc:
+            with self._cond:
+                self.failed += 1
+                self.last_error = str(exc)
+            return False
+        with self._cond:
+            self.written += 1
+            self.last_commit_ts = time.time()
+        return True
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                deadline: Optional[float] = None
+                while not self._stopping:
+                    if self._held:
+                        self._cond.wait()
+                        continue
+                    if self._flush_requested:
+                        break
+                    depth = len(self._queue)
+                    if depth >= self.batch_rows:
+                        break
+                    if depth and deadline is None:
+                        deadline = time.monotonic() + self.flush_s
+                    if deadline is None:
+                        self._cond.wait()
+                        continue
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                self._flush_requested = False
+                if not self._queue and self._stopping:
+                    self._cond.notify_all()
+                    return
+                batch = list(self._queue)
+                self._queue.clear()
+                self._in_flight = len(batch)
+            if batch:
+                self._commit(batch)
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    def _commit(self, batch: List[Tuple[str, str, Sequence[Any]]]) -> None:
+        by_path: Dict[str, List[Tuple[str, Sequence[Any]]]] = {}
+        for path, sql, params in batch:
+            by_path.setdefault(path, []).append((sql, params))
+        for path, items in by_path.items():
+            self._commit_items(self.manager.connection(path), items)
+
+    def _commit_items(self, conn: sqlite3.Connection, items: List[Tuple[str, Sequence[Any]]]) -> None:
+        try:
+            with conn:
+                for sql, params in items:
+                    conn.execute(sql, params)
+        except Exception:
+            # the group rolled back: retry row by row so only the bad rows are lost
+            for sql, params in items:
+                self._write_row(conn, sql, params)
+            return
+        with self._cond:
+            self.written += len(items)
+            self.batches += 1
+            self.last_commit_ts = time.time()
+
+    def commit_held(self, path: PathLike, conn: sqlite3.Connection) -> int:
+        """While held: commit the rows queued for `path` on the holder's `conn`; returns how many.
+
+        An online backup passes its source connection, which updates the copy
+        in place instead of restarting it.
+        """
+        key = str(path)
+        with self._cond:
+            if not self._held:
+                return 0
+            items = [(sql, params) for item_path, sql, params in self._queue if item_path == key]
+            if not items:
+                return 0
+            self._queue = deque(item for item in self._queue if item[0] != key)
+            self._in_flight += len(items)
+        try:
+            self._commit_items(conn, items)
+        finally:
+            with self._cond:
+                self._in_flight -= len(items)
+                self._cond.notify_all()
+        return len(items)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything queued so far is committed (read-your-writes).
+
+        During a hold this waits for the holder's next `commit_held`.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._in_flight:
+                if self._thread is None or not self._thread.is_alive():
+                    return False
+                self._flush_requested = True
+                self._cond.notify_all()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    @contextmanager
+    def hold(self) -> Iterator[None]:
+        """Keep queued rows uncommitted meanwhile (e.g. so an online backup is not restarted)."""
+        with self._cond:
+            while self._in_flight:
+                self._cond.wait()
+            self._held += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._held -= 1
+                self._cond.notify_all()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            self._stopping = True
+            thread = self._thread
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "mode": self.mode,
+                "queue_depth": len(self._queue) + self._in_flight,
+                "held": bool(self._held),
+                "max_depth": self.max_depth,
+                "queue_limit": self.max_queue,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "batches": self.batches,
+                "last_commit_ts": self.last_commit_ts,
+                "last_error": self.last_error,
+            }
+
+
+connections = ConnectionManager(
+    synchronous=DB_SYNCHRONOUS,
+    busy_timeout_ms=DB_BUSY_TIMEOUT_MS,
+    cached_statements=DB_CACHED_STATEMENTS,
+    cache_size_kib=DB_CACHE_SIZE_KIB,
+    max_idle=DB_MAX_IDLE_CONNECTIONS,
+)
+
+writer = WriteBehindQueue(
+    connections,
+    mode=DB_WRITE_MODE,
+    max_queue=DB_WRITE_QUEUE_MAX,
+    batch_rows=DB_WRITE_BATCH_ROWS,
+    flush_ms=DB_WRITE_FLUSH_MS,
+)
@@ -0,0 +1,129 @@
+"""DS18B20 (1-Wire) probes via the kernel w1 sysfs interface.
+
+Probe discovery is cached and refreshed every `rescan_seconds`. A read
+starts one conversion on every bus master that has `therm_bulk_read`, so
+all probes convert together. It then reads each probe's `temperature` file
+in parallel. Masters without bulk support fall back to `w1_slave`, which
+converts per probe, but the probes are still read in parallel.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+W1_DEVICES = Path("/sys/bus/w1/devices")
+# DS18S20, DS1822, DS18B20, DS1825, DS28EA00
+FAMILIES = ("10-", "22-", "28-", "3b-", "42-")
+CONVERSION_TIMEOUT = 1.5
+# a probe that vanished triggers an early rescan, but not more often than this
+MIN_RESCAN_SECONDS = 30.0
+# the scratchpad value after power-on, before any conversion finished
+POWER_ON_MILLI_C = 85000
+
+Reading = Tuple[Optional[float], str]
+
+
+def parse_w1_slave(text: str) -> Reading:
+    lines = text.strip().splitlines()
+    if len(lines) < 2 or "YES" not in lines[0]:
+        return None, "crc_error"
+    return _milli(lines[1].split("t=")[-1])
+
+
+def _milli(text: str) -> Reading:
+    try:
+        milli = int(text.strip())
+    except ValueError:
+        return None, "error"
+    if milli == POWER_ON_MILLI_C:
+        return None, "error"
+    return milli / 1000.0, "ok"
+
+
+class ProbeSet:
+    def __init__(
+        self,
+        base: Path = W1_DEVICES,
+        rescan_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.base = base
+        self.rescan_seconds = rescan_seconds
+        self.clock = clock
+        self.sleep = sleep
+        self._probes: List[str] = []
+        self._masters: List[Path] = []
+        self._scanned_at: Optional[float] = None
+        self._lost_probe = False
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def close(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def rescan(self) -> List[str]:
+        probes = sorted(
+            path.name for path in self.base.glob("*-*") if path.name.lower().startswith(FAMILIES) and path.is_dir()
+        )
+        masters = {(self.base / probe).resolve().parent for probe in probes}
+        self._masters = sorted(master for master in masters if (master / "therm_bulk_read").exists())
+        self._probes = probes
+        self._scanned_at = self.clock()
+        # nothing found yet (module not loaded, probe unplugged): look again soon
+        self._lost_probe = not probes
+        return probes
+
+    def probes(self) -> List[str]:
+        age = None if self._scanned_at is None else self.clock() - self._scanned_at
+        if age is None or age >= self.rescan_seconds or (self._lost_probe and age >= MIN_RESCAN_SECONDS):
+            self.rescan()
+        return self._probes
+
+    def _bulk_convert(self) -> bool:
+        """Trigger one conversion on every bulk-capable master and wait for all; False if none could."""
+        triggered = []
+        for master in self._masters:
+            try:
+                (master / "therm_bulk_read").write_text("trigger\n")
+                triggered.append(master)
+            except OSError:
+                continue
+        if not triggered:
+            return False
+        deadline = self.clock() + CONVERSION_TIMEOUT
+        pending = list(triggered)
+        while pending and self.clock() < deadline:
+            self.sleep(0.05)
+            # -1 while a conversion is running, 1 when done, 0 when nothing was pending
+            pending = [master for master in pending if (master / "therm_bulk_read").read_text().strip() == "-1"]
+        return not pending
+
+    def _read_probe(self, probe: str, bulk: bool) -> Reading:
+        path = self.base / probe
+        try:
+            if bulk and (path / "temperature").exists():
+                return _milli((path / "temperature").read_text())
+            return parse_w1_slave((path / "w1_slave").read_text())
+        except OSError:
+            if not path.exists():
+                self._lost_probe = True
+            return None, "error"
+
+    def read(self) -> Dict[str, Reading]:
+        """{probe id: (temperature_c, status)} for every discovered probe."""
+        probes = self.probes()
+        if not probes:
+            return {}
+        try:
+            bulk = self._bulk_convert()
+        except OSError:
+            bulk = False
+        if len(probes) == 1:
+            return {probes[0]: self._read_probe(probes[0], bulk)}
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ds18b20")
+        results = self._pool.map(lambda probe: self._read_probe(probe, bulk), probes)
+        return dict(zip(probes, results))
@@ -0,0 +1,43 @@
+"""An smbus-style bus shared by several driver threads.
+
+smbus2 selects the slave address with an ioctl on the file descriptor and
+then transfers, so two threads on one `SMBus` can send a transfer to the
+other device's address. `SharedBus` holds a lock around every call; each
+call is one complete transaction, and drivers may also hold `lock` around
+a longer sequence.
+"""
+
+import threading
+from typing import Any, List, Optional
+
+
+class SharedBus:
+    def __init__(self, bus: Any, lock: Optional[threading.RLock] = None) -> None:
+        self.bus = bus
+        self.lock = lock or threading.RLock()
+
+    def write_byte(self, addr: int, value: int) -> None:
+        with self.lock:
+            self.bus.write_byte(addr, value)
+
+    def read_i2c_block_data(self, addr: int, register: int, length: int) -> List[int]:
+        with self.lock:
+            return self.bus.read_i2c_block_data(addr, register, length)
+
+    def write_i2c_block_data(self, addr: int, register: int, data: List[int]) -> None:
+        with self.lock:
+            self.bus.write_i2c_block_data(addr, register, data)
+
+    def __getattr__(self, name: str) -> Any:
+        # i2c_rdwr only when the wrapped bus has it (BH1750 checks with hasattr)
+        if name == "i2c_rdwr" and hasattr(self.bus, "i2c_rdwr"):
+            def i2c_rdwr(*msgs: Any) -> None:
+                with self.lock:
+                    self.bus.i2c_rdwr(*msgs)
+
+            return i2c_rdwr
+        raise AttributeError(name)
+
+    def close(self) -> None:
+        with self.lock:
+            self.bus.close()
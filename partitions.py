@@ -0,0 +1,220 @@
+"""Monthly (UTC) partitions behind a UNION ALL view.
+
+`<name>` becomes a view over `<name>_default` plus one `<name>_pYYYYMM` table
+per month. An INSTEAD OF INSERT trigger routes rows by ts, so existing
+INSERT/SELECT statements keep working; SQLite pushes `ts` ranges down into
+every arm and merges the per-partition index scans for ORDER BY ts. Rows
+outside any partition land in `<name>_default` and are moved into a new
+partition by the next `ensure` call. Row ids are unique per partition only.
+"""
+
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    name: str
+    # (column, type) after the implicit `id INTEGER PRIMARY KEY`; must include `ts`
+    column_defs: Tuple[Tuple[str, str], ...]
+    indexes: Tuple[str, ...] = ("ts",)
+    # table name -> CREATE TRIGGER IF NOT EXISTS statement added to every partition (e.g. rollups)
+    triggers: Tuple[Callable[[str], str], ...] = ()
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return tuple(col for col, _ in self.column_defs)
+
+    @property
+    def default_table(self) -> str:
+        return f"{self.name}_default"
+
+    def month_table(self, year: int, month: int) -> str:
+        return f"{self.name}_p{year:04d}{month:02d}"
+
+
+Partition = Tuple[str, int, int]  # (table, start_ts, end_ts)
+
+
+def _month_of(ts: float) -> Tuple[int, int]:
+    dt = datetime.fromtimestamp(ts, timezone.utc)
+    return dt.year, dt.month
+
+
+def _next_month(year: int, month: int) -> Tuple[int, int]:
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _month_bounds(year: int, month: int) -> Tuple[int, int]:
+    ny, nm = _next_month(year, month)
+    start = datetime(year, month, 1, tzinfo=timezone.utc)
+    end = datetime(ny, nm, 1, tzinfo=timezone.utc)
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def partitions(cur: sqlite3.Cursor, spec: PartitionedTable) -> List[Partition]:
+    """Monthly partitions, oldest first (the default table is not included)."""
+    pattern = re.compile(rf"^{re.escape(spec.name)}_p(\d{{4}})(\d{{2}})$")
+    cur.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ?", (f"{spec.name}_p%",))
+    found: List[Partition] = []
+    for (table,) in cur.fetchall():
+        m = pattern.match(table)
+        if m:
+            found.append((table, *_month_bounds(int(m.group(1)), int(m.group(2)))))
+    return sorted(found, key=lambda part: part[1])
+
+
+def _create_table(cur: sqlite3.Cursor, spec: PartitionedTable, table: str) -> None:
+    defs = ", ".join(f"{col} {col_type}" for col, col_type in spec.column_defs)
+    cur.execute(f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, {defs})")
+    for cols in spec.indexes:
+        suffix = re.sub(r"\W+", "_", cols)
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{suffix} ON {table} ({cols})")
+
+
+def _create_triggers(cur: sqlite3.Cursor, spec: PartitionedTable, table: str) -> None:
+    for trigger_sql in spec.triggers:
+        cur.execute(trigger_sql(table))
+
+
+def _in_range(ref: str, start: int, end: int) -> str:
+    return f"COALESCE({ref}.ts >= {start} AND {ref}.ts < {end}, 0)"
+
+
+def rebuild_view(cur: sqlite3.Cursor, spec: PartitionedTable) -> None:
+    parts = partitions(cur, spec)
+    cols = ", ".join(spec.columns)
+    new_cols = ", ".join(f"NEW.{col}" for col in spec.columns)
+    arms = " UNION ALL ".join(
+        f"SELECT id, {cols} FROM {table}" for table in [spec.default_table] + [part[0] for part in parts]
+    )
+    routes = [
+        f"INSERT INTO {table} ({cols}) SELECT {new_cols} WHERE {_in_range('NEW', start, end)};"
+        for table, start, end in parts
+    ]
+    if parts:
+        outside = " OR ".join(_in_range("NEW", start, end) for _, start, end in parts)
+        routes.append(f"INSERT INTO {spec.default_table} ({cols}) SELECT {new_cols} WHERE NOT ({outside});")
+    else:
+        routes.append(f"INSERT INTO {spec.default_table} ({cols}) VALUES ({new_cols});")
+    # dropping the view also drops its INSTEAD OF trigger
+    cur.execute(f"DROP VIEW IF EXISTS {spec.name}")
+    cur.execute(f"CREATE VIEW {spec.name} AS {arms}")
+    body = "\n".join(routes)
+    cur.execute(f"CREATE TRIGGER {spec.name}_route INSTEAD OF INSERT ON {spec.name} BEGIN\n{body}\nEND")
+
+
+def _adopt_legacy(cur: sqlite3.Cursor, spec: PartitionedTable) -> None:
+    """Turn the old single table into the default partition; `ensure` then spreads it over months."""
+    default = spec.default_table
+    # keep other views/triggers pointing at `name` (the view that replaces it)
+    cur.execute("PRAGMA legacy_alter_table=ON")
+    try:
+        cur.execute(f"ALTER TABLE {spec.name} RENAME TO {default}")
+    finally:
+        cur.execute("PRAGMA legacy_alter_table=OFF")
+    cur.execute(
+        "SELECT type, name FROM sqlite_master WHERE tbl_name = ? AND type IN ('trigger', 'index') AND sql IS NOT NULL",
+        (default,),
+    )
+    for obj_type, obj_name in cur.fetchall():
+        cur.execute(f"DROP {obj_type.upper()} {obj_name}")
+
+
+def _months_in(cur: sqlite3.Cursor, table: str) -> List[Tuple[int, int]]:
+    months: List[Tuple[int, int]] = []
+    cur.execute(f"SELECT ts FROM {table} ORDER BY ts LIMIT 1")
+    row = cur.fetchone()
+    while row is not None:
+        year, month = _month_of(float(row[0]))
+        months.append((year, month))
+        _, end = _month_bounds(year, month)
+        cur.execute(f"SELECT ts FROM {table} WHERE ts >= ? ORDER BY ts LIMIT 1", (end,))
+        row = cur.fetchone()
+    return months
+
+
+def ensure(
+    cur: sqlite3.Cursor,
+    spec: PartitionedTable,
+    now: Optional[float] = None,
+    months_ahead: int = 1,
+) -> List[str]:
+    """Create partitions for this month, the next `months_ahead` months and any month parked in the default table."""
+    cur.execute("SELECT type FROM sqlite_master WHERE name = ?", (spec.name,))
+    row = cur.fetchone()
+    rebuild = row is None or row[0] != "view"
+    if row and row[0] == "table":
+        _adopt_legacy(cur, spec)
+    default = spec.default_table
+    _create_table(cur, spec, default)
+    _create_triggers(cur, spec, default)
+
+    year, month = _month_of(time.time() if now is None else now)
+    wanted = [(year, month)]
+    for _ in range(max(0, months_ahead)):
+        year, month = _next_month(year, month)
+        wanted.append((year, month))
+    wanted.extend(_months_in(cur, default))
+
+    existing = {part[0] for part in partitions(cur, spec)}
+    cols = ", ".join(spec.columns)
+    created: List[str] = []
+    for year, month in sorted(set(wanted)):
+        table = spec.month_table(year, month)
+        if table in existing:
+            continue
+        start, end = _month_bounds(year, month)
+        _create_table(cur, spec, table)
+        # moved rows were already counted by the default table's triggers
+        cur.execute(
+            f"INSERT INTO {table} (id, {cols}) SELECT id, {cols} FROM {default} WHERE ts >= ? AND ts < ?",
+            (start, end),
+        )
+        cur.execute(f"DELETE FROM {default} WHERE ts >= ? AND ts < ?", (start, end))
+        _create_triggers(cur, spec, table)
+        created.append(table)
+    if created or rebuild:
+        rebuild_view(cur, spec)
+    return created
+
+
+def split_expired(cur: sqlite3.Cursor, spec: PartitionedTable, cutoff: float) -> Tuple[List[str], List[str]]:
+    """(partitions entirely before cutoff, tables that may hold some rows before it)."""
+    whole: List[str] = []
+    partial = [spec.default_table]
+    for table, start, end in partitions(cur, spec):
+        if end <= cutoff:
+            whole.append(table)
+        elif start < cutoff:
+            partial.append(table)
+    return whole, partial
+
+
+def drop(cur: sqlite3.Cursor, spec: PartitionedTable, tables: Sequence[str]) -> int:
+    """DROP whole partitions; returns the number of rows they held."""
+    rows = 0
+    for table in tables:
+        cur.execute(f"SELECT COUNT(*) FROM {table}")
+        rows += int(cur.fetchone()[0] or 0)
+        cur.execute(f"DROP TABLE {table}")
+    if tables:
+        rebuild_view(cur, spec)
+    return rows
+
+
+def delete_before(cur: sqlite3.Cursor, spec: PartitionedTable, before_ts: Optional[float]) -> int:
+    """Delete rows older than `before_ts` (None = all) while keeping the partition tables."""
+    deleted = 0
+    tables = [(spec.default_table, None, None)] + partitions(cur, spec)
+    for table, _start, end in tables:
+        if before_ts is None or (end is not None and end <= before_ts):
+            cur.execute(f"DELETE FROM {table}")
+        else:
+            cur.execute(f"DELETE FROM {table} WHERE ts < ?", (before_ts,))
+        deleted += int(cur.rowcount or 0)
+    return deleted
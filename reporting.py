@@ -1,6 +1,5 @@
 import json
 import math
-import sqlite3
 import urllib.parse
 import urllib.request
 from dataclasses import dataclass
@@ -10,12 +9,18 @@ from statistics import mean, median
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 from zoneinfo import ZoneInfo
 
+from db import connections as db_connections, writer as db_writer
+import day_archive
+import sensor_rollup
+
 BASE_DIR = Path(__file__).resolve().parent
 CONFIG_DIR = BASE_DIR / "config"
 DATA_DIR = BASE_DIR / "data"
 DB_PATH = DATA_DIR / "sera.db"
 WEATHER_CACHE_DIR = DATA_DIR / "cache" / "weather"
 ISTANBUL_TZ = ZoneInfo("Europe/Istanbul")
+# Daily metrics read 1-minute rollup averages instead of every raw sample (0 = raw rows).
+REPORT_SAMPLE_SECONDS = 60
 
 DEFAULT_LOCATION = {
     "SERA_LAT": 41.1877,
@@ -221,9 +226,35 @@ def _derive_dew_and_vpd(temp: Optional[float], hum: Optional[float]) -> Tuple[Op
     return _calc_dew_point(temp, hum), _calc_vpd(temp, hum)
 
 
-def load_sensor_samples(start_dt: datetime, end_dt: datetime, tz: ZoneInfo) -> List[SensorSample]:
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
+def load_sensor_samples(
+    start_dt: datetime,
+    end_dt: datetime,
+    tz: ZoneInfo,
+    bucket_seconds: Optional[int] = None,
+    archive: Optional[day_archive.DayArchive] = None,
+) -> List[SensorSample]:
+    db_writer.flush()
+    cur = db_connections.connection(DB_PATH).cursor()
+    # days already moved out by retention come from the day archives
+    archived = [
+        row[:5] for row in archive.read_through(cur, start_dt.timestamp(), end_dt.timestamp())
+        if row[0] < end_dt.timestamp()
+    ] if archive else []
+    rollup_res = sensor_rollup.pick_resolution(bucket_seconds) if bucket_seconds else None
+    if rollup_res:
+        if archived:
+            archived = day_archive.bucket_averages(archived, rollup_res)
+        rows = sensor_rollup.bucket_averages(
+            cur,
+            ("dht_temp", "dht_hum", "ds18_temp", "lux"),
+            start_dt.timestamp(),
+            end_dt.timestamp() - rollup_res,
+            rollup_res,
+        )
+        if archived:
+            live_buckets = {row[0] for row in rows}
+            rows = [row for row in archived if row[0] not in live_buckets] + list(rows)
+        return _samples_from_rows(rows, tz)
     cur.execute(
         """
         SELECT ts, dht_temp, dht_hum, ds18_temp, lux
@@ -233,8 +264,10 @@ def load_sensor_samples(start_dt: datetime, end_dt: datetime, tz: ZoneInfo) -> L
         """,
         (start_dt.timestamp(), end_dt.timestamp()),
     )
-    rows = cur.fetchall()
-    conn.close()
+    return _samples_from_rows(archived + cur.fetchall(), tz)
+
+
+def _samples_from_rows(rows: List[Tuple[Any, ...]], tz: ZoneInfo) -> List[SensorSample]:
     samples: List[SensorSample] = []
     for ts, dht_temp, dht_hum, ds_temp, lux in rows:
         temp_val = dht_temp
@@ -446,14 +479,19 @@ def _build_story(temp_ok_ratio: float, light_ratio: float, dew_risk_high_hours:
     return story
 
 
-def compute_day_metrics(target_date: date, config: Optional[Dict[str, Any]] = None, profile_name: Optional[str] = None) -> Dict[str, Any]:
+def compute_day_metrics(
+    target_date: date,
+    config: Optional[Dict[str, Any]] = None,
+    profile_name: Optional[str] = None,
+    archive: Optional[day_archive.DayArchive] = None,
+) -> Dict[str, Any]:
     cfg = config or load_reporting_config()
     tz = ZoneInfo(cfg.get("SERA_TZ") or DEFAULT_LOCATION["SERA_TZ"])
     thresholds = _profile_thresholds(cfg, profile_name)
     day_start = datetime.combine(target_date, datetime.min.time(), tz)
     day_end = day_start + timedelta(days=1)
 
-    samples = load_sensor_samples(day_start, day_end, tz)
+    samples = load_sensor_samples(day_start, day_end, tz, REPORT_SAMPLE_SECONDS, archive)
     weather_map, _ = load_cached_weather([target_date], cfg)
     weather = weather_map.get(target_date) or {}
     weather_hourly = _extract_weather_hourly(weather, tz)
@@ -685,11 +723,17 @@ def compute_day_metrics(target_date: date, config: Optional[Dict[str, Any]] = No
     return report
 
 
-def _range_metrics(start_date: date, end_date: date, cfg: Dict[str, Any], profile_name: Optional[str]) -> Dict[str, Any]:
+def _range_metrics(
+    start_date: date,
+    end_date: date,
+    cfg: Dict[str, Any],
+    profile_name: Optional[str],
+    archive: Optional[day_archive.DayArchive] = None,
+) -> Dict[str, Any]:
     current = start_date
     items: List[Dict[str, Any]] = []
     while current <= end_date:
-        items.append(compute_day_metrics(current, cfg, profile_name))
+        items.append(compute_day_metrics(current, cfg, profile_name, archive))
         current += timedelta(days=1)
     if not items:
         return {"light_dose": 0.0, "temp_min": None, "temp_max": None, "dew_risk_hours": 0.0, "stress_hours": 0.0, "gdd_total": 0.0}
@@ -709,14 +753,20 @@ def _range_metrics(start_date: date, end_date: date, cfg: Dict[str, Any], profil
     }
 
 
-def build_daily_report(target_date: date, profile_name: Optional[str] = None, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+def build_daily_report(
+    target_date: date,
+    profile_name: Optional[str] = None,
+    config: Optional[Dict[str, Any]] = None,
+    archive: Optional[day_archive.DayArchive] = None,
+) -> Dict[str, Any]:
+    """`archive`: day archives holding sensor_log days that retention already removed."""
     cfg = config or load_reporting_config()
-    today_report = compute_day_metrics(target_date, cfg, profile_name)
+    today_report = compute_day_metrics(target_date, cfg, profile_name, archive)
     yesterday = target_date - timedelta(days=1)
     prev_week_start = target_date - timedelta(days=7)
     prev_week_end = target_date - timedelta(days=1)
-    yesterday_metrics = _range_metrics(yesterday, yesterday, cfg, profile_name)
-    week_metrics = _range_metrics(prev_week_start, prev_week_end, cfg, profile_name)
+    yesterday_metrics = _range_metrics(yesterday, yesterday, cfg, profile_name, archive)
+    week_metrics = _range_metrics(prev_week_start, prev_week_end, cfg, profile_name, archive)
     comparisons = {
         "vs_yesterday": {
             "light_dose_delta": today_report["indoor"]["light"]["light_dose_lux_hours"] - yesterday_metrics.get("light_dose", 0.0),
@@ -757,13 +807,18 @@ def _delta(cur: Optional[float], prev: Optional[float]) -> Optional[float]:
     return round(cur - prev, 3)
 
 
-def build_weekly_report(end_date: date, profile_name: Optional[str] = None, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+def build_weekly_report(
+    end_date: date,
+    profile_name: Optional[str] = None,
+    config: Optional[Dict[str, Any]] = None,
+    archive: Optional[day_archive.DayArchive] = None,
+) -> Dict[str, Any]:
     cfg = config or load_reporting_config()
     start_date = end_date - timedelta(days=6)
     current = start_date
     days: List[Dict[str, Any]] = []
     while current <= end_date:
-        days.append(compute_day_metrics(current, cfg, profile_name))
+        days.append(compute_day_metrics(current, cfg, profile_name, archive))
         current += timedelta(days=1)
     if not days:
         return {"date": end_date.isoformat(), "days": [], "summary": {}}
@@ -0,0 +1,235 @@
+"""Rolling mean/min/max/slope per metric over several time windows.
+
+Each (metric, window) pair keeps its samples in a deque. It also keeps
+running sums for the mean and the least-squares slope, and monotonic deques
+for the minimum and maximum, so adding a sample costs amortised O(1).
+After every add, the metric's results are published as an immutable
+mapping. Readers (status, automation, LCD) look them up without taking
+the lock. Results are as of the metric's newest sample.
+"""
+
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass
+from types import MappingProxyType
+from typing import Any, Deque, Dict, Iterable, List, Mapping, Optional, Tuple
+
+DEFAULT_WINDOWS = (60, 300, 1800)
+# running sums are recomputed after this many adds (at least once per window's
+# worth of samples): bounds float drift and keeps slope times near zero
+REBASE_MIN_ADDS = 64
+
+
+def window_label(seconds: int) -> str:
+    if seconds % 3600 == 0:
+        return f"{seconds // 3600}h"
+    if seconds % 60 == 0:
+        return f"{seconds // 60}m"
+    return f"{seconds}s"
+
+
+def parse_windows(raw: Any) -> Tuple[int, ...]:
+    """Sorted unique window lengths in seconds; DEFAULT_WINDOWS when `raw` is not a usable list."""
+    if not isinstance(raw, (list, tuple)):
+        return DEFAULT_WINDOWS
+    windows = set()
+    for item in raw:
+        if isinstance(item, bool):
+            continue
+        try:
+            seconds = int(item)
+        except (TypeError, ValueError):
+            continue
+        if seconds > 0:
+            windows.add(seconds)
+    return tuple(sorted(windows)) or DEFAULT_WINDOWS
+
+
+@dataclass(frozen=True)
+class WindowStats:
+    count: int
+    mean: float
+    min: float
+    max: float
+    # least-squares slope in units per minute; None with fewer than two distinct timestamps
+    slope: Optional[float]
+    oldest_ts: float
+    newest_ts: float
+
+    def as_dict(self, digits: int = 2) -> Dict[str, Any]:
+        out = asdict(self)
+        for key in ("mean", "min", "max", "slope"):
+            if out[key] is not None:
+                out[key] = round(out[key], digits)
+        return out
+
+
+class _Window:
+    __slots__ = ("seconds", "samples", "mins", "maxs", "origin", "sum_v", "sum_t", "sum_tt", "sum_tv", "adds")
+
+    def __init__(self, seconds: int) -> None:
+        self.seconds = seconds
+        self.samples: Deque[Tuple[float, float]] = deque()
+        # (ts, value) with increasing values / decreasing values: the front is the window min / max
+        self.mins: Deque[Tuple[float, float]] = deque()
+        self.maxs: Deque[Tuple[float, float]] = deque()
+        self.origin = 0.0
+        self.sum_v = self.sum_t = self.sum_tt = self.sum_tv = 0.0
+        self.adds = 0
+
+    def add(self, ts: float, value: float) -> None:
+        if not self.samples:
+            self.origin = ts
+        self.samples.append((ts, value))
+        t = ts - self.origin
+        self.sum_v += value
+        self.sum_t += t
+        self.sum_tt += t * t
+        self.sum_tv += t * value
+        while self.mins and self.mins[-1][1] >= value:
+            self.mins.pop()
+        self.mins.append((ts, value))
+        while self.maxs and self.maxs[-1][1] <= value:
+            self.maxs.pop()
+        self.maxs.append((ts, value))
+        self._evict(ts - self.seconds)
+        self.adds += 1
+        if self.adds >= max(REBASE_MIN_ADDS, len(self.samples)):
+            self._rebase()
+
+    def _evict(self, cutoff: float) -> None:
+        while self.samples[0][0] < cutoff:
+            ts, value = self.samples.popleft()
+            t = ts - self.origin
+            self.sum_v -= value
+            self.sum_t -= t
+            self.sum_tt -= t * t
+            self.sum_tv -= t * value
+        while self.mins[0][0] < cutoff:
+            self.mins.popleft()
+        while self.maxs[0][0] < cutoff:
+            self.maxs.popleft()
+
+    def _rebase(self) -> None:
+        self.origin = self.samples[0][0]
+        self.sum_v = self.sum_t = self.sum_tt = self.sum_tv = 0.0
+        for ts, value in self.samples:
+            t = ts - self.origin
+            self.sum_v += value
+            self.sum_t += t
+            self.sum_tt += t * t
+            self.sum_tv += t * value
+        self.adds = 0
+
+    def stats(self) -> WindowStats:
+        n = len(self.samples)
+        denom = n * self.sum_tt - self.sum_t * self.sum_t
+        slope = None
+        # relative cutoff: identical timestamps leave only rounding noise in denom
+        if n > 1 and denom > 1e-9 * n * self.sum_tt:
+            slope = (n * self.sum_tv - self.sum_t * self.sum_v) / denom * 60
+        return WindowStats(
+            count=n,
+            mean=self.sum_v / n,
+            min=self.mins[0][1],
+            max=self.maxs[0][1],
+            slope=slope,
+            oldest_ts=self.samples[0][0],
+            newest_ts=self.samples[-1][0],
+        )
+
+
+class RollingStats:
+    def __init__(self, windows: Iterable[int] = DEFAULT_WINDOWS) -> None:
+        self._lock = threading.Lock()
+        self._windows = parse_windows(list(windows))
+        self._label_seconds = {window_label(seconds): seconds for seconds in self._windows}
+        self._series: Dict[str, List[_Window]] = {}
+        self._last_ts: Dict[str, float] = {}
+        # metric -> {window label: WindowStats}; new metrics replace the dict, updates replace one value
+        self._views: Dict[str, Mapping[str, WindowStats]] = {}
+
+    @property
+    def windows(self) -> Tuple[int, ...]:
+        return self._windows
+
+    @property
+    def labels(self) -> Tuple[str, ...]:
+        return tuple(window_label(seconds) for seconds in self._windows)
+
+    def add(self, metric: str, value: Any, ts: float) -> bool:
+        """Record one sample; False for non-numeric values and samples older than the metric's newest."""
+        if value is None or isinstance(value, bool):
+            return False
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return False
+        if value != value or value in (float("inf"), float("-inf")):
+            return False
+        with self._lock:
+            windows = self._series.get(metric)
+            if windows is None:
+                windows = self._series[metric] = [_Window(seconds) for seconds in self._windows]
+            elif ts < self._last_ts[metric]:
+                return False
+            self._last_ts[metric] = ts
+            for window in windows:
+                window.add(ts, value)
+            self._publish_locked(metric, windows)
+        return True
+
+    def _publish_locked(self, metric: str, windows: List[_Window]) -> None:
+        view = MappingProxyType({window_label(window.seconds): window.stats() for window in windows})
+        if metric in self._views:
+            # same size: safe for readers iterating the dict
+            self._views[metric] = view
+        else:
+            views = dict(self._views)
+            views[metric] = view
+            self._views = views
+
+    def configure(self, windows: Iterable[int]) -> None:
+        """Switch to new window lengths, replaying the samples still held by the longest old window."""
+        parsed = parse_windows(list(windows))
+        with self._lock:
+            if parsed == self._windows:
+                return
+            self._windows = parsed
+            self._label_seconds = {window_label(seconds): seconds for seconds in parsed}
+            views: Dict[str, Mapping[str, WindowStats]] = {}
+            for metric, old in list(self._series.items()):
+                samples = old[-1].samples
+                fresh = [_Window(seconds) for seconds in parsed]
+                for ts, value in samples:
+                    for window in fresh:
+                        window.add(ts, value)
+                self._series[metric] = fresh
+                views[metric] = MappingProxyType(
+                    {window_label(window.seconds): window.stats() for window in fresh}
+                )
+            self._views = views
+
+    def get(self, metric: str) -> Optional[Mapping[str, WindowStats]]:
+        return self._views.get(metric)
+
+    def window(self, metric: str, label: str, now: Optional[float] = None) -> Optional[WindowStats]:
+        """Stats for one window, or None when missing or (given `now`) older than the window."""
+        stats = (self._views.get(metric) or {}).get(label)
+        if stats is None or now is None:
+            return stats
+        seconds = self._label_seconds.get(label)
+        if seconds is not None and now - stats.newest_ts > seconds:
+            return None
+        return stats
+
+    def snapshot(self, now: Optional[float] = None, digits: int = 2) -> Dict[str, Dict[str, Optional[Dict[str, Any]]]]:
+        out: Dict[str, Dict[str, Optional[Dict[str, Any]]]] = {}
+        views = self._views
+        for metric in sorted(views):
+            entry: Dict[str, Optional[Dict[str, Any]]] = {}
+            for label in views[metric]:
+                stats = self.window(metric, label, now)
+                entry[label] = stats.as_dict(digits) if stats else None
+            out[metric] = entry
+        return out
@@ -148,6 +148,20 @@ def _validate_sensors(cfg: Any, issues: list[Issue]) -> None:
     if "dht22_gpio" in cfg and not isinstance(cfg.get("dht22_gpio"), int):
         issues.append(Issue("ERROR", "dht22_gpio int olmalı.", "sensors.dht22_gpio"))
 
+    polling = cfg.get("polling")
+    if isinstance(polling, dict):
+        for name, plan in polling.items():
+            if not isinstance(plan, dict):
+                continue
+            low, mid, high = plan.get("min_interval"), plan.get("interval"), plan.get("max_interval")
+            values = [v for v in (low, mid, high) if isinstance(v, (int, float))]
+            if values != sorted(values):
+                issues.append(
+                    Issue("WARN", "min_interval <= interval <= max_interval olmalı.", f"sensors.polling.{name}")
+                )
+            if name == "dht22" and isinstance(low, (int, float)) and low < 2:
+                issues.append(Issue("WARN", "DHT22 2 sn'den sık okunamaz; 2 sn kullanılır.", "sensors.polling.dht22"))
+
     lcd_enabled = cfg.get("lcd_enabled")
     lcd_rows = cfg.get("lcd_rows")
     lcd_lines = cfg.get("lcd_lines")
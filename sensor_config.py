@@ -0,0 +1,128 @@
+"""Typed, immutable view of config/sensors.json for the sensor read paths.
+
+`compile_config` parses addresses, pins and modes once per (re)load. A
+value it cannot use falls back to its default and is listed in `problems`
+(app.py reports them as an alert and in status `sensor_config`).
+SensorManager swaps the whole object in one assignment, so a read started
+before a reload finishes with the old settings.
+"""
+
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import ads1115
+import bh1750
+import rolling_stats
+import sensor_schedule
+
+
+@dataclass(frozen=True)
+class SensorConfig:
+    dht22_gpio: int = 17
+    ds18b20_enabled: bool = True
+    ds18b20_primary: Optional[str] = None
+    bh1750_addr: int = 0x23
+    bh1750_mtreg: int = bh1750.MTREG_DEFAULT
+    bh1750_mode: str = "high"
+    ads1115_addr: int = 0x48
+    ads1115_mode: str = "single"
+    ads1115_data_rate: int = 860
+    ads1115_samples: int = 8
+    ads1115_reducer: str = "median"
+    ads1115_trim: float = 0.2
+    ads1115_rdy_gpio: Optional[int] = None
+    stats_windows: Tuple[int, ...] = rolling_stats.DEFAULT_WINDOWS
+    plans: Mapping[str, sensor_schedule.PollPlan] = field(
+        default_factory=lambda: MappingProxyType(sensor_schedule.compile_plans({}))
+    )
+    problems: Tuple[str, ...] = ()
+
+
+# the fields each I2C sensor object is built from; a reload rebuilds it only when one changes
+BH1750_FIELDS = ("bh1750_addr", "bh1750_mtreg", "bh1750_mode")
+ADS1115_FIELDS = (
+    "ads1115_addr", "ads1115_mode", "ads1115_data_rate", "ads1115_samples",
+    "ads1115_reducer", "ads1115_trim", "ads1115_rdy_gpio",
+)
+
+
+def _addr(value: Any) -> int:
+    return int(str(value), 0)
+
+
+def _int(value: Any) -> int:
+    if isinstance(value, bool):
+        raise ValueError("bool is not an int")
+    return int(value)
+
+
+def _bool(value: Any) -> bool:
+    if not isinstance(value, bool):
+        raise ValueError("not a bool")
+    return value
+
+
+def _choice(options: Any) -> Callable[[Any], Any]:
+    def parse(value: Any) -> Any:
+        if value not in options:
+            raise ValueError(f"not one of {tuple(options)}")
+        return value
+
+    return parse
+
+
+def _bounded(parse: Callable[[Any], Any], low: float, high: float) -> Callable[[Any], Any]:
+    def check(value: Any) -> Any:
+        parsed = parse(value)
+        if not low <= parsed <= high:
+            raise ValueError(f"outside {low}-{high}")
+        return parsed
+
+    return check
+
+
+def _windows(value: Any) -> Tuple[int, ...]:
+    if not isinstance(value, list) or not value or any(isinstance(item, bool) or not isinstance(item, int) or item <= 0 for item in value):
+        raise ValueError("not a list of positive seconds")
+    return rolling_stats.parse_windows(value)
+
+
+def _optional(parse: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    return lambda value: None if value in (None, "") else parse(value)
+
+
+PARSERS: Dict[str, Callable[[Any], Any]] = {
+    "dht22_gpio": _int,
+    "ds18b20_enabled": _bool,
+    "ds18b20_primary": _optional(str),
+    "bh1750_addr": _addr,
+    "bh1750_mtreg": _bounded(_int, bh1750.MTREG_MIN, bh1750.MTREG_MAX),
+    "bh1750_mode": _choice(bh1750.MODES),
+    "ads1115_addr": _addr,
+    "ads1115_mode": _choice(ads1115.MODES),
+    "ads1115_data_rate": _choice(ads1115.DATA_RATES),
+    "ads1115_samples": _bounded(_int, 1, 64),
+    "ads1115_reducer": _choice(ads1115.REDUCERS),
+    "ads1115_trim": _bounded(float, 0, ads1115.TRIM_MAX),
+    "ads1115_rdy_gpio": _optional(_int),
+    "stats_windows": _windows,
+}
+
+
+def compile_config(raw: Optional[Dict[str, Any]]) -> SensorConfig:
+    raw = raw if isinstance(raw, dict) else {}
+    values: Dict[str, Any] = {}
+    problems: List[str] = []
+    for key, parse in PARSERS.items():
+        if key not in raw:
+            continue
+        try:
+            values[key] = parse(raw[key])
+        except (TypeError, ValueError) as exc:
+            problems.append(f"{key}: {exc}")
+    return SensorConfig(
+        **values,
+        plans=MappingProxyType(sensor_schedule.compile_plans(raw)),
+        problems=tuple(problems),
+    )
@@ -0,0 +1,212 @@
+"""sensor_log rollups (1m/5m/1h/1d buckets with min/max/sum/count per column).
+
+A trigger on sensor_log (on each partition table once sensor_log is
+partitioned) keeps the buckets current for every insert path, so chart and
+report queries can read a few hundred bucket rows instead of scanning raw
+samples.
+"""
+
+import math
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+ROLLUP_COLUMNS = ("dht_temp", "dht_hum", "ds18_temp", "lux", "soil_ch0", "soil_ch1", "soil_ch2", "soil_ch3")
+ROLLUP_RESOLUTIONS = (60, 300, 3600, 86400)
+# 1m/5m buckets follow sensor_log retention; hourly/daily buckets are small enough to keep.
+ROLLUP_SHORT_RESOLUTIONS = (60, 300)
+
+def _column_defs() -> str:
+    return ", ".join(
+        f"{col}_n INTEGER NOT NULL DEFAULT 0, {col}_sum REAL NOT NULL DEFAULT 0, {col}_min REAL, {col}_max REAL"
+        for col in ROLLUP_COLUMNS
+    )
+
+
+def _column_names() -> str:
+    return ", ".join(f"{col}_n, {col}_sum, {col}_min, {col}_max" for col in ROLLUP_COLUMNS)
+
+
+def _upsert_sql(res: int) -> str:
+    values = ", ".join(
+        f"NEW.{col} IS NOT NULL, COALESCE(NEW.{col}, 0), NEW.{col}, NEW.{col}" for col in ROLLUP_COLUMNS
+    )
+    # scalar MIN/MAX return NULL if any argument is NULL, hence the paired COALESCE
+    updates = ", ".join(
+        f"{col}_n = {col}_n + excluded.{col}_n, "
+        f"{col}_sum = {col}_sum + excluded.{col}_sum, "
+        f"{col}_min = MIN(COALESCE({col}_min, excluded.{col}_min), COALESCE(excluded.{col}_min, {col}_min)), "
+        f"{col}_max = MAX(COALESCE({col}_max, excluded.{col}_max), COALESCE(excluded.{col}_max, {col}_max))"
+        for col in ROLLUP_COLUMNS
+    )
+    return (
+        f"INSERT INTO sensor_rollup (res, bucket, n, {_column_names()}) "
+        f"VALUES ({res}, CAST(NEW.ts / {res} AS INTEGER) * {res}, 1, {values}) "
+        f"ON CONFLICT(res, bucket) DO UPDATE SET n = n + 1, {updates};"
+    )
+
+
+def _aggregate_into(cur: sqlite3.Cursor, res: int, start: Optional[float] = None, end: Optional[float] = None) -> None:
+    aggregates = ", ".join(
+        f"COUNT({col}), TOTAL({col}), MIN({col}), MAX({col})" for col in ROLLUP_COLUMNS
+    )
+    where = ""
+    params: List[Any] = [res, res, res]
+    if start is not None and end is not None:
+        where = "WHERE ts >= ? AND ts < ?"
+        params.extend([start, end])
+    cur.execute(
+        f"""
+        INSERT OR REPLACE INTO sensor_rollup (res, bucket, n, {_column_names()})
+        SELECT ?, CAST(ts / ? AS INTEGER) * ? AS b, COUNT(*), {aggregates}
+        FROM sensor_log
+        {where}
+        GROUP BY b
+        """,
+        params,
+    )
+
+
+def trigger_sql(table: str) -> str:
+    """AFTER INSERT trigger feeding the rollups from `table` (sensor_log or one of its partitions)."""
+    body = "\n".join(_upsert_sql(res) for res in ROLLUP_RESOLUTIONS)
+    return f"CREATE TRIGGER IF NOT EXISTS {table}_rollup_ai AFTER INSERT ON {table} BEGIN\n{body}\nEND"
+
+
+def ensure_schema(cur: sqlite3.Cursor) -> None:
+    """Create the rollup table and trigger; backfill from sensor_log on first run."""
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sensor_rollup'")
+    exists = cur.fetchone() is not None
+    cur.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS sensor_rollup (
+            res INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            n INTEGER NOT NULL DEFAULT 0,
+            {_column_defs()},
+            PRIMARY KEY (res, bucket)
+        ) WITHOUT ROWID
+        """
+    )
+    cur.execute("SELECT type FROM sqlite_master WHERE name = 'sensor_log'")
+    row = cur.fetchone()
+    if row and row[0] == "table":
+        cur.execute(trigger_sql("sensor_log"))
+    if not exists:
+        for res in ROLLUP_RESOLUTIONS:
+            _aggregate_into(cur, res)
+
+
+def forget_before(cur: sqlite3.Cursor, before_ts: Optional[float]) -> None:
+    """Drop buckets after sensor_log rows before `before_ts` were deleted (None = all)."""
+    if before_ts is None:
+        cur.execute("DELETE FROM sensor_rollup")
+        return
+    for res in ROLLUP_RESOLUTIONS:
+        edge = int(before_ts // res) * res
+        cur.execute("DELETE FROM sensor_rollup WHERE res = ? AND bucket <= ?", (res, edge))
+        _aggregate_into(cur, res, edge, edge + res)
+
+
+def trim(cur: sqlite3.Cursor, before_ts: float, resolutions: Sequence[int] = ROLLUP_SHORT_RESOLUTIONS) -> int:
+    deleted = 0
+    for res in resolutions:
+        cur.execute("DELETE FROM sensor_rollup WHERE res = ? AND bucket < ?", (res, int(before_ts // res) * res))
+        deleted += int(cur.rowcount or 0)
+    return deleted
+
+
+def pick_resolution(bucket_seconds: float) -> Optional[int]:
+    """Coarsest rollup no wider than `bucket_seconds`; None means read raw rows."""
+    best = None
+    for res in ROLLUP_RESOLUTIONS:
+        if res <= bucket_seconds:
+            best = res
+    return best
+
+
+def pick_divisor(interval_seconds: int) -> Optional[int]:
+    """Coarsest rollup whose buckets tile `interval_seconds` exactly."""
+    best = None
+    for res in ROLLUP_RESOLUTIONS:
+        if res <= interval_seconds and interval_seconds % res == 0:
+            best = res
+    return best
+
+
+def bucket_averages(
+    cur: sqlite3.Cursor,
+    columns: Sequence[str],
+    from_ts: float,
+    to_ts: float,
+    res: int,
+    group_seconds: Optional[int] = None,
+    order: str = "ASC",
+    limit: Optional[int] = None,
+) -> List[Tuple[Any, ...]]:
+    """Rows of (bucket_start, avg(col)...) for buckets overlapping [from_ts, to_ts]."""
+    group = group_seconds or res
+    averages = ", ".join(
+        f"CASE WHEN SUM({col}_n) > 0 THEN SUM({col}_sum) / SUM({col}_n) END" for col in columns
+    )
+    sql = f"""
+        SELECT CAST(bucket / ? AS INTEGER) * ? AS b, {averages}
+        FROM sensor_rollup
+        WHERE res = ? AND bucket > ? AND bucket <= ?
+        GROUP BY b
+        ORDER BY b {"DESC" if order.upper() == "DESC" else "ASC"}
+    """
+    params: List[Any] = [group, group, res, from_ts - res, to_ts]
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    cur.execute(sql, params)
+    return cur.fetchall()
+
+
+def _cover(start: float, end: float, levels: Sequence[int]) -> List[Tuple[Optional[int], float, float]]:
+    if start >= end:
+        return []
+    if not levels:
+        return [(None, start, end)]
+    res = levels[0]
+    lo = math.ceil(start / res) * res
+    hi = int(end // res) * res
+    if lo >= hi:
+        return _cover(start, end, levels[1:])
+    return _cover(start, lo, levels[1:]) + [(res, lo, hi)] + _cover(hi, end, levels[1:])
+
+
+def summarize(cur: sqlite3.Cursor, column: str, from_ts: float, to_ts: float) -> Tuple[Optional[float], Optional[float], int]:
+    """Exact (min, max, count) for one column: whole buckets from rollups, edges from raw rows."""
+    return summarize_many(cur, (column,), from_ts, to_ts)[column]
+
+
+def summarize_many(
+    cur: sqlite3.Cursor, columns: Sequence[str], from_ts: float, to_ts: float
+) -> Dict[str, Tuple[Optional[float], Optional[float], int]]:
+    """`summarize` for several columns, reading each covering segment once."""
+    result: Dict[str, Tuple[Optional[float], Optional[float], int]] = {column: (None, None, 0) for column in columns}
+    for res, start, end in _cover(from_ts, to_ts, tuple(reversed(ROLLUP_RESOLUTIONS))):
+        if res is None:
+            select = ", ".join(f"MIN({column}), MAX({column}), COUNT({column})" for column in columns)
+            cur.execute(f"SELECT {select} FROM sensor_log WHERE ts >= ? AND ts < ?", (start, end))
+        else:
+            select = ", ".join(f"MIN({column}_min), MAX({column}_max), SUM({column}_n)" for column in columns)
+            cur.execute(
+                f"SELECT {select} FROM sensor_rollup WHERE res = ? AND bucket >= ? AND bucket < ?",
+                (res, start, end),
+            )
+        row = cur.fetchone()
+        if row is None:
+            continue
+        for pos, column in enumerate(columns):
+            seg_min, seg_max, seg_count = row[pos * 3 : pos * 3 + 3]
+            if not seg_count:
+                continue
+            min_val, max_val, count = result[column]
+            result[column] = (
+                seg_min if min_val is None else min(min_val, seg_min),
+                seg_max if max_val is None else max(max_val, seg_max),
+                count + int(seg_count),
+            )
+    return result
@@ -0,0 +1,142 @@
+"""Per-sensor polling intervals from the `polling` section of config/sensors.json.
+
+Each sensor family gets a `PollPlan`. After every reading the driver's next
+interval is picked from it: `min_interval` while a related actuator is on or
+while a field moves by more than its `change_threshold`, otherwise the
+interval backs off towards `max_interval`. `change_threshold` is either one
+number for every numeric field or an object of per-field thresholds (fields
+it does not name are ignored).
+"""
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, Mapping, Optional, Union
+
+DEFAULT_POLLING: Dict[str, Dict[str, Any]] = {
+    # humidity jitters by a few %RH between reads; it must not pin the DHT22 at min_interval
+    "dht22": {
+        "interval": 3,
+        "min_interval": 2.5,
+        "max_interval": 10,
+        "change_threshold": {"temperature": 0.5, "humidity": 2},
+        "fast_when": ["heater"],
+    },
+    "ds18b20": {"interval": 10, "min_interval": 5, "max_interval": 30, "change_threshold": 0.3, "fast_when": ["heater"]},
+    "bh1750": {"interval": 1, "min_interval": 0.5, "max_interval": 5, "change_threshold": 20, "fast_when": ["light"]},
+    "soil": {"interval": 30, "min_interval": 3, "max_interval": 60, "change_threshold": 200, "fast_when": ["pump"]},
+}
+# DHT22 returns stale or failed reads when polled faster than about every 2 seconds
+MIN_INTERVALS = {"dht22": 2.0}
+FLOOR_INTERVAL = 0.1
+BACKOFF = 1.5
+
+Threshold = Union[float, Mapping[str, float]]
+
+
+@dataclass(frozen=True)
+class PollPlan:
+    interval: float
+    min_interval: float
+    max_interval: float
+    change_threshold: Optional[Threshold] = None
+    # actuator names or roles (lower case) that switch the sensor to min_interval while on
+    fast_when: FrozenSet[str] = frozenset()
+
+
+def _threshold(raw: Any) -> Optional[Threshold]:
+    if raw is None:
+        return None
+    if isinstance(raw, dict):
+        fields = {str(field): float(value) for field, value in raw.items() if value is not None}
+        return MappingProxyType(fields) if fields else None
+    return float(raw)
+
+
+def _plan(name: str, entry: Dict[str, Any]) -> PollPlan:
+    floor = MIN_INTERVALS.get(name, FLOOR_INTERVAL)
+    interval = max(floor, float(entry["interval"]))
+    min_interval = max(floor, min(interval, float(entry.get("min_interval", interval))))
+    max_interval = max(interval, float(entry.get("max_interval", interval)))
+    fast_when = frozenset(str(item).strip().lower() for item in entry.get("fast_when") or [] if str(item).strip())
+    return PollPlan(
+        interval=interval,
+        min_interval=min_interval,
+        max_interval=max_interval,
+        change_threshold=_threshold(entry.get("change_threshold")),
+        fast_when=fast_when,
+    )
+
+
+def compile_plans(config: Dict[str, Any]) -> Dict[str, PollPlan]:
+    """One plan per sensor family; entries in `config["polling"]` override the defaults key by key."""
+    polling = config.get("polling") if isinstance(config, dict) else None
+    if not isinstance(polling, dict):
+        polling = {}
+    plans: Dict[str, PollPlan] = {}
+    for name, defaults in DEFAULT_POLLING.items():
+        entry = dict(defaults)
+        if isinstance(polling.get(name), dict):
+            entry.update(polling[name])
+        try:
+            plans[name] = _plan(name, entry)
+        except (TypeError, ValueError):
+            plans[name] = _plan(name, defaults)
+    return plans
+
+
+def field_changes(previous: Optional[Dict[str, Any]], reading: Dict[str, Any]) -> Dict[str, float]:
+    """Absolute change of every numeric field present in both readings of one sensor."""
+    if not previous:
+        return {}
+    changes: Dict[str, float] = {}
+    for key, value in reading.items():
+        old = previous.get(key)
+        if key == "ts" or isinstance(value, bool) or isinstance(old, bool):
+            continue
+        if isinstance(value, (int, float)) and isinstance(old, (int, float)):
+            changes[key] = abs(value - old)
+    return changes
+
+
+def max_change(previous: Optional[Dict[str, Any]], reading: Dict[str, Any]) -> Optional[float]:
+    """Largest absolute change of any numeric field between two readings of one sensor."""
+    changes = field_changes(previous, reading)
+    return max(changes.values()) if changes else None
+
+
+def moving(threshold: Threshold, previous: Optional[Dict[str, Any]], reading: Dict[str, Any]) -> Optional[bool]:
+    """Whether any field moved by more than its threshold; None when no thresholded field can be compared."""
+    changes = field_changes(previous, reading)
+    if isinstance(threshold, Mapping):
+        limits = {field: threshold[field] for field in changes if field in threshold}
+    else:
+        limits = {field: threshold for field in changes}
+    if not limits:
+        return None
+    return any(changes[field] > limit for field, limit in limits.items())
+
+
+def is_fast(plan: PollPlan, active: Iterable[str]) -> bool:
+    return any(item in plan.fast_when for item in active)
+
+
+def next_interval(
+    plan: PollPlan, current: float, previous: Optional[Dict[str, Any]], reading: Dict[str, Any], fast: bool
+) -> float:
+    if reading.get("status") not in ("ok", "simulated"):
+        return plan.interval
+    if fast:
+        return plan.min_interval
+    if plan.change_threshold is None:
+        return plan.interval
+    moved = moving(plan.change_threshold, previous, reading)
+    if moved is None:
+        return plan.interval
+    if moved:
+        return plan.min_interval
+    return min(plan.max_interval, max(current, plan.min_interval) * BACKOFF)
+
+
+def stale_after(plan: PollPlan, minimum: float) -> float:
+    """Age after which a reading on this plan counts as stale."""
+    return max(minimum, 2 * plan.max_interval)
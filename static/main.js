@@ -1,6 +1,12 @@
 const state = {
   status: null,
+  statusEtag: null,
   poller: null,
+  pollIntervalMs: 2500,
+  statusFields: '',
+  stream: null,
+  streamLive: false,
+  streamRetryTimer: null,
   connection: {
     ok: false,
     lastOk: 0,
@@ -226,10 +232,28 @@ function renderStatus(status) {
 }
 
 function poll() {
-  fetch('/api/status', { cache: 'no-store' })
+  const headers = state.statusEtag ? { 'If-None-Match': state.statusEtag } : {};
+  // with a known version the server answers with a merge patch instead of the full payload
+  const since = state.status && state.statusEtag
+    ? state.statusEtag.replace(/^W\//, '').replace(/"/g, '')
+    : '';
+  const params = new URLSearchParams();
+  if (state.statusFields) params.set('fields', state.statusFields);
+  if (since) params.set('since', since);
+  const query = params.toString();
+  fetch(query ? `/api/status?${query}` : '/api/status', { cache: 'no-store', headers })
     .then(async r => {
+      if (r.status === 304) {
+        // unchanged since the last render; only the connection indicator moves
+        state.connection.ok = true;
+        state.connection.lastOk = Date.now();
+        setConnectionStatus(true);
+        return;
+      }
       if (!r.ok) throw new Error(`HTTP ${r.status}`);
-      const data = await r.json();
+      const body = await r.json();
+      const data = body.patch ? applyMergePatch(state.status || {}, body.patch) : body;
+      state.statusEtag = r.headers.get('ETag');
       state.status = data;
       state.connection.ok = true;
       state.connection.lastOk = Date.now();
@@ -247,9 +271,120 @@ function poll() {
     });
 }
 
-window.initDashboard = function() {
+function markConnected() {
+  state.connection.ok = true;
+  state.connection.lastOk = Date.now();
+  setConnectionStatus(true);
+}
+
+function startPolling() {
+  if (state.poller) clearInterval(state.poller);
+  state.poller = setInterval(poll, state.pollIntervalMs);
+}
+
+function stopPolling() {
+  if (state.poller) clearInterval(state.poller);
+  state.poller = null;
+}
+
+// RFC 7396: null removes a key, objects merge, everything else replaces
+function applyMergePatch(target, patch) {
+  if (patch === null || typeof patch !== 'object' || Array.isArray(patch)) return patch;
+  const out = (target && typeof target === 'object' && !Array.isArray(target)) ? { ...target } : {};
+  Object.entries(patch).forEach(([key, value]) => {
+    if (value === null) delete out[key];
+    else out[key] = applyMergePatch(out[key], value);
+  });
+  return out;
+}
+
+function onStreamEvent(item) {
+  if (!state.eventsData) return;
+  const events = [item, ...(Array.isArray(state.eventsData.events) ? state.eventsData.events : [])].slice(0, 50);
+  state.eventsData = { ...state.eventsData, events };
+  renderEvents(state.eventsData);
+}
+
+// relay transitions are pushed before the next (throttled) status patch
+function onStreamActuator(item) {
+  if (!state.status || !item || !item.name) return;
+  const on = item.state === 'on';
+  const name = String(item.name).toUpperCase();
+  const change = { state: on, reason: item.reason, last_change_ts: item.ts };
+  const next = { ...state.status };
+  if (next.actuator_state && next.actuator_state[item.name]) {
+    next.actuator_state = { ...next.actuator_state, [item.name]: { ...next.actuator_state[item.name], ...change } };
+  }
+  if (Array.isArray(next.actuators)) {
+    next.actuators = next.actuators.map(act => (
+      ['id', 'legacy_name', 'name'].some(key => typeof act[key] === 'string' && act[key].trim().toUpperCase() === name)
+        ? { ...act, ...change }
+        : act
+    ));
+  }
+  state.status = next;
+  renderStatus(next);
+}
+
+function onStreamAlert(item) {
+  if (!state.status || !Array.isArray(state.status.alerts)) return;
+  state.status = { ...state.status, alerts: [...state.status.alerts, item].slice(-50) };
+  renderStatus(state.status);
+}
+
+function openStatusStream() {
+  if (state.stream) state.stream.close();
+  const query = state.statusFields ? `?fields=${encodeURIComponent(state.statusFields)}` : '';
+  const source = new EventSource(`/api/stream${query}`);
+  state.stream = source;
+  source.onopen = () => {
+    // pushes replace the status/event pollers while the stream is up
+    state.streamLive = true;
+    stopPolling();
+    if (state.eventsTimer) clearInterval(state.eventsTimer);
+    state.eventsTimer = null;
+  };
+  source.addEventListener('status', ev => {
+    const msg = JSON.parse(ev.data);
+    const data = msg.full ? msg.data : applyMergePatch(state.status || {}, msg.patch || {});
+    state.status = data;
+    state.statusEtag = null;
+    markConnected();
+    renderStatus(data);
+  });
+  source.addEventListener('event', ev => onStreamEvent(JSON.parse(ev.data)));
+  source.addEventListener('actuator', ev => onStreamActuator(JSON.parse(ev.data)));
+  source.addEventListener('alert', ev => onStreamAlert(JSON.parse(ev.data)));
+  source.onerror = () => {
+    const wasLive = state.streamLive;
+    state.streamLive = false;
+    if (!state.poller) {
+      if (wasLive) poll();
+      startPolling();
+    }
+    if (wasLive && document.getElementById('eventLog') && !state.eventsTimer) {
+      state.eventsTimer = setInterval(() => fetchEvents(false), 8000);
+    }
+    if (source.readyState === EventSource.CLOSED) {
+      // server refused (e.g. too many clients); poll for a while, then try again
+      state.stream = null;
+      if (state.streamRetryTimer) clearTimeout(state.streamRetryTimer);
+      state.streamRetryTimer = setTimeout(openStatusStream, 30000);
+    }
+  };
+}
+
+// fields: a server-side preset/section list so the page only pays for what it renders
+function startStatusFeed(intervalMs, fields) {
+  state.pollIntervalMs = intervalMs;
+  state.statusFields = fields || '';
   poll();
-  state.poller = setInterval(poll, 2500);
+  startPolling();
+  if (window.EventSource) openStatusStream();
+}
+
+window.initDashboard = function() {
+  startStatusFeed(2500, 'dashboard');
   initHistory();
   initEvents();
 };
@@ -282,12 +417,14 @@ window.renderDashboard = function(data) {
   document.getElementById('dhtTemp').textContent = dht.temperature ?? '--';
   document.getElementById('dhtHum').textContent = dht.humidity ?? '--';
   statusBadge('dhtStatus', dht.status);
-  const avg1 = document.getElementById('dhtAvg1m');
-  const avg5 = document.getElementById('dhtAvg5m');
-  const avg30 = document.getElementById('dhtAvg30m');
-  if (avg1) avg1.textContent = fmtAvg(dhtAvg['1m']);
-  if (avg5) avg5.textContent = fmtAvg(dhtAvg['5m']);
-  if (avg30) avg30.textContent = fmtAvg(dhtAvg['30m']);
+  // one row per configured stats window; labels come from the server ("1m", "2h", ...)
+  const avgWrap = document.getElementById('dhtAverages');
+  if (avgWrap) {
+    avgWrap.innerHTML = Object.keys(dhtAvg).map(label => {
+      const text = label.replace(/h$/, ' sa').replace(/m$/, ' dk').replace(/s$/, ' sn');
+      return `<div>${text} ort: ${fmtAvg(dhtAvg[label])}</div>`;
+    }).join('');
+  }
   document.getElementById('dsTemp').textContent = ds.temperature ?? '--';
   statusBadge('dsStatus', ds.status);
   document.getElementById('luxValue').textContent = lux.lux ?? '--';
@@ -750,8 +887,7 @@ function automationOverrideInfo(roleKey, automationState) {
 }
 
 window.initControl = function() {
-  poll();
-  state.poller = setInterval(poll, 2500);
+  startStatusFeed(2500, 'control');
   const refreshBtn = document.getElementById('refreshNow');
   if (refreshBtn) refreshBtn.onclick = poll;
   const emergencyBtn = document.getElementById('emergencyStop');
@@ -1222,8 +1358,10 @@ function fetchHistory(force) {
       max_points: String(HISTORY_MAX_POINTS),
     });
     if (state.history.zone) params.set('zone', state.history.zone);
+    params.set('encoding', 'f32');
     fetch(`/api/trends?${params.toString()}`)
       .then(r => r.json())
+      .then(decodePoints)
       .then(data => {
         state.history.lastFetch = now;
         state.history.data = data;
@@ -1234,8 +1372,9 @@ function fetchHistory(force) {
       });
   } else {
     const from = now - rangeMeta.seconds;
-    fetch(`/api/history?metric=${encodeURIComponent(metric)}&from=${from}&to=${now}`)
+    fetch(`/api/history?metric=${encodeURIComponent(metric)}&from=${from}&to=${now}&encoding=f32`)
       .then(r => r.json())
+      .then(decodePoints)
       .then(data => {
         state.history.lastFetch = now;
         state.history.data = data;
@@ -1247,6 +1386,26 @@ function fetchHistory(force) {
   }
 }
 
+function base64Floats(text, ArrayType) {
+  const bin = atob(text || '');
+  const bytes = new Uint8Array(bin.length);
+  for (let i = 0; i < bin.length; i += 1) bytes[i] = bin.charCodeAt(i);
+  // the server packs little-endian, which is what every browser platform uses natively
+  return new ArrayType(bytes.buffer);
+}
+
+// encoding=f32 bodies (float64 ts + float32 values, NaN = gap) back to [[ts, value], ...]
+function decodePoints(data) {
+  if (!data || data.encoding !== 'f32') return data;
+  const ts = base64Floats(data.ts, Float64Array);
+  const values = base64Floats(data.v, Float32Array);
+  const points = new Array(ts.length);
+  for (let i = 0; i < ts.length; i += 1) {
+    points[i] = [ts[i], Number.isNaN(values[i]) ? null : values[i]];
+  }
+  return { ...data, points };
+}
+
 function renderHistory(data) {
   const metric = data.metric || state.history.metric;
   const rangeMeta = HISTORY_RANGES[state.history.range] || HISTORY_RANGES['24h'];
@@ -1503,7 +1662,7 @@ function initEvents() {
   bindEventFilters();
   fetchEvents(true);
   if (state.eventsTimer) clearInterval(state.eventsTimer);
-  state.eventsTimer = setInterval(() => fetchEvents(false), 8000);
+  state.eventsTimer = state.streamLive ? null : setInterval(() => fetchEvents(false), 8000);
 }
 
 function getEventFilters() {
@@ -1673,8 +1832,7 @@ function initAdminToken() {
 }
 
 window.initSettings = function() {
-  poll();
-  state.poller = setInterval(poll, 2500);
+  startStatusFeed(2500);
   const saveBtn = document.getElementById('saveSettings');
   if (saveBtn) saveBtn.onclick = saveSettings;
   const saveBtnBottom = document.getElementById('saveSettingsBottom');
@@ -1937,7 +2095,7 @@ function runRetentionCleanup() {
       if (result) result.textContent = msg;
       return;
     }
-    if (result) result.textContent = 'Tamamlandı';
+    if (result) result.textContent = 'Başlatıldı (ilerleme özet satırında)';
     poll();
   }).catch(() => {
     if (result) result.textContent = 'Temizlik başarısız.';
@@ -2120,13 +2278,23 @@ window.renderSettings = function(data) {
     const sensorDays = Number(retentionCfg.sensor_log_days ?? 0);
     const eventDays = Number(retentionCfg.event_log_days ?? 0);
     const actuatorDays = Number(retentionCfg.actuator_log_days ?? 0);
-    summaryRetention.textContent = `Sensör ${sensorDays}g · Olay ${eventDays}g · Aktüatör ${actuatorDays}g`;
+    let text = `Sensör ${sensorDays}g · Olay ${eventDays}g · Aktüatör ${actuatorDays}g`;
+    const progress = retentionStatus.progress;
+    if (progress) {
+      text += ` · Temizlik: ${progress.phase || '-'}`;
+      if (progress.backup_pages_total) {
+        const done = progress.backup_pages_total - (progress.backup_pages_remaining ?? 0);
+        text += ` ${Math.round((done / progress.backup_pages_total) * 100)}%`;
+      } else if (progress.deleted != null) {
+        text += ` (${progress.table || ''} ${progress.deleted})`;
+      }
+    }
+    summaryRetention.textContent = text;
   }
 };
 
 window.initPins = function() {
-  poll();
-  state.poller = setInterval(poll, 4000);
+  startStatusFeed(4000);
   document.getElementById('savePins').onclick = savePins;
 };
 
@@ -2192,9 +2360,7 @@ function savePins() {
 }
 
 window.initHardware = function() {
-  poll();
-  if (state.poller) clearInterval(state.poller);
-  state.poller = setInterval(poll, 4000);
+  startStatusFeed(4000);
   const refreshBtn = document.getElementById('hardwareRefresh');
   if (refreshBtn) refreshBtn.onclick = poll;
   const addBtn = document.getElementById('addHardwareRow');
@@ -2463,8 +2629,7 @@ function clearSensorLog() {
 }
 
 window.initLogs = function() {
-  poll();
-  state.poller = setInterval(poll, 4000);
+  startStatusFeed(4000);
   if (typeof initHistory === 'function') initHistory();
   if (typeof initEvents === 'function') initEvents();
   const refreshBtn = document.getElementById('sensorLogRefresh');
@@ -2620,9 +2785,7 @@ function insertLcdToken(token) {
 }
 
 window.initLcd = function() {
-  poll();
-  if (state.poller) clearInterval(state.poller);
-  state.poller = setInterval(poll, 4000);
+  startStatusFeed(4000, 'lcd');
   const refreshBtn = document.getElementById('lcdRefresh');
   const saveBtn = document.getElementById('lcdSave');
   if (refreshBtn) refreshBtn.onclick = () => fetchLcdConfig();
@@ -2759,6 +2922,33 @@ function zoneTrendKey(zoneId, metric) {
   return `${zoneId || 'unknown'}:${metric || 'metric'}`;
 }
 
+// Sparkline requests made while rendering the zone cards are collected and sent as one /api/trends/batch call.
+const zoneTrendBatch = { pending: new Map(), timer: null };
+
+function flushZoneTrendBatch() {
+  const items = Array.from(zoneTrendBatch.pending.values());
+  zoneTrendBatch.pending.clear();
+  zoneTrendBatch.timer = null;
+  if (!items.length) return;
+  const params = new URLSearchParams({
+    hours: String(ZONE_TREND_HOURS),
+    max_points: String(ZONE_TREND_MAX_POINTS),
+    encoding: 'f32',
+  });
+  params.set('series', items.map(item => `${item.zoneId}:${item.metric}`).join(','));
+  fetch(`/api/trends/batch?${params.toString()}`)
+    .then(r => r.json())
+    .then(body => {
+      const series = Array.isArray(body.series) ? body.series : [];
+      items.forEach((item, idx) => {
+        const data = decodePoints(series[idx] || { points: [] });
+        state.zoneTrends[item.key] = { lastFetch: item.requestedAt, data };
+        item.resolve(data);
+      });
+    })
+    .catch(() => items.forEach(item => item.resolve({ points: [] })));
+}
+
 function fetchZoneTrend(zoneId, metric) {
   if (!zoneId || !metric) return Promise.resolve({ points: [] });
   const now = Date.now() / 1000;
@@ -2768,13 +2958,13 @@ function fetchZoneTrend(zoneId, metric) {
   if (existing && now - existing.lastFetch < ZONE_TREND_REFRESH_SECONDS) {
     return Promise.resolve(existing.data || { points: [] });
   }
-  return fetch(`/api/trends?zone=${encodeURIComponent(zoneId)}&metric=${encodeURIComponent(metric)}&hours=${ZONE_TREND_HOURS}&max_points=${ZONE_TREND_MAX_POINTS}`)
-    .then(r => r.json())
-    .then(data => {
-      state.zoneTrends[key] = { lastFetch: now, data };
-      return data;
-    })
-    .catch(() => ({ points: [] }));
+  const queued = zoneTrendBatch.pending.get(key);
+  if (queued) return queued.promise;
+  const item = { key, zoneId, metric, requestedAt: now };
+  item.promise = new Promise(resolve => { item.resolve = resolve; });
+  zoneTrendBatch.pending.set(key, item);
+  if (!zoneTrendBatch.timer) zoneTrendBatch.timer = setTimeout(flushZoneTrendBatch, 0);
+  return item.promise;
 }
 
 function drawZoneSparkline(canvas, points) {
@@ -3022,31 +3212,26 @@ function fetchOverviewSummary(force) {
     renderOverviewSummary();
     return;
   }
-  const requests = OVERVIEW_SUMMARY_METRICS.map(meta => {
-    const params = new URLSearchParams({
-      metric: meta.key,
-      hours: String(hours),
-      summary: '1',
-    });
-    if (state.overview?.summaryZone) {
-      params.set('zone', state.overview.summaryZone);
-    }
-    return fetch(`/api/trends?${params.toString()}`)
-      .then(r => r.json())
-      .catch(() => ({ metric: meta.key, count: 0 }));
+  const params = new URLSearchParams({
+    hours: String(hours),
+    summary: '1',
+    series: OVERVIEW_SUMMARY_METRICS.map(meta => `${zone}:${meta.key}`).join(','),
   });
-  Promise.all(requests).then(results => {
-    const summary = {};
-    results.forEach(item => {
-      if (item && item.metric) summary[item.metric] = item;
+  fetch(`/api/trends/batch?${params.toString()}`)
+    .then(r => r.json())
+    .catch(() => ({ series: [] }))
+    .then(body => {
+      const summary = {};
+      (Array.isArray(body.series) ? body.series : []).forEach(item => {
+        if (item && item.metric) summary[item.metric] = item;
+      });
+      cache[cacheKey] = {
+        data: summary,
+        lastFetch: now,
+        updatedAt: Date.now(),
+      };
+      renderOverviewSummary();
     });
-    cache[cacheKey] = {
-      data: summary,
-      lastFetch: now,
-      updatedAt: Date.now(),
-    };
-    renderOverviewSummary();
-  });
 }
 
 function renderOverviewSummary() {
@@ -3205,14 +3390,12 @@ window.initOverview = function() {
       }
     });
   });
-  poll();
-  state.poller = setInterval(poll, 2500);
+  startStatusFeed(2500);
 };
 
 window.initZones = function() {
   bindRefreshButton();
-  poll();
-  state.poller = setInterval(poll, 2500);
+  startStatusFeed(2500, 'zones');
 };
 
 window.renderOverview = function(data) {
@@ -3403,4 +3586,6 @@ window.addEventListener('beforeunload', () => {
   if (state.poller) clearInterval(state.poller);
   if (state.historyTimer) clearInterval(state.historyTimer);
   if (state.eventsTimer) clearInterval(state.eventsTimer);
+  if (state.streamRetryTimer) clearTimeout(state.streamRetryTimer);
+  if (state.stream) state.stream.close();
 });
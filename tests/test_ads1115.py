@@ -0,0 +1,121 @@
+import sys
+import types
+
+import pytest
+
+import ads1115
+
+
+class FakeBus:
+    """ADS1115 register model: each conversion returns the next value queued for the selected channel."""
+
+    def __init__(self, values):
+        self.values = {channel: list(seq) for channel, seq in values.items()}
+        self.config = 0
+        self.writes = []
+
+    def write_i2c_block_data(self, addr, register, data):
+        self.writes.append((register, (data[0] << 8) | data[1]))
+        if register == ads1115.REG_CONFIG:
+            self.config = (data[0] << 8) | data[1]
+
+    def read_i2c_block_data(self, addr, register, length):
+        if register == ads1115.REG_CONFIG:
+            return [0x80 | (self.config >> 8) & 0x7F, self.config & 0xFF]
+        channel = ((self.config >> 12) & 0x7) - 4
+        raw = self.values[channel].pop(0) & 0xFFFF
+        return [raw >> 8, raw & 0xFF]
+
+
+def test_single_shot_round_robin_with_median():
+    bus = FakeBus({0: [100, 101, 5000, 99, 100], 1: [-3, -2, -3, -4, -3]})
+    sampler = ads1115.Sampler(bus, 0x48, data_rate=860, samples=5)
+    result = sampler.read((0, 1))
+    assert result[0][0] == 100 and result[1][0] == -3
+    # the outlier does not move the median and barely moves the noise estimate
+    assert 0 < result[0][1] < 1
+    channels = [((word >> 12) & 0x7) - 4 for reg, word in bus.writes if reg == ads1115.REG_CONFIG]
+    assert channels == [0, 1] * 5
+
+
+def test_continuous_mode_discards_first_conversion_and_uses_ready_pin():
+    bus = FakeBus({2: [10, 12, 11]})
+    waits = []
+    sampler = ads1115.Sampler(bus, 0x48, samples=3, mode="continuous", reducer="mean", wait_ready=lambda t: waits.append(t) or True)
+    value, _noise = sampler.read((2,))[2]
+    assert value == 11
+    # one extra conversion period is waited out after the mux switch
+    assert len(waits) == 4
+    assert (ads1115.REG_HI_THRESH, 0x8000) in bus.writes
+    assert bus.config & 0x0100  # back in single-shot (power-down) mode
+
+
+def test_reduce_and_config_word():
+    assert ads1115.reduce([1, 2, 3, 4, 100], "trimmed_mean", 0.2)[0] == 3
+    assert ads1115.reduce([5], "median")[0] == 5
+    assert ads1115.config_word(0, 128) == 0xC383  # the old fixed single-shot config
+    with pytest.raises(ValueError):
+        ads1115.Sampler(FakeBus({}), 0x48, data_rate=100)
+    with pytest.raises(OSError):
+        ads1115.Sampler(FakeBus({0: [1]}), 0x48, wait_ready=lambda t: False).read((0,))
+
+
+class FakeGPIO(types.ModuleType):
+    BCM, IN, PUD_UP, FALLING, LOW = "bcm", "in", "pud_up", "falling", 0
+
+    def __init__(self, level):
+        super().__init__("RPi.GPIO")
+        self.level = level
+        self.edges = 0
+        self.armed = []
+
+    def setmode(self, mode):
+        pass
+
+    def setup(self, pin, direction, pull_up_down=None):
+        pass
+
+    def input(self, pin):
+        return self.level
+
+    def remove_event_detect(self, pin):
+        self.armed = [item for item in self.armed if item[0] != pin]
+
+    def add_event_detect(self, pin, edge):
+        self.armed.append((pin, edge))
+
+    def event_detected(self, pin):
+        seen, self.edges = self.edges > 0, max(0, self.edges - 1)
+        return seen
+
+    def wait_for_edge(self, pin, edge, timeout=None):
+        raise AssertionError("the edge may already be gone; nothing should wait for it")
+
+
+def _install_gpio(monkeypatch, gpio):
+    package = types.ModuleType("RPi")
+    package.GPIO = gpio
+    monkeypatch.setitem(sys.modules, "RPi", package)
+    monkeypatch.setitem(sys.modules, "RPi.GPIO", gpio)
+
+
+def test_ready_waiter_sees_a_conversion_that_already_finished(monkeypatch):
+    gpio = FakeGPIO(level=0)
+    _install_gpio(monkeypatch, gpio)
+    wait = ads1115.gpio_ready_waiter(17)
+    # single-shot: ALERT/RDY went low before the waiter ran and stays low
+    assert wait(0.005) is True
+    assert gpio.armed == []
+    gpio.level = 1
+    assert wait(0.001) is False
+
+
+def test_continuous_ready_waiter_arms_edge_detection_once(monkeypatch):
+    gpio = FakeGPIO(level=1)
+    _install_gpio(monkeypatch, gpio)
+    wait = ads1115.gpio_ready_waiter(17, "continuous")
+    assert gpio.armed == [(17, "falling")]
+    # the pulse came and went before the waiter ran; the latched flag still counts
+    gpio.edges = 1
+    assert wait(0.005) is True
+    assert wait(0.001) is False
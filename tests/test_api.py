@@ -1,5 +1,13 @@
+import base64
+import gzip
+import json
 import os
+import re
+import struct
+import threading
 import time
+from datetime import datetime, timezone
+from pathlib import Path
 
 import pytest
 
@@ -18,6 +26,13 @@ def reset_node_rate_limits():
     app.NODE_COMMAND_RATE_LIMIT.clear()
 
 
+@pytest.fixture(autouse=True)
+def fresh_status_snapshot():
+    # tests poke app state directly, bypassing the snapshot's invalidation hooks
+    app.status_snapshot.invalidate()
+    yield
+
+
 def test_status_endpoint():
     client = app.app.test_client()
     resp = client.get("/api/status")
@@ -33,6 +48,178 @@ def test_status_endpoint():
     assert data["safe_mode"] is True
 
 
+def test_status_snapshot_etag_and_version():
+    client = app.app.test_client()
+    first = client.get("/api/status")
+    etag = first.headers["ETag"]
+    version = first.get_json()["version"]
+    resp = client.get("/api/status", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.get_data() == b""
+    resp = client.post("/api/settings", json={"safe_mode": False})
+    assert resp.status_code == 200
+    try:
+        resp = client.get("/api/status", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.get_json()["version"] > version
+        assert resp.headers["ETag"] != etag
+    finally:
+        app.app_state.safe_mode = True
+
+
+def test_status_since_returns_merge_patch():
+    client = app.app.test_client()
+    first = client.get("/api/status")
+    full = first.get_json()
+    etag = first.headers["ETag"]
+    resp = client.post("/api/settings", json={"safe_mode": False})
+    assert resp.status_code == 200
+    try:
+        token = etag.replace("W/", "").strip('"')
+        delta = client.get(f"/api/status?since={token}").get_json()
+        assert delta["since"] == full["version"]
+        assert delta["version"] > full["version"]
+        assert delta["patch"]["safe_mode"] is False
+        assert "timestamp" in delta["patch"]
+        assert "catalog" not in delta["patch"] and "limits" not in delta["patch"]
+        assert client.get(f"/api/status?since={delta['since']}").get_json()["patch"] == delta["patch"]
+        # unknown versions and other epochs get the full payload
+        assert "patch" not in client.get("/api/status?since=999999").get_json()
+        other = client.get(f"/api/status?since=deadbeef-{full['version']}").get_json()
+        assert other["safe_mode"] is False and "patch" not in other
+    finally:
+        app.app_state.safe_mode = True
+
+
+def test_status_fields_presets(monkeypatch):
+    def boom():
+        raise AssertionError("energy summary built for a preset that does not need it")
+
+    monkeypatch.setattr(app, "_energy_summary", boom)
+    client = app.app.test_client()
+    data = client.get("/api/status?fields=lcd").get_json()
+    assert set(data) == set(app.STATUS_BASE_FIELDS) | {"sensor_readings", "actuator_state", "lcd", "automation", "version"}
+    data = client.get("/api/status?fields=control,retention").get_json()
+    assert "cooldowns" in data and "retention" in data and "energy" not in data
+    assert client.get("/api/status?fields=bogus").status_code == 400
+
+    etag = client.get("/api/status?fields=lcd").headers["ETag"]
+    assert client.get("/api/status?fields=lcd", headers={"If-None-Match": etag}).status_code == 304
+    resp = client.post("/api/settings", json={"safe_mode": False})
+    assert resp.status_code == 200
+    try:
+        data = client.get("/api/status?fields=lcd").get_json()
+        assert data["safe_mode"] is False
+    finally:
+        app.app_state.safe_mode = True
+
+
+def test_status_presets_cover_their_page_renderers():
+    """Every status section a page's JS reads must be in the preset that page asks for."""
+    src = (Path(app.__file__).parent / "static" / "main.js").read_text(encoding="utf-8")
+    starts = list(re.finditer(r"^(?:window\.(\w+) = function|function (\w+))\(", src, re.M))
+    blocks = {}
+    for idx, match in enumerate(starts):
+        end = starts[idx + 1].start() if idx + 1 < len(starts) else len(src)
+        blocks[match.group(1) or match.group(2)] = src[match.start() : end]
+    checked = 0
+    for name, body in blocks.items():
+        preset = re.search(r"startStatusFeed\(\d+, '(\w+)'\)", body) if name.startswith("init") else None
+        if not preset:
+            continue
+        # feed plumbing dispatches to every page's renderer; do not follow it
+        seen = {"renderStatus", "poll", "startPolling", "startStatusFeed", "openStatusStream"}
+        todo = [name, "render" + name[len("init") :]]
+        keys = set()
+        while todo:
+            current = todo.pop()
+            if current in seen or current not in blocks:
+                continue
+            seen.add(current)
+            keys |= set(re.findall(r"\b(?:data|status)\??\.(\w+)", blocks[current]))
+            # functions are also passed by reference (e.g. lines.map(applyLcdTemplateLine))
+            todo.extend(word for word in re.findall(r"\b(\w+)\b", blocks[current]) if word in blocks)
+        allowed = set(app.STATUS_BASE_FIELDS) | set(app.STATUS_PRESETS[preset.group(1)])
+        assert (keys & set(app.STATUS_SECTIONS)) - allowed == set(), (name, preset.group(1))
+        checked += 1
+    assert checked >= len(app.STATUS_PRESETS)
+
+
+def test_merge_patch_roundtrip():
+    old = {"a": 1, "b": {"x": 1, "y": 2}, "c": [1]}
+    new = {"a": 1, "b": {"x": 3}, "c": [1, 2], "d": "new"}
+    assert app._merge_patch(old, new) == {"b": {"x": 3, "y": None}, "c": [1, 2], "d": "new"}
+    assert app._merge_patch(new, new) == {}
+
+
+def test_stream_patch_skips_volatile_only_changes():
+    sent = {"version": 3, "timestamp": "a", "data_age_sec": 1.0, "safe_mode": True}
+    assert app._stream_patch(sent, dict(sent)) is None
+    assert app._stream_patch(sent, {**sent, "version": 4, "timestamp": "b", "data_age_sec": 2.0}) is None
+    patch = app._stream_patch(sent, {**sent, "version": 4, "timestamp": "b", "safe_mode": False})
+    assert patch == {"version": 4, "timestamp": "b", "safe_mode": False}
+
+
+def test_stream_pushes_status_then_alerts():
+    client = app.app.test_client()
+    resp = client.get("/api/stream", buffered=False)
+    try:
+        assert resp.status_code == 200
+        assert resp.mimetype == "text/event-stream"
+        chunks = iter(resp.response)
+        first = next(chunks)
+        first = first.decode() if isinstance(first, bytes) else first
+        assert first.startswith("event: status\n")
+        full = json.loads(first.split("data: ", 1)[1])
+        assert full["full"] is True
+        assert full["data"]["version"] == full["version"]
+        assert app.stream_hub.stats()["clients"] == 1
+
+        app.alerts.add("warning", "stream test alert")
+        seen = {}
+        for _ in range(4):
+            chunk = next(chunks)
+            chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+            if chunk.startswith(":"):
+                continue
+            lines = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+            seen.setdefault(lines["event"], json.loads(lines["data"]))
+            if "alert" in seen and "status" in seen:
+                break
+        assert seen["alert"]["message"] == "stream test alert"
+        assert seen["status"]["version"] > full["version"]
+        assert seen["status"]["patch"]["alerts"]
+    finally:
+        resp.close()
+    assert app.stream_hub.stats()["clients"] == 0
+
+
+def test_stream_sends_status_right_after_an_actuator_event(monkeypatch):
+    monkeypatch.setattr(app, "STREAM_PATCH_MIN_SECONDS", 60)
+    client = app.app.test_client()
+    resp = client.get("/api/stream?fields=control", buffered=False)
+    try:
+        chunks = iter(resp.response)
+        next(chunks)
+        app.actuator_manager.set_state("R4_FAN_L3", True, "stream_test")
+        seen = {}
+        for _ in range(6):
+            chunk = next(chunks)
+            chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+            if chunk.startswith(":"):
+                continue
+            lines = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+            seen.setdefault(lines["event"], json.loads(lines["data"]))
+            if "actuator" in seen and "status" in seen:
+                break
+        assert seen["actuator"]["name"] == "R4_FAN_L3" and seen["actuator"]["state"] == "on"
+        # not held back by the patch throttle
+        assert seen["status"]["patch"]["actuator_state"]["R4_FAN_L3"]["state"] is True
+    finally:
+        resp.close()
+        app.actuator_manager.set_state("R4_FAN_L3", False, "stream_test")
+
+
 def test_safe_mode_blocks_manual_control():
     client = app.app.test_client()
     resp = client.post("/api/actuator/R3_PUMP", json={"state": "on", "seconds": 3})
@@ -114,15 +301,15 @@ def test_role_based_pump_requires_seconds():
 
 def test_daily_limit_enforced(tmp_path):
     original_db = app.DB_PATH
-    original_catalog = app.catalog_config
+    original_catalog = app.catalog_index
     try:
         app.DB_PATH = tmp_path / "sera.db"
         app.init_db()
-        app.catalog_config = {
+        app.catalog_index = app.CatalogIndex({
             "actuators": [
                 {"id": "R2_FAN_MAIN", "max_daily_s": 1, "role": "fan"},
             ]
-        }
+        })
         client = app.app.test_client()
         resp = client.post("/api/settings", json={"safe_mode": False})
         assert resp.status_code == 200
@@ -135,11 +322,155 @@ def test_daily_limit_enforced(tmp_path):
         assert "Daily limit" in body.get("error", "")
     finally:
         app.DB_PATH = original_db
-        app.catalog_config = original_catalog
+        app.catalog_index = original_catalog
         app.init_db()
         app.app_state.safe_mode = True
 
 
+def test_runtime_ledger_rolls_and_rebuilds_from_db(tmp_path):
+    ledger = app.RuntimeLedger(window_s=100)
+    ledger.charge("R1", 10, ts=1000)
+    ledger.charge("R1", 5, ts=1050)
+    assert ledger.used("R1", now=1060) == 15
+    assert ledger.used("R1", now=1120) == 5
+    assert ledger.remaining("R1", 8, now=1120) == 3
+    assert ledger.used("R1", now=1200) == 0
+
+    original_db = app.DB_PATH
+    try:
+        app.DB_PATH = tmp_path / "sera.db"
+        app.init_db()
+        app.log_actuation("R9_TEST", True, "manual", 12)
+        app.actuator_manager.ledger.reset([])
+        app.init_db()
+        assert app.actuator_manager.ledger.used("R9_TEST") == 12
+    finally:
+        app.DB_PATH = original_db
+        app.init_db()
+
+
+def test_legacy_actuator_log_migrates_to_epoch_and_intervals(tmp_path):
+    original_db = app.DB_PATH
+    try:
+        app.DB_PATH = tmp_path / "sera.db"
+        conn = app.sqlite3.connect(app.DB_PATH)
+        conn.execute(
+            """
+            CREATE TABLE actuator_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, state TEXT, reason TEXT,
+                ts DATETIME DEFAULT CURRENT_TIMESTAMP, seconds INTEGER
+            )
+            """
+        )
+        conn.executemany(
+            "INSERT INTO actuator_log (name, state, reason, ts, seconds) VALUES (?, ?, ?, ?, ?)",
+            [
+                ("R1_LIGHT", "on", "manual", "2024-01-01 10:00:00", None),
+                ("R3_PUMP", "on", "manual", "2024-01-01 10:30:00", 10),
+                ("R1_LIGHT", "off", "manual", "2024-01-01 12:00:00", None),
+            ],
+        )
+        conn.commit()
+        conn.close()
+        app.init_db()
+        conn = app.sqlite3.connect(app.DB_PATH)
+        ts_type = [row[2] for row in conn.execute("PRAGMA table_info(actuator_log)") if row[1] == "ts"][0]
+        assert ts_type == "REAL"
+        start = datetime(2024, 1, 1, 10, 0, tzinfo=timezone.utc).timestamp()
+        assert conn.execute("SELECT MIN(ts) FROM actuator_log").fetchone()[0] == pytest.approx(start)
+        usage = app._actuator_on_seconds(conn.cursor(), start, start + 24 * 3600)
+        conn.close()
+        assert usage["R1_LIGHT"] == pytest.approx(2 * 3600)
+        assert usage["R3_PUMP"] == pytest.approx(10)
+    finally:
+        app.DB_PATH = original_db
+        app.init_db()
+
+
+def test_actuator_intervals_follow_state_transitions(tmp_path):
+    original_db = app.DB_PATH
+    try:
+        app.DB_PATH = tmp_path / "sera.db"
+        app.init_db()
+        app.record_actuator_transition("R2_FAN_MAIN", True, "manual")
+        app.db_writer.flush()
+        cur = app.db_connections.connection(app.DB_PATH).cursor()
+        now = time.time()
+        open_usage = app._actuator_on_seconds(cur, now - 3600, now + 60)
+        assert open_usage["R2_FAN_MAIN"] == pytest.approx(60, abs=1)
+        app.record_actuator_transition("R2_FAN_MAIN", False, "manual")
+        app.db_writer.flush()
+        cur.execute("SELECT COUNT(*) FROM actuator_interval WHERE end_ts IS NULL")
+        assert cur.fetchone()[0] == 0
+    finally:
+        app.DB_PATH = original_db
+        app.init_db()
+
+
+def test_retention_cleanup_batches_and_backup(tmp_path, monkeypatch):
+    original_db = app.DB_PATH
+    monkeypatch.setattr(app, "RETENTION_BATCH_ROWS", 7)
+    monkeypatch.setattr(app, "RETENTION_BATCH_PAUSE_MS", 0)
+    monkeypatch.setattr(app, "SENSOR_CSV_LOG_DIR", tmp_path / "csv")
+    try:
+        app.DB_PATH = tmp_path / "sera.db"
+        app.init_db()
+        now = time.time()
+        conn = app.sqlite3.connect(app.DB_PATH)
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        conn.executemany(
+            "INSERT INTO sensor_log (ts, dht_temp) VALUES (?, ?)",
+            [(now - 3 * 86400 + i, 20.0) for i in range(50)] + [(now - i, 21.0) for i in range(5)],
+        )
+        conn.commit()
+        conn.close()
+        manager = app.RetentionManager({"sensor_log_days": 1})
+        manager.cleanup_now()
+        status = manager.public_status()
+        assert status["running"] is False
+        assert status["last_summary"]["sensor_log"] == 50
+        manager._backup(tmp_path / "copy.db")
+        copy = app.sqlite3.connect(tmp_path / "copy.db")
+        assert copy.execute("SELECT COUNT(*) FROM sensor_log").fetchone()[0] == 5
+        copy.close()
+    finally:
+        app.DB_PATH = original_db
+        app.init_db()
+
+
+def test_retention_background_cleanup_owns_lock_and_records_errors(monkeypatch):
+    manager = app.RetentionManager({"sensor_log_days": 1})
+    release = threading.Event()
+    started = threading.Event()
+
+    def failing_cleanup():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(manager, "_cleanup", failing_cleanup)
+    assert manager.start_cleanup() is True
+    # the lock is taken before the thread runs, so a second request is refused
+    assert manager.start_cleanup() is False
+    assert started.wait(5)
+    release.set()
+    deadline = time.time() + 5
+    while time.time() < deadline and manager.run_lock.locked():
+        time.sleep(0.01)
+    status = manager.public_status()
+    assert status["running"] is False
+    assert status["last_summary"]["error"] == "disk full"
+    assert not manager.run_lock.locked()
+
+
+def test_retention_managers_keep_their_own_archive():
+    app_root = app.retention_manager.archive.root
+    other = app.RetentionManager({"archive_dir": "data/archives-other"})
+    other.update_config({"archive_dir": "data/archives-moved"})
+    assert other.archive.root == (app.BASE_DIR / "data" / "archives-moved").resolve() / "sensor_log"
+    assert app.retention_manager.archive.root == app_root
+
+
 def test_notifications_test_endpoint_blocked_in_simulation():
     client = app.app.test_client()
     resp = client.post("/api/notifications/test", json={"message": "hello"})
@@ -171,6 +502,44 @@ def test_trends_endpoint_telemetry(tmp_path):
         app.init_db()
 
 
+def test_legacy_telemetry_table_is_migrated(tmp_path):
+    original_db = app.DB_PATH
+    try:
+        app.DB_PATH = tmp_path / "sera.db"
+        conn = app.sqlite3.connect(app.DB_PATH)
+        conn.execute(
+            """
+            CREATE TABLE telemetry_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL, node_id TEXT, zone TEXT,
+                metric TEXT NOT NULL, value REAL, unit TEXT, source TEXT, quality TEXT
+            )
+            """
+        )
+        now = time.time()
+        conn.executemany(
+            "INSERT INTO telemetry_log (ts, node_id, zone, metric, value, unit, source, quality) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (now - 10, "kat1-node", "kat1", "temp_c", 23.0, "C", "kat1-temp", None),
+                (now - 5, "kat1-node", "kat1", "temp_c", 23.5, "C", "kat1-temp", None),
+            ],
+        )
+        conn.commit()
+        conn.close()
+        app.init_db()
+        conn = app.sqlite3.connect(app.DB_PATH)
+        assert conn.execute("SELECT type FROM sqlite_master WHERE name = 'telemetry_log'").fetchone()[0] == "view"
+        assert conn.execute("SELECT COUNT(*) FROM telemetry_series").fetchone()[0] == 1
+        row = conn.execute("SELECT node_id, quality, value FROM telemetry_log ORDER BY ts DESC LIMIT 1").fetchone()
+        conn.close()
+        assert row == ("kat1-node", None, 23.5)
+        client = app.app.test_client()
+        resp = client.get("/api/trends?zone=kat1&metric=temp_c&hours=1")
+        assert [p[1] for p in resp.get_json()["points"]] == [23.0, 23.5]
+    finally:
+        app.DB_PATH = original_db
+        app.init_db()
+
+
 def test_trends_endpoint_downsample_max_points(tmp_path):
     original_db = app.DB_PATH
     try:
@@ -336,6 +705,42 @@ def test_telemetry_endpoint_accepts_payload():
     assert "errors" in body
 
 
+def test_sensor_stats_cover_node_metrics_and_lcd():
+    client = app.app.test_client()
+    now = time.time()
+    for offset, value in ((-20, 20.0), (-10, 21.0), (0, 22.0)):
+        payload = {
+            "node_id": "stats-node",
+            "zone": "kat1",
+            "ts": now + offset,
+            "sensors": [{"id": "stats-temp", "metric": "temp_c", "value": value, "quality": "ok"}],
+        }
+        assert client.post("/api/telemetry", json=payload).status_code == 200
+        app.NODE_RATE_LIMIT.clear()
+    stats = client.get("/api/status?fields=sensor_stats").get_json()["sensor_stats"]
+    one_minute = stats["stats-temp.temp_c"]["1m"]
+    assert one_minute["count"] == 3 and one_minute["mean"] == 21.0
+    assert one_minute["min"] == 20.0 and one_minute["max"] == 22.0 and one_minute["slope"] == 6.0
+
+    app.sensor_manager.stats.add("dht22.temperature", 24.0, now)
+    context = app.lcd_manager._template_context({"sensor_readings": {}, "actuator_state": {}})
+    assert context["temp_avg_1m"] != "--" and "hum_avg_30m" in context
+
+
+def test_node_stats_survive_a_future_timestamp():
+    client = app.app.test_client()
+    for ahead, value in ((3600, 30.0), (0, 20.0)):
+        payload = {
+            "node_id": "skew-node",
+            "ts": time.time() + ahead,
+            "sensors": [{"id": "skew-temp", "metric": "temp_c", "value": value, "quality": "ok"}],
+        }
+        assert client.post("/api/telemetry", json=payload).status_code == 200
+        app.NODE_RATE_LIMIT.clear()
+    one_minute = app.sensor_manager.stats.window("skew-temp.temp_c", "1m")
+    assert one_minute.count == 2 and one_minute.mean == 25.0
+
+
 def test_node_registry_health_in_status():
     client = app.app.test_client()
     payload = {
@@ -395,12 +800,12 @@ def test_nodes_endpoint_reports_queue_size():
 
 
 def test_remote_sensor_status_from_telemetry():
-    original_catalog = app.catalog_config
+    original_catalog = app.catalog_index
     sensor_id = "kat1-env"
     node_id = "kat1-node"
     original_snapshot = app.NODE_SENSOR_STATE.get(sensor_id)
     try:
-        app.catalog_config = {
+        app.catalog_index = app.CatalogIndex({
             "version": 1,
             "zones": [{"id": "kat1", "label": "KAT1"}],
             "sensors": [
@@ -413,7 +818,7 @@ def test_remote_sensor_status_from_telemetry():
                 }
             ],
             "actuators": [],
-        }
+        })
         client = app.app.test_client()
         payload = {
             "node_id": node_id,
@@ -440,7 +845,7 @@ def test_remote_sensor_status_from_telemetry():
         health_entry = health.get(sensor_id) or {}
         assert health_entry.get("status") == "ok"
     finally:
-        app.catalog_config = original_catalog
+        app.catalog_index = original_catalog
         if original_snapshot is None:
             app.NODE_SENSOR_STATE.pop(sensor_id, None)
         else:
@@ -571,15 +976,15 @@ def test_node_commands_enqueue_and_fetch():
 
 
 def test_actuator_pwm_queues_node_command():
-    original_catalog = app.catalog_config
+    original_catalog = app.catalog_index
     node_id = "kat1-node"
     original_queue = app.NODE_COMMANDS.get(node_id)
     try:
-        app.catalog_config = {
+        app.catalog_index = app.CatalogIndex({
             "actuators": [
                 {"id": "kat1-light", "backend": "esp32", "node_id": node_id, "supports_pwm": True},
             ]
-        }
+        })
         app.NODE_COMMANDS[node_id] = []
         client = app.app.test_client()
         resp = client.post("/api/settings", json={"safe_mode": False})
@@ -594,7 +999,7 @@ def test_actuator_pwm_queues_node_command():
         assert queue[-1]["action"] == "set_pwm"
         assert queue[-1]["duty_pct"] == 50.0
     finally:
-        app.catalog_config = original_catalog
+        app.catalog_index = original_catalog
         if original_queue is None:
             app.NODE_COMMANDS.pop(node_id, None)
         else:
@@ -609,19 +1014,19 @@ def test_actuator_duty_pct_rejected_for_local():
 
 
 def test_remote_actuator_state_updates_on_ack():
-    original_catalog = app.catalog_config
+    original_catalog = app.catalog_index
     node_id = "kat1-node"
     original_queue = app.NODE_COMMANDS.get(node_id)
     original_state = app.NODE_ACTUATOR_STATE.get("kat1-fan")
     try:
-        app.catalog_config = {
+        app.catalog_index = app.CatalogIndex({
             "version": 1,
             "zones": [{"id": "kat1", "label": "KAT1"}],
             "sensors": [],
             "actuators": [
                 {"id": "kat1-fan", "zone": "kat1", "role": "fan", "backend": "esp32", "node_id": node_id},
             ],
-        }
+        })
         app.NODE_COMMANDS[node_id] = []
         client = app.app.test_client()
         resp = client.post("/api/settings", json={"safe_mode": False})
@@ -642,7 +1047,7 @@ def test_remote_actuator_state_updates_on_ack():
         assert entry.get("state") is True
         assert entry.get("reason") == "remote_ack"
     finally:
-        app.catalog_config = original_catalog
+        app.catalog_index = original_catalog
         if original_queue is None:
             app.NODE_COMMANDS.pop(node_id, None)
         else:
@@ -655,16 +1060,16 @@ def test_remote_actuator_state_updates_on_ack():
 
 
 def test_emergency_stop_queues_remote_off():
-    original_catalog = app.catalog_config
+    original_catalog = app.catalog_index
     node_id = "kat1-node"
     original_queue = app.NODE_COMMANDS.get(node_id)
     try:
-        app.catalog_config = {
+        app.catalog_index = app.CatalogIndex({
             "actuators": [
                 {"id": "kat1-light", "backend": "esp32", "node_id": node_id, "supports_pwm": True},
                 {"id": "kat1-fan", "backend": "esp32", "node_id": node_id},
             ]
-        }
+        })
         app.NODE_COMMANDS[node_id] = [
             {"cmd_id": "old", "created_ts": time.time(), "ttl_s": 0},
         ]
@@ -680,8 +1085,429 @@ def test_emergency_stop_queues_remote_off():
             assert cmd.get("state") == "off"
             assert cmd.get("cmd_id") != "old"
     finally:
-        app.catalog_config = original_catalog
+        app.catalog_index = original_catalog
         if original_queue is None:
             app.NODE_COMMANDS.pop(node_id, None)
         else:
             app.NODE_COMMANDS[node_id] = original_queue
+
+
+def test_config_reload_catalog_rebuilds_index(tmp_path, monkeypatch):
+    original_catalog = app.catalog_index
+    catalog_path = tmp_path / "catalog.json"
+    catalog_path.write_text(json.dumps({
+        "version": 7,
+        "actuators": [{"id": "kat1-fan", "zone": "kat1", "role": "fan"}],
+    }))
+    monkeypatch.setattr(app, "CATALOG_CONFIG_PATH", catalog_path)
+    try:
+        client = app.app.test_client()
+        resp = client.post("/api/config", json={"reload_catalog": True})
+        assert resp.status_code == 200
+        index = app._catalog()
+        assert index is not original_catalog
+        assert index.version == 7
+        assert [entry["id"] for entry in index.fans_in("kat1")] == ["kat1-fan"]
+    finally:
+        app.catalog_index = original_catalog
+
+
+def test_day_archives_serve_history_after_retention(tmp_path, monkeypatch):
+    original_db = app.DB_PATH
+    monkeypatch.setattr(app, "RETENTION_BATCH_PAUSE_MS", 0)
+    monkeypatch.setattr(app, "SENSOR_CSV_LOG_DIR", tmp_path / "csv")
+    monkeypatch.setattr(app, "_retention_archive_dir", lambda cfg: tmp_path / "archives")
+    monkeypatch.setattr(app.retention_manager, "archive", app.day_archive.DayArchive(tmp_path / "archives" / "sensor_log"))
+    try:
+        app.DB_PATH = tmp_path / "sera.db"
+        app.init_db()
+        now = time.time()
+        conn = app.sqlite3.connect(app.DB_PATH)
+        conn.executemany(
+            "INSERT INTO sensor_log (ts, dht_temp) VALUES (?, ?)",
+            [(now - 3 * 86400 + i * 60, 20.5) for i in range(30)] + [(now - i, 21.0) for i in range(5)],
+        )
+        conn.commit()
+        conn.close()
+        manager = app.RetentionManager({"sensor_log_days": 1, "archive_enabled": True})
+        manager.cleanup_now()
+        summary = manager.public_status()["last_summary"]
+        assert summary["sensor_log"] == 30
+        assert summary["day_archives"] >= 1
+
+        client = app.app.test_client()
+        resp = client.get(f"/api/history?metric=dht_temp&from={now - 4 * 86400}&to={now}")
+        points = resp.get_json()["points"]
+        assert len(points) == 35
+        assert points[0][1] == 20.5 and points[-1][1] == 21.0
+        resp = client.get(f"/api/sensor_log?from={now - 4 * 86400}&to={now}&order=asc&limit=10")
+        rows = resp.get_json()["rows"]
+        assert len(rows) == 10 and rows[0]["dht_temp"] == 20.5
+        resp = client.get(f"/api/sensor_log?from={now - 4 * 86400}&to={now}&interval=15")
+        assert any(row["dht_temp"] == 20.5 for row in resp.get_json()["rows"])
+    finally:
+        app.DB_PATH = original_db
+        app.init_db()
+
+
+def test_exports_stream_without_row_cap(tmp_path, monkeypatch):
+    original_db = app.DB_PATH
+    monkeypatch.setattr(app, "EXPORT_CHUNK_ROWS", 100)
+    try:
+        app.DB_PATH = tmp_path / "sera.db"
+        app.init_db()
+        now = time.time()
+        conn = app.sqlite3.connect(app.DB_PATH)
+        conn.executemany(
+            "INSERT INTO sensor_log (ts, dht_temp) VALUES (?, ?)",
+            [(now - 2500 + i, float(i)) for i in range(2500)],
+        )
+        conn.commit()
+        conn.close()
+        client = app.app.test_client()
+        resp = client.get(f"/api/sensor_log?format=csv&order=asc&from={now - 3000}&to={now}")
+        assert resp.is_streamed
+        lines = resp.get_data(as_text=True).splitlines()
+        assert lines[0].startswith("ts,dht_temp")
+        assert len(lines) == 2501
+        resp = client.get(f"/api/history?metric=dht_temp&format=ndjson&from={now - 3000}&to={now}")
+        records = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+        assert len(records) == 2500 and records[-1]["dht_temp"] == 2499.0
+        resp = client.get(f"/api/history?metric=dht_temp&from={now - 3000}&to={now}")
+        body = resp.get_json()
+        assert body["metric"] == "dht_temp" and len(body["points"]) == 2500
+        resp = client.get("/api/sensor_log?limit=5000")
+        assert len(resp.get_json()["rows"]) == 2000
+    finally:
+        app.DB_PATH = original_db
+        app.init_db()
+
+
+def test_points_encodings_and_gzip(tmp_path, monkeypatch):
+    original_db = app.DB_PATH
+    try:
+        app.DB_PATH = tmp_path / "sera.db"
+        app.init_db()
+        now = time.time()
+        conn = app.sqlite3.connect(app.DB_PATH)
+        conn.executemany(
+            "INSERT INTO sensor_log (ts, dht_temp) VALUES (?, ?)",
+            [(now - 600 + i * 10, 20.0 + i / 4) for i in range(50)],
+        )
+        conn.commit()
+        conn.close()
+        client = app.app.test_client()
+        base = f"/api/history?metric=dht_temp&from={now - 700}&to={now}"
+        plain = client.get(base).get_json()["points"]
+
+        columnar = client.get(base + "&encoding=columnar").get_json()
+        assert columnar["count"] == 50 and columnar["ts"][0] == 0
+        ts = []
+        acc = columnar["ts0"] * 1000
+        for delta in columnar["ts"]:
+            acc += delta
+            ts.append(acc / 1000)
+        assert ts[-1] == pytest.approx(plain[-1][0], abs=1e-3)
+        assert columnar["v"] == [p[1] for p in plain]
+
+        packed = client.get(base + "&encoding=f32").get_json()
+        values = struct.unpack("<50f", base64.b64decode(packed["v"]))
+        stamps = struct.unpack("<50d", base64.b64decode(packed["ts"]))
+        assert stamps == tuple(p[0] for p in plain)
+        assert values[7] == pytest.approx(plain[7][1])
+        assert client.get(base + "&encoding=xml").status_code == 400
+        monkeypatch.setattr(app, "HISTORY_ENCODED_MAX_ROWS", 49)
+        resp = client.get(base + "&encoding=f32")
+        assert resp.status_code == 400 and resp.get_json()["max_rows"] == 49
+        assert len(client.get(base).get_json()["points"]) == 50
+        monkeypatch.undo()
+
+        resp = client.get(base, headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(resp.get_data()))["points"] == plain
+        resp = client.get("/api/trends?metric=temp_c&hours=1&encoding=columnar", headers={"Accept-Encoding": "gzip"})
+        assert resp.status_code == 200
+        assert "Accept-Encoding" in resp.headers["Vary"]
+    finally:
+        app.DB_PATH = original_db
+        app.init_db()
+
+
+def test_trends_downsampling_keeps_extremes(tmp_path):
+    original_db = app.DB_PATH
+    try:
+        app.DB_PATH = tmp_path / "sera.db"
+        app.init_db()
+        now = time.time()
+        rows = [(now - 3500 + i, 20.0 + (i % 10) / 10) for i in range(3400)]
+        rows[1234] = (rows[1234][0], 45.0)  # heater spike
+        rows[2345] = (rows[2345][0], 5.0)
+        conn = app.sqlite3.connect(app.DB_PATH)
+        conn.executemany("INSERT INTO sensor_log (ts, dht_temp) VALUES (?, ?)", rows)
+        conn.commit()
+        conn.close()
+        client = app.app.test_client()
+        # 50 points over an hour reads 1-minute rollups, 1000 points reads raw rows
+        for max_points in (50, 1000):
+            points = client.get(f"/api/trends?metric=temp_c&hours=1&max_points={max_points}").get_json()["points"]
+            assert 3 <= len(points) <= max_points
+            values = [p[1] for p in points]
+            assert max(values) == 45.0 and min(values) == 5.0
+            assert [p[0] for p in points] == sorted(p[0] for p in points)
+        assert points[-1] == [rows[-1][0], rows[-1][1]]
+    finally:
+        app.DB_PATH = original_db
+        app.init_db()
+
+
+def test_trends_batch_matches_single_requests(tmp_path):
+    original_db = app.DB_PATH
+    try:
+        app.DB_PATH = tmp_path / "sera.db"
+        app.init_db()
+        now = time.time()
+        conn = app.sqlite3.connect(app.DB_PATH)
+        conn.executemany(
+            "INSERT INTO sensor_log (ts, dht_temp, dht_hum) VALUES (?, ?, ?)",
+            [(now - 3000 + i * 10, 20.0 + i % 7, None if i % 3 else 55.0 + i % 5) for i in range(290)],
+        )
+        conn.executemany(
+            "INSERT INTO telemetry_log (ts, node_id, zone, metric, value, unit, source, quality) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (now - 2000 + i * 10, f"node{i % 2}", "kat1", "temp_c", 18.0 + i % 11, "C", "sht31", "ok")
+                for i in range(150)
+            ],
+        )
+        conn.commit()
+        conn.close()
+        client = app.app.test_client()
+        series = "kat1:temp_c,:temp_c,sera:rh_pct,kat2:lux"
+
+        batch = client.get(f"/api/trends/batch?series={series}&hours=1&summary=1").get_json()["series"]
+        assert [(item["zone"], item["metric"]) for item in batch] == [
+            ("kat1", "temp_c"), (None, "temp_c"), ("sera", "rh_pct"), ("kat2", "lux")
+        ]
+        for item in batch:
+            single = client.get(
+                f"/api/trends?zone={item['zone'] or ''}&metric={item['metric']}&hours=1&summary=1"
+            ).get_json()
+            for key in ("count", "min", "max", "last", "last_ts", "source"):
+                assert item[key] == single[key]
+        assert batch[0]["source"] == "telemetry" and batch[0]["count"] == 150
+        assert batch[3]["count"] == 0
+
+        batch = client.get(f"/api/trends/batch?series={series}&hours=1&max_points=40").get_json()["series"]
+        temps = [p[1] for p in batch[0]["points"]]
+        assert 3 <= len(temps) <= 40 and max(temps) == 28.0 and min(temps) == 18.0
+        for item in batch[1:3]:
+            single = client.get(
+                f"/api/trends?zone={item['zone'] or ''}&metric={item['metric']}&hours=1&max_points=40"
+            ).get_json()
+            assert item["points"] == single["points"] and item["points"]
+        assert batch[3]["points"] == []
+        raw = client.get("/api/trends/batch?series=sera:rh_pct&series=kat1:temp_c&hours=1&max_points=2000").get_json()
+        assert len(raw["series"][0]["points"]) == 97 and len(raw["series"][1]["points"]) == 150
+
+        encoded = client.get("/api/trends/batch?series=kat1:temp_c&hours=1&encoding=columnar").get_json()
+        assert encoded["series"][0]["encoding"] == "columnar"
+        assert client.get("/api/trends/batch?series=kat1:ph&hours=1").status_code == 400
+        assert client.get("/api/trends/batch").status_code == 400
+    finally:
+        app.DB_PATH = original_db
+        app.init_db()
+
+
+def test_downsample_points_lttb():
+    points = [[float(i), float(i % 5)] for i in range(100)]
+    points[40][1] = 99.0
+    sampled = app._downsample_points(points, 10)
+    assert len(sampled) == 10
+    assert sampled[0] == points[0] and sampled[-1] == points[-1]
+    assert [40.0, 99.0] in sampled
+    assert app._downsample_points(points, 1) == [points[-1]]
+
+
+def test_sensor_drivers_publish_independently():
+    manager = app.SensorManager(simulation=True)
+    release = app.threading.Event()
+
+    def stuck_dht() -> dict:
+        release.wait(5)
+        return {"temperature": 21.0, "humidity": 50.0, "ts": time.time(), "status": "ok"}
+
+    manager.drivers["dht22"].read = stuck_dht
+    for driver in manager.drivers.values():
+        driver.interval = 0.05
+    try:
+        manager.start_drivers()
+        seen = manager.wait_for_update(0, 2)
+        deadline = time.time() + 2
+        while time.time() < deadline and set(manager.latest()["readings"]) != {"ds18b20", "bh1750", "soil"}:
+            seen = manager.wait_for_update(seen, 0.5)
+        readings = manager.latest()["readings"]
+        assert set(readings) == {"ds18b20", "bh1750", "soil"}
+        assert readings["bh1750"]["status"] == "simulated"
+        release.set()
+        deadline = time.time() + 2
+        while time.time() < deadline and "dht22" not in manager.latest()["readings"]:
+            seen = manager.wait_for_update(seen, 0.5)
+        assert manager.latest()["readings"]["dht22"]["temperature"] == 21.0
+        assert manager.dht22_averages()["1m"]["temperature"] == 21.0
+    finally:
+        release.set()
+        manager.stop_drivers()
+
+
+def test_dht22_averages_follow_configured_windows():
+    manager = app.SensorManager(simulation=True)
+    manager.stats.configure([120, 3600])
+    manager.stats.add("dht22.temperature", 21.0, time.time())
+    averages = manager.dht22_averages()
+    assert list(averages) == ["2m", "1h"]
+    assert averages["2m"] == {"temperature": 21.0, "humidity": None}
+
+
+def test_reading_status_marks_stale_driver():
+    now = time.time()
+    assert app._reading_status({"status": "ok", "ts": now}) == "ok"
+    assert app._reading_status({"status": "ok", "ts": now - app.SENSOR_STALE_SECONDS - 1}) == "stale"
+    assert app._reading_status({"status": "error", "ts": 0}) == "error"
+    assert app._reading_status(None) is None
+
+
+def test_stale_fail_safe_follows_the_dependent_sensor(monkeypatch):
+    now = time.time()
+    old = now - 10 * app.sensor_manager.stale_after("soil")
+    latest = {
+        "ts": now,
+        "readings": {
+            "bh1750": {"lux": 100, "status": "ok", "ts": now},
+            "soil": {"ch0": 15000, "status": "ok", "ts": old},
+            "dht22": {"temperature": 21, "status": "ok", "ts": now},
+        },
+    }
+    switched = []
+    monkeypatch.setattr(app.sensor_manager, "latest", lambda: latest)
+    monkeypatch.setattr(app.actuator_manager, "set_state", lambda name, state, reason: switched.append((name, state, reason)))
+    app._check_stale_and_fail_safe()
+    assert switched and all(state is False and reason == "stale_sensors" for _, state, reason in switched)
+    assert any("PUMP" in name for name, _, _ in switched)
+    assert not any("HEATER" in name for name, _, _ in switched)
+    latest["readings"]["soil"]["ts"] = now
+    switched.clear()
+    app._check_stale_and_fail_safe()
+    assert switched == []
+
+
+def test_actuator_speeds_up_related_sensor():
+    manager = app.SensorManager(simulation=True)
+    soil = manager.drivers["soil"]
+    assert soil.interval == manager.plans["soil"].interval
+    manager.note_actuator("R3_PUMP", "pump", True)
+    assert soil.interval == manager.plans["soil"].min_interval
+    manager.read_all()
+    assert soil.interval == manager.plans["soil"].min_interval
+    manager.note_actuator("R3_PUMP", "pump", False)
+    assert manager.active_actuators == {}
+    assert manager.stale_after("soil") >= app.SENSOR_STALE_SECONDS
+    assert app.validate_sensors_payload({"polling": {"soil": {"interval": 0}, "ph": {}}}) == [
+        "sensors.polling.soil.interval must be a positive number",
+        "sensors.polling.ph unknown sensor (allowed: dht22, ds18b20, bh1750, soil)",
+    ]
+    assert app.validate_sensors_payload({"polling": {"dht22": {"change_threshold": {"humidity": 2, "lux": 1, "temperature": 0}}}}) == [
+        "sensors.polling.dht22.change_threshold.lux unknown field (allowed: temperature, humidity)",
+        "sensors.polling.dht22.change_threshold.temperature must be a positive number",
+    ]
+
+
+def test_sensor_reload_swaps_compiled_settings():
+    manager = app.SensorManager(simulation=True)
+    before = manager.settings
+    manager.reload_config({**app.sensors_config, "ds18b20_enabled": True, "polling": {"soil": {"interval": 12}}})
+    assert manager.settings is not before and manager.settings.ds18b20_enabled is True
+    assert manager.drivers["soil"].interval == 12
+    assert manager._read_ds18b20()["status"] == "simulated"
+    manager.reload_config({**app.sensors_config, "ds18b20_enabled": False})
+    assert manager._read_ds18b20()["status"] == "disabled"
+
+
+def test_sensor_reload_keeps_unchanged_hardware_handles(tmp_path):
+    manager = app.SensorManager(simulation=True)
+    manager.simulation = False
+    manager.reload_config(app.sensors_config)
+    probes = manager.ds18_probes
+    manager.bus = app.i2c_bus.SharedBus(object())
+    manager.reload_config(app.sensors_config)
+    bus, lux, sampler = manager.bus, manager.lux_sensor, manager.soil_sampler
+    assert lux is not None and sampler is not None
+
+    # an LCD text change must not re-probe the sensors or reopen anything
+    manager.reload_config({**app.sensors_config, "lcd_lines": ["x", "y"]})
+    assert (manager.bus, manager.lux_sensor, manager.soil_sampler, manager.ds18_probes) == (bus, lux, sampler, probes)
+    manager.reload_config({**app.sensors_config, "bh1750_mtreg": 100})
+    assert manager.lux_sensor is not lux and manager.lux_sensor.mtreg == 100
+    assert manager.soil_sampler is sampler and manager.ds18_probes is probes
+
+    # replaced handles are released: the probe pool is shut down
+    old = app.ds18b20.ProbeSet(base=tmp_path)
+    pool = old._pool = app.ds18b20.ThreadPoolExecutor(max_workers=1)
+    app.SensorManager._release_hardware({"ds18_probes": old}, {"ds18_probes": probes})
+    assert old._pool is None and pool._shutdown
+
+
+def test_sensor_config_problems_are_reported():
+    # the API validator and the compiled settings accept the same trim range
+    assert app.validate_sensors_payload({"ads1115_trim": app.ads1115.TRIM_MAX}) == []
+    assert app.sensor_config.compile_config({"ads1115_trim": app.ads1115.TRIM_MAX}).problems == ()
+    assert app.validate_sensors_payload({"ads1115_trim": 0.495})
+    original = app.sensor_manager.settings
+    try:
+        app.sensor_manager.settings = app.sensor_config.compile_config({**app.sensors_config, "ads1115_trim": 0.495})
+        app._report_sensor_config_problems()
+        assert any("ads1115_trim" in alert["message"] for alert in app.alerts.get())
+        problems = app.app.test_client().get("/api/status?fields=sensor_config").get_json()["sensor_config"]["problems"]
+        assert [problem.split(":")[0] for problem in problems] == ["ads1115_trim"]
+    finally:
+        app.sensor_manager.settings = original
+
+
+def test_pump_dry_check_hysteresis_follows_noise():
+    engine = app.automation_engine
+    original = dict(engine.config)
+    try:
+        engine.config.update({"pump_soil_channel": "ch0", "pump_dry_threshold": 1000, "pump_dry_when_above": False, "pump_dry_hysteresis": 0})
+        engine.pump_dry_active = False
+        noisy = {"noise": {"ch0": 10.0}}
+        # within 3x noise of the threshold: not dry yet
+        assert engine._pump_dry_check({**noisy, "ch0": 990})[0] is False
+        assert engine._pump_dry_check({**noisy, "ch0": 969})[0] is True
+        # once dry it stays dry until the value is back across the threshold
+        assert engine._pump_dry_check({**noisy, "ch0": 995})[0] is True
+        assert engine._pump_dry_check({**noisy, "ch0": 1001})[0] is False
+        assert engine.pump_dry_band == 30.0
+        assert engine._pump_dry_check({"ch0": 999})[0] is True
+    finally:
+        engine.config.clear()
+        engine.config.update(original)
+        engine.pump_dry_active = False
+
+
+def test_catalog_ds18b20_sensor_follows_its_probe():
+    readings = {
+        "ds18b20": {
+            "temperature": 21.5,
+            "status": "ok",
+            "ts": 100.0,
+            "probe": "28-00000000000a",
+            "probes": {"28-00000000000a": {"temperature": 21.5, "status": "ok"}, "28-00000000000b": {"temperature": 17.0, "status": "ok"}},
+        }
+    }
+    root = {"id": "kat1-root", "kind": "ds18b20", "w1_id": "28-00000000000b"}
+    app._apply_sensor_status(root, readings)
+    assert root["status"] == "ok" and root["last_value"]["temperature"] == 17.0
+    gone = {"id": "kat1-air", "kind": "ds18b20", "w1_id": "28-00000000000c"}
+    app._apply_sensor_status(gone, readings)
+    assert gone["status"] == "missing"
+    assert app.validate_sensors_payload({"ds18b20_primary": "28-XYZ"}) == [
+        "sensors.ds18b20_primary must be a 1-Wire id like 28-0123456789ab or null"
+    ]
@@ -0,0 +1,78 @@
+import pytest
+
+import bh1750
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class FakeBus:
+    def __init__(self, present=(0x23,), raw=1200):
+        self.present = set(present)
+        self.raw = raw
+        self.commands = []
+        self.reads = 0
+
+    def write_byte(self, addr, value):
+        if addr not in self.present:
+            raise OSError(121, "Remote I/O error")
+        self.commands.append((addr, value))
+
+    def read_i2c_block_data(self, addr, register, length):
+        if addr not in self.present:
+            raise OSError(121, "Remote I/O error")
+        self.reads += 1
+        return [self.raw >> 8, self.raw & 0xFF]
+
+
+def make(bus, **kwargs):
+    clock = FakeClock()
+    return bh1750.BH1750(bus, 0x23, clock=clock, sleep=clock.sleep, **kwargs), clock
+
+
+def test_configures_once_and_reads_without_waiting():
+    bus = FakeBus()
+    sensor, clock = make(bus)
+    assert sensor.read() == (1000.0, 0x23)
+    assert clock.slept == [pytest.approx(0.18)]
+    assert bus.commands == [(0x23, 0x01), (0x23, 0x42), (0x23, 0x65), (0x23, 0x10)]
+    clock.now += 1
+    assert sensor.read()[0] == 1000.0
+    assert len(bus.commands) == 4 and len(clock.slept) == 1 and bus.reads == 2
+
+
+def test_remembers_alternate_address_and_backs_off():
+    bus = FakeBus(present=(0x5C,))
+    sensor, clock = make(bus, mtreg=138)
+    assert sensor.read() == (500.0, 0x5C)
+    assert sensor.addr == 0x5C
+    bus.present = set()
+    with pytest.raises(OSError):
+        sensor.read()
+    assert sensor.addr is None and sensor.retry_at == clock.now + 5
+    writes = len(bus.commands)
+    with pytest.raises(OSError):
+        sensor.read()
+    assert len(bus.commands) == writes  # no probe during backoff
+    clock.now += 5
+    with pytest.raises(OSError):
+        sensor.read()
+    assert sensor.retry_at == clock.now + 10
+    bus.present = {0x23}
+    clock.now += 10
+    assert sensor.read()[1] == 0x23 and sensor.failures == 0
+
+
+def test_rejects_bad_mtreg():
+    with pytest.raises(ValueError):
+        bh1750.BH1750(FakeBus(), mtreg=10)
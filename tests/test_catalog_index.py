@@ -0,0 +1,50 @@
+from catalog_index import CatalogIndex
+
+CATALOG = {
+    "version": 3,
+    "zones": [{"id": "kat1"}, "junk"],
+    "sensors": [
+        {"id": "kat1-env", "zone": "kat1", "node_id": "kat1-node"},
+        {"id": "dht22", "zone": "kat1"},
+        {"id": "kat2-soil", "backend": "esp32"},
+    ],
+    "actuators": [
+        {"id": "kat1-fan", "legacy_name": "R2_FAN_MAIN", "zone": "kat1", "role": "fan_canopy", "gpio_pin": 27},
+        {"id": "kat1-heater", "zone": "kat1", "role": "heater", "requires_fan_dependency": True},
+        {"id": "kat1-light", "zone": "kat1", "role": "light", "backend": "esp32", "node_id": "kat1-node"},
+        {"id": "dup", "name": "kat1-fan", "gpio_pin": 27},
+        None,
+    ],
+}
+
+
+def test_lookups_match_first_entry():
+    index = CatalogIndex(CATALOG)
+    assert index.loaded and index.version == 3
+    assert len(index.zones) == 1 and len(index.actuators) == 4
+    fan = index.actuators[0]
+    assert index.find_actuator("r2_fan_main") is fan
+    assert index.find_actuator("KAT1-FAN") is fan
+    assert index.find_actuator("unknown", gpio_pin=27) is fan
+    # a name match on a later entry loses to an earlier pin match, as in a linear scan
+    assert index.find_actuator("dup", gpio_pin=27) is fan
+    assert index.find_actuator("dup") is index.actuators[3]
+    assert index.find_actuator("unknown") is None
+    assert index.fans_in("kat1") == (fan,)
+    assert index.channel_names(fan) == ("R2_FAN_MAIN", "KAT1-FAN")
+    assert index.channel_names({"name": " r5 "}) == ("R5",)
+
+
+def test_remote_entries():
+    index = CatalogIndex(CATALOG)
+    assert [(node, act) for node, act, _ in index.remote_actuators] == [("kat1-node", "kat1-light")]
+    assert [sensor_id for sensor_id, _ in index.remote_sensors] == ["kat1-env", "kat2-soil"]
+    assert index.sensor("dht22")["zone"] == "kat1"
+
+
+def test_missing_catalog():
+    index = CatalogIndex(None)
+    assert not index.loaded
+    assert index.find_actuator("R1") is None
+    assert index.fans_in("kat1") == ()
+    assert index.remote_actuators == ()
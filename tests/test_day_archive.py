@@ -0,0 +1,61 @@
+import sqlite3
+
+import pytest
+
+import day_archive
+
+
+def _sensor_db(rows):
+    conn = sqlite3.connect(":memory:")
+    cur = conn.cursor()
+    cur.execute(
+        "CREATE TABLE sensor_log (id INTEGER PRIMARY KEY, ts REAL, dht_temp REAL, dht_hum REAL, ds18_temp REAL, "
+        "lux REAL, soil_ch0 REAL, soil_ch1 REAL, soil_ch2 REAL, soil_ch3 REAL)"
+    )
+    cur.executemany(
+        "INSERT INTO sensor_log (ts, dht_temp, dht_hum, ds18_temp, lux, soil_ch0, soil_ch1, soil_ch2, soil_ch3) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    return cur
+
+
+def test_encode_decode_roundtrip():
+    rows = [
+        (1_700_000_000.25 + i * 7.5, 21.37, None if i % 3 else 55.1, None, 1234.5, 900.0, None, None, 3.0)
+        for i in range(500)
+    ]
+    blob = day_archive.encode_day(rows)
+    assert len(blob) < len(rows) * 9 * 4 / 4
+    columns, decoded = day_archive.decode_day(blob)
+    assert columns == list(day_archive.SENSOR_COLUMNS)
+    assert decoded == [tuple(row) for row in rows]
+    with pytest.raises(ValueError):
+        day_archive.decode_day(b"nope")
+
+
+def test_export_and_read_through(tmp_path):
+    day = 86400.0
+    base = 1_700_000_000.0 - (1_700_000_000.0 % day)
+    rows = [(base + i * 600.0, float(i % 40), None, None, None, None, None, None, None) for i in range(3 * 144)]
+    cur = _sensor_db(rows)
+    archive = day_archive.DayArchive(tmp_path)
+    cutoff = base + 1.5 * day
+    written = archive.export_before(cur, cutoff)
+    assert sorted(written.values()) == [72, 144]
+    cur.execute("DELETE FROM sensor_log WHERE ts < ?", (cutoff,))
+
+    archived = archive.read_through(cur, base + 3600, base + 3 * day)
+    assert [row[0] for row in archived] == [row[0] for row in rows if base + 3600 <= row[0] < cutoff]
+    assert archive.read_through(cur, cutoff, base + 3 * day) == []
+
+    # a later run appends the rest of a partially exported day
+    cur.executemany(
+        "INSERT INTO sensor_log (ts, dht_temp) VALUES (?, ?)", [(base + 1.75 * day + 1, 1.0), (base + 1.8 * day, 2.0)]
+    )
+    archive.export_before(cur, base + 2 * day)
+    assert len(archive.read_range(base + day, base + 2 * day - 1)) == 146
+
+    buckets = day_archive.bucket_averages(archived[:6], 3600)
+    assert buckets[0][0] == base + 3600
+    assert buckets[0][1] == pytest.approx(sum(row[1] for row in archived[:6]) / 6)
@@ -0,0 +1,129 @@
+import threading
+import time
+
+from db import ConnectionManager, WriteBehindQueue
+
+
+def test_connection_is_reused_per_thread_and_uses_wal(tmp_path):
+    manager = ConnectionManager()
+    path = tmp_path / "sera.db"
+    conn = manager.connection(path)
+    assert manager.connection(path) is conn
+    mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode.lower() == "wal"
+    manager.close_thread()
+
+
+def test_thread_connection_returns_to_idle_pool(tmp_path):
+    manager = ConnectionManager()
+    path = tmp_path / "sera.db"
+    seen = []
+
+    def worker():
+        seen.append(manager.connection(path))
+
+    for _ in range(2):
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join()
+    assert seen[0] is seen[1]
+    manager.close_idle()
+
+
+def test_transaction_rolls_back_on_error(tmp_path):
+    manager = ConnectionManager()
+    path = tmp_path / "sera.db"
+    with manager.transaction(path) as conn:
+        conn.execute("CREATE TABLE t (v INTEGER)")
+    try:
+        with manager.transaction(path) as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert manager.connection(path).execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    manager.close_thread()
+
+
+def test_write_behind_queue_group_commits_and_flushes(tmp_path):
+    manager = ConnectionManager()
+    path = tmp_path / "sera.db"
+    with manager.transaction(path) as conn:
+        conn.execute("CREATE TABLE t (v INTEGER)")
+    writer = WriteBehindQueue(manager, flush_ms=60000, batch_rows=1000)
+    for i in range(50):
+        assert writer.submit(path, "INSERT INTO t VALUES (?)", (i,))
+    assert writer.flush(timeout=5)
+    assert manager.connection(path).execute("SELECT COUNT(*) FROM t").fetchone()[0] == 50
+    stats = writer.stats()
+    assert stats["written"] == 50
+    assert stats["queue_depth"] == 0
+    assert stats["batches"] <= 2
+    writer.stop()
+    manager.close_thread()
+
+
+def test_write_behind_queue_drops_when_full(tmp_path):
+    manager = ConnectionManager()
+    path = tmp_path / "sera.db"
+    with manager.transaction(path) as conn:
+        conn.execute("CREATE TABLE t (v INTEGER)")
+    writer = WriteBehindQueue(manager, max_queue=2, flush_ms=60000, batch_rows=1000)
+    results = [writer.submit(path, "INSERT INTO t VALUES (?)", (i,)) for i in range(3)]
+    assert results == [True, True, False]
+    writer.stop()
+    assert writer.stats()["dropped"] == 1
+    assert manager.connection(path).execute("SELECT COUNT(*) FROM t").fetchone()[0] == 2
+    manager.close_thread()
+
+
+def test_write_behind_queue_sync_mode_writes_inline(tmp_path):
+    manager = ConnectionManager()
+    path = tmp_path / "sera.db"
+    with manager.transaction(path) as conn:
+        conn.execute("CREATE TABLE t (v INTEGER)")
+    writer = WriteBehindQueue(manager, mode="sync")
+    assert writer.submit(path, "INSERT INTO t VALUES (?)", (1,))
+    assert manager.connection(path).execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+    manager.close_thread()
+
+
+def test_write_behind_queue_drops_only_the_failing_row(tmp_path):
+    manager = ConnectionManager()
+    path = tmp_path / "sera.db"
+    with manager.transaction(path) as conn:
+        conn.execute("CREATE TABLE t (v INTEGER NOT NULL)")
+    writer = WriteBehindQueue(manager, flush_ms=60000, batch_rows=1000)
+    for value in (1, None, 3):
+        assert writer.submit(path, "INSERT INTO t VALUES (?)", (value,))
+    assert writer.flush(timeout=5)
+    rows = manager.connection(path).execute("SELECT v FROM t ORDER BY v").fetchall()
+    assert [row[0] for row in rows] == [1, 3]
+    stats = writer.stats()
+    assert stats["written"] == 2 and stats["failed"] == 1
+    writer.stop()
+    manager.close_thread()
+
+
+def test_write_behind_queue_flush_waits_for_the_holder(tmp_path):
+    manager = ConnectionManager()
+    path = tmp_path / "sera.db"
+    with manager.transaction(path) as conn:
+        conn.execute("CREATE TABLE t (v INTEGER)")
+    writer = WriteBehindQueue(manager, flush_ms=60000, batch_rows=1000)
+    assert writer.submit(path, "INSERT INTO t VALUES (?)", (0,))
+    assert writer.flush(timeout=5)
+    flushed = []
+    with writer.hold():
+        assert writer.submit(path, "INSERT INTO t VALUES (?)", (1,))
+        reader = threading.Thread(target=lambda: flushed.append(writer.flush(timeout=5)))
+        reader.start()
+        time.sleep(0.05)
+        # the holder commits between its own steps; the waiting reader then sees the row
+        assert writer.commit_held(path, manager.connection(path)) == 1
+        reader.join(5)
+        assert flushed == [True]
+        assert manager.connection(path).execute("SELECT COUNT(*) FROM t").fetchone()[0] == 2
+    assert writer.commit_held(path, manager.connection(path)) == 0
+    writer.stop()
+    manager.close_thread()
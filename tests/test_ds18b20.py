@@ -0,0 +1,57 @@
+import ds18b20
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def make_probe(devices, master, probe, milli=None, w1_slave=None):
+    path = master / probe
+    path.mkdir()
+    if milli is not None:
+        (path / "temperature").write_text(f"{milli}\n")
+    (path / "w1_slave").write_text(w1_slave or f"aa 01 : crc=aa YES\naa 01 t={milli}\n")
+    (devices / probe).symlink_to(path)
+
+
+def test_bulk_conversion_reads_every_probe(tmp_path):
+    devices = tmp_path / "devices"
+    master = tmp_path / "w1_bus_master1"
+    devices.mkdir()
+    master.mkdir()
+    (devices / "w1_bus_master1").symlink_to(master)
+    (master / "therm_bulk_read").write_text("1\n")
+    make_probe(devices, master, "28-00000000000a", 21500)
+    make_probe(devices, master, "28-00000000000b", 18250)
+    make_probe(devices, master, "28-00000000000c", 85000)
+    clock = FakeClock()
+    probes = ds18b20.ProbeSet(devices, clock=clock, sleep=clock.sleep)
+    assert probes.read() == {
+        "28-00000000000a": (21.5, "ok"),
+        "28-00000000000b": (18.25, "ok"),
+        "28-00000000000c": (None, "error"),
+    }
+    assert (master / "therm_bulk_read").read_text() == "trigger\n"
+    assert clock.now < 0.2
+
+
+def test_w1_slave_fallback_and_cached_discovery(tmp_path):
+    devices = tmp_path / "devices"
+    master = tmp_path / "master"
+    devices.mkdir()
+    master.mkdir()
+    make_probe(devices, master, "28-00000000000a", w1_slave="aa : crc=00 NO\naa t=1000\n")
+    clock = FakeClock()
+    probes = ds18b20.ProbeSet(devices, rescan_seconds=300, clock=clock, sleep=clock.sleep)
+    assert probes.read() == {"28-00000000000a": (None, "crc_error")}
+    make_probe(devices, master, "28-00000000000b", 19000)
+    assert list(probes.read()) == ["28-00000000000a"]
+    clock.now += 300
+    assert probes.read()["28-00000000000b"] == (19.0, "ok")
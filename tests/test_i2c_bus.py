@@ -0,0 +1,36 @@
+import threading
+import time
+
+from i2c_bus import SharedBus
+
+
+class AddressBus:
+    """Selects the address, then transfers; records transfers that reached another address."""
+
+    def __init__(self):
+        self.addr = None
+        self.misrouted = 0
+
+    def read_i2c_block_data(self, addr, register, length):
+        self.addr = addr
+        time.sleep(0.0005)
+        if self.addr != addr:
+            self.misrouted += 1
+        return [0] * length
+
+
+def test_shared_bus_serialises_transactions():
+    raw = AddressBus()
+    bus = SharedBus(raw)
+
+    def worker(addr):
+        for _ in range(50):
+            bus.read_i2c_block_data(addr, 0, 2)
+
+    threads = [threading.Thread(target=worker, args=(addr,)) for addr in (0x23, 0x48)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert raw.misrouted == 0
+    assert not hasattr(bus, "i2c_rdwr")
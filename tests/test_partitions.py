@@ -0,0 +1,81 @@
+import sqlite3
+from datetime import datetime, timezone
+
+import partitions
+import sensor_rollup
+
+SPEC = partitions.PartitionedTable(
+    name="sensor_log",
+    column_defs=(("ts", "REAL NOT NULL"),) + tuple((col, "REAL") for col in sensor_rollup.ROLLUP_COLUMNS),
+    triggers=(sensor_rollup.trigger_sql,),
+)
+
+
+def _ts(year, month, day):
+    return datetime(year, month, day, tzinfo=timezone.utc).timestamp()
+
+
+def _legacy_db():
+    conn = sqlite3.connect(":memory:")
+    cur = conn.cursor()
+    cur.execute(
+        "CREATE TABLE sensor_log (id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL, dht_temp REAL, "
+        "dht_hum REAL, ds18_temp REAL, lux REAL, soil_ch0 REAL, soil_ch1 REAL, soil_ch2 REAL, soil_ch3 REAL)"
+    )
+    cur.execute("CREATE INDEX idx_sensor_log_ts ON sensor_log (ts)")
+    sensor_rollup.ensure_schema(cur)
+    for month in (1, 2, 3):
+        cur.executemany(
+            "INSERT INTO sensor_log (ts, dht_temp) VALUES (?, ?)",
+            [(_ts(2024, month, 10) + i * 60, float(month)) for i in range(10)],
+        )
+    return cur
+
+
+def test_legacy_table_is_split_and_inserts_are_routed():
+    cur = _legacy_db()
+    created = partitions.ensure(cur, SPEC, now=_ts(2024, 3, 15))
+    assert created == ["sensor_log_p202401", "sensor_log_p202402", "sensor_log_p202403", "sensor_log_p202404"]
+    cur.execute("SELECT type FROM sqlite_master WHERE name = 'sensor_log'")
+    assert cur.fetchone()[0] == "view"
+    cur.execute("SELECT COUNT(*) FROM sensor_log_default")
+    assert cur.fetchone()[0] == 0
+
+    cur.executemany(
+        "INSERT INTO sensor_log (ts, dht_temp) VALUES (?, ?)",
+        [(_ts(2024, 3, 20), 7.0), (_ts(2023, 6, 1), 8.0)],
+    )
+    cur.execute("SELECT COUNT(*) FROM sensor_log_p202403")
+    assert cur.fetchone()[0] == 11
+    cur.execute("SELECT dht_temp FROM sensor_log_default")
+    assert cur.fetchall() == [(8.0,)]
+    # the rollup trigger fires once per row, including migrated and parked rows
+    cur.execute("SELECT SUM(n) FROM sensor_rollup WHERE res = 86400")
+    assert cur.fetchone()[0] == 32
+
+    cur.execute(
+        "SELECT ts, dht_temp FROM sensor_log WHERE ts >= ? AND ts < ? ORDER BY ts DESC LIMIT 3",
+        (_ts(2024, 2, 1), _ts(2024, 4, 1)),
+    )
+    assert [row[1] for row in cur.fetchall()] == [7.0, 3.0, 3.0]
+
+    assert partitions.ensure(cur, SPEC, now=_ts(2024, 3, 15)) == ["sensor_log_p202306"]
+    cur.execute("SELECT COUNT(*) FROM sensor_log_p202306")
+    assert cur.fetchone()[0] == 1
+
+
+def test_expire_drops_whole_months_and_delete_before():
+    cur = _legacy_db()
+    partitions.ensure(cur, SPEC, now=_ts(2024, 3, 15))
+    whole, partial = partitions.split_expired(cur, SPEC, _ts(2024, 2, 20))
+    assert whole == ["sensor_log_p202401"]
+    assert partial == ["sensor_log_default", "sensor_log_p202402"]
+    assert partitions.drop(cur, SPEC, whole) == 10
+    cur.execute("SELECT COUNT(*) FROM sensor_log")
+    assert cur.fetchone()[0] == 20
+
+    assert partitions.delete_before(cur, SPEC, _ts(2024, 3, 10) + 300) == 15
+    assert partitions.delete_before(cur, SPEC, None) == 5
+    cur.execute("INSERT INTO sensor_log (ts, dht_temp) VALUES (?, ?)", (_ts(2024, 4, 2), 1.0))
+    cur.execute("SELECT COUNT(*) FROM sensor_log_p202404")
+    assert cur.fetchone()[0] == 1
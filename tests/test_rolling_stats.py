@@ -0,0 +1,51 @@
+import random
+
+from rolling_stats import RollingStats, parse_windows, window_label
+
+
+def _brute(samples, seconds):
+    newest = samples[-1][0]
+    kept = [(ts, value) for ts, value in samples if ts >= newest - seconds]
+    n = len(kept)
+    mean_t = sum(ts for ts, _ in kept) / n
+    mean_v = sum(value for _, value in kept) / n
+    var_t = sum((ts - mean_t) ** 2 for ts, _ in kept)
+    cov = sum((ts - mean_t) * (value - mean_v) for ts, value in kept)
+    return n, mean_v, min(v for _, v in kept), max(v for _, v in kept), cov / var_t * 60 if var_t else None
+
+
+def test_rolling_stats_match_brute_force():
+    rng = random.Random(7)
+    stats = RollingStats([30, 120])
+    samples = []
+    ts = 1_700_000_000.0
+    for _ in range(2000):
+        ts += rng.uniform(0.5, 4)
+        value = 20 + 5 * rng.random()
+        samples.append((ts, value))
+        assert stats.add("dht22.temperature", value, ts)
+        if len(samples) % 97:
+            continue
+        for label, seconds in (("30s", 30), ("2m", 120)):
+            got = stats.get("dht22.temperature")[label]
+            count, mean, low, high, slope = _brute(samples, seconds)
+            assert got.count == count
+            assert abs(got.mean - mean) < 1e-9 and got.min == low and got.max == high
+            assert abs(got.slope - slope) < 1e-6
+
+
+def test_rolling_stats_rejects_and_reconfigures():
+    stats = RollingStats()
+    assert stats.labels == ("1m", "5m", "30m")
+    assert stats.add("soil.ch0", 100, 10.0)
+    assert not stats.add("soil.ch0", 200, 5.0)
+    assert not stats.add("soil.ch0", None, 11.0) and not stats.add("soil.ch0", "x", 11.0)
+    assert stats.add("soil.ch0", 100, 10.0)
+    # equal timestamps: no slope
+    assert stats.get("soil.ch0")["1m"].slope is None
+    assert stats.window("soil.ch0", "1m", now=100.0) is None
+    assert stats.window("soil.ch0", "5m", now=100.0).count == 2
+    stats.configure([90, "x", 0])
+    assert stats.labels == ("90s",) and stats.get("soil.ch0")["90s"].count == 2
+    assert parse_windows("60") == (60, 300, 1800) and window_label(7200) == "2h"
+    assert stats.snapshot(now=10.0)["soil.ch0"]["90s"]["mean"] == 100.0
@@ -0,0 +1,39 @@
+import dataclasses
+
+import pytest
+
+from sensor_config import SensorConfig, compile_config
+
+
+def test_compile_config_parses_once_and_falls_back():
+    settings = compile_config(
+        {
+            "dht22_gpio": "4",
+            "bh1750_addr": "0x5C",
+            "bh1750_mtreg": 300,
+            "ads1115_addr": "0x49",
+            "ads1115_data_rate": 128,
+            "ads1115_mode": "burst",
+            "ads1115_rdy_gpio": None,
+            "ds18b20_enabled": False,
+            "ds18b20_primary": "28-000000000001",
+            "polling": {"soil": {"interval": 10}},
+        }
+    )
+    assert settings.dht22_gpio == 4
+    assert settings.bh1750_addr == 0x5C and settings.ads1115_addr == 0x49
+    assert settings.ads1115_data_rate == 128 and settings.ads1115_rdy_gpio is None
+    assert settings.ds18b20_enabled is False and settings.ds18b20_primary == "28-000000000001"
+    assert settings.plans["soil"].interval == 10
+    # invalid values keep their defaults and are reported
+    assert settings.bh1750_mtreg == SensorConfig.bh1750_mtreg and settings.ads1115_mode == "single"
+    assert [problem.split(":")[0] for problem in settings.problems] == ["bh1750_mtreg", "ads1115_mode"]
+    assert compile_config(None) == SensorConfig()
+
+
+def test_sensor_config_is_immutable():
+    settings = compile_config({})
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        settings.dht22_gpio = 5  # type: ignore[misc]
+    with pytest.raises(TypeError):
+        settings.plans["soil"] = settings.plans["dht22"]  # type: ignore[index]
@@ -0,0 +1,69 @@
+import sqlite3
+
+import pytest
+
+import sensor_rollup
+
+INSERT_SQL = (
+    "INSERT INTO sensor_log (ts, dht_temp, dht_hum, ds18_temp, lux, soil_ch0, soil_ch1, soil_ch2, soil_ch3) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _make_db(rows_before, rows_after):
+    conn = sqlite3.connect(":memory:")
+    cur = conn.cursor()
+    cur.execute(
+        "CREATE TABLE sensor_log (id INTEGER PRIMARY KEY, ts REAL, dht_temp REAL, dht_hum REAL, ds18_temp REAL, "
+        "lux REAL, soil_ch0 REAL, soil_ch1 REAL, soil_ch2 REAL, soil_ch3 REAL)"
+    )
+    cur.executemany(INSERT_SQL, rows_before)
+    sensor_rollup.ensure_schema(cur)  # backfills rows_before
+    cur.executemany(INSERT_SQL, rows_after)  # maintained by the trigger
+    return cur
+
+
+def _rows(start, count, step=7.5):
+    return [
+        (start + i * step, None if i % 7 == 0 else 15.0 + (i % 23), 50.0, None, float(i), 900.0, None, None, None)
+        for i in range(count)
+    ]
+
+
+def test_rollup_matches_raw_aggregates():
+    rows = _rows(10_000.0, 4000)
+    cur = _make_db(rows[:2000], rows[2000:])
+    averaged = sensor_rollup.bucket_averages(cur, ["dht_temp", "lux"], 0, 1e12, 300, group_seconds=900)
+    cur.execute(
+        "SELECT CAST(ts / 900 AS INTEGER) * 900 AS b, AVG(dht_temp), AVG(lux) FROM sensor_log GROUP BY b ORDER BY b"
+    )
+    raw = cur.fetchall()
+    assert len(averaged) == len(raw)
+    for got, want in zip(averaged, raw):
+        assert got[0] == want[0]
+        assert got[1] == pytest.approx(want[1])
+        assert got[2] == pytest.approx(want[2])
+
+    from_ts, to_ts = 10_123.4, 38_000.9
+    cur.execute(
+        "SELECT MIN(dht_temp), MAX(dht_temp), COUNT(dht_temp) FROM sensor_log WHERE ts >= ? AND ts < ?",
+        (from_ts, to_ts),
+    )
+    expected = cur.fetchone()
+    assert sensor_rollup.summarize(cur, "dht_temp", from_ts, to_ts) == expected
+
+
+def test_forget_before_rebuilds_edge_bucket():
+    cur = _make_db(_rows(0.0, 100, step=10.0), [])
+    cur.execute("DELETE FROM sensor_log WHERE ts < ?", (95.0,))
+    sensor_rollup.forget_before(cur, 95.0)
+    cur.execute("SELECT bucket, n FROM sensor_rollup WHERE res = 60 ORDER BY bucket LIMIT 1")
+    assert cur.fetchone() == (60, 2)
+
+
+def test_pick_resolution_and_divisor():
+    assert sensor_rollup.pick_resolution(30) is None
+    assert sensor_rollup.pick_resolution(180) == 60
+    assert sensor_rollup.pick_resolution(5040) == 3600
+    assert sensor_rollup.pick_divisor(15 * 60) == 300
+    assert sensor_rollup.pick_divisor(60 * 60) == 3600
@@ -0,0 +1,45 @@
+from sensor_schedule import BACKOFF, compile_plans, max_change, moving, next_interval, stale_after
+
+
+def test_compile_plans_merges_and_clamps():
+    plans = compile_plans({"polling": {"dht22": {"interval": 1, "min_interval": 0.5}, "soil": {"interval": "x"}, "lux": {}}})
+    assert set(plans) == {"dht22", "ds18b20", "bh1750", "soil"}
+    assert plans["dht22"].interval == 2.0 and plans["dht22"].min_interval == 2.0
+    assert plans["dht22"].max_interval == 10 and plans["dht22"].fast_when == frozenset({"heater"})
+    # invalid entries fall back to the defaults
+    assert plans["soil"].interval == 30 and plans["soil"].fast_when == frozenset({"pump"})
+    assert compile_plans({})["bh1750"].min_interval == 0.5
+
+
+def test_next_interval_rules():
+    plan = compile_plans({})["soil"]
+    prev = {"ch0": 15000, "ch1": None, "ts": 1.0, "status": "ok"}
+    stable = {"ch0": 15050, "ch1": 1, "ts": 9999.0, "status": "ok"}
+    moving = {"ch0": 16000, "ts": 2.0, "status": "ok"}
+    assert max_change(prev, stable) == 50
+    assert max_change(None, stable) is None
+    assert next_interval(plan, 30, None, stable, fast=False) == plan.interval
+    assert next_interval(plan, 30, prev, moving, fast=False) == plan.min_interval
+    assert next_interval(plan, 3, prev, stable, fast=False) == 3 * BACKOFF
+    assert next_interval(plan, 59, prev, stable, fast=False) == plan.max_interval
+    assert next_interval(plan, 59, prev, stable, fast=True) == plan.min_interval
+    assert next_interval(plan, 3, prev, {"status": "error"}, fast=True) == plan.interval
+    assert stale_after(plan, 15) == 120
+
+
+def test_per_field_thresholds_ignore_humidity_jitter():
+    plan = compile_plans({})["dht22"]
+    prev = {"temperature": 22.0, "humidity": 55.0, "ts": 1.0, "status": "ok"}
+    jitter = {"temperature": 22.1, "humidity": 56.5, "ts": 4.0, "status": "ok"}
+    warming = {"temperature": 22.8, "humidity": 55.0, "ts": 4.0, "status": "ok"}
+    # one shared 0.5 threshold would call a 1.5 %RH wobble "changing quickly"
+    assert max_change(prev, jitter) == 1.5
+    assert moving(plan.change_threshold, prev, jitter) is False
+    assert next_interval(plan, 4, prev, jitter, fast=False) == 4 * BACKOFF
+    assert next_interval(plan, 4, prev, warming, fast=False) == plan.min_interval
+    # a plain number still applies to every field; unnamed fields are ignored by an object
+    assert moving(0.5, prev, jitter) is True
+    assert moving({"humidity": 1}, prev, warming) is False
+    assert moving({"lux": 1}, prev, warming) is None
+    custom = compile_plans({"polling": {"dht22": {"change_threshold": {"humidity": 1}}}})["dht22"]
+    assert dict(custom.change_threshold) == {"humidity": 1.0}